@@ -12,7 +12,9 @@ from alembic import context
 # Import your Base and models
 from src.models.base import Base
 from src.models.order import Order, OrderItem  # noqa
+from src.models.outbox import OutboxEvent  # noqa
 from src.models.product import Product  # noqa
+from src.models.reservation import AppliedReservationLine  # noqa
 from src.models.user import User  # noqa
 
 # this is the Alembic Config object
@@ -0,0 +1,45 @@
+"""add order filter indexes
+
+Revision ID: 7d2e91c4b5a8
+Revises: 4159f8afee9f
+Create Date: 2026-10-16 10:12:41.207318
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '7d2e91c4b5a8'
+down_revision: Union[str, Sequence[str], None] = '4159f8afee9f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_orders_user_id_created_at',
+        'orders',
+        ['user_id', sa.text('created_at DESC')],
+        unique=False,
+    )
+    op.create_index(
+        'ix_orders_status_created_at',
+        'orders',
+        ['status', 'created_at'],
+        unique=False,
+    )
+    op.create_index(
+        op.f('ix_order_items_order_id'), 'order_items', ['order_id'], unique=False
+    )
+    op.create_index(
+        op.f('ix_order_items_product_id'), 'order_items', ['product_id'], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_order_items_product_id'), table_name='order_items')
+    op.drop_index(op.f('ix_order_items_order_id'), table_name='order_items')
+    op.drop_index('ix_orders_status_created_at', table_name='orders')
+    op.drop_index('ix_orders_user_id_created_at', table_name='orders')
@@ -0,0 +1,28 @@
+"""add product version
+
+Revision ID: b81f3c2d9e47
+Revises: 7d2e91c4b5a8
+Create Date: 2026-10-16 11:05:19.482630
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'b81f3c2d9e47'
+down_revision: Union[str, Sequence[str], None] = '7d2e91c4b5a8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'products',
+        sa.Column('version', sa.Integer(), server_default='1', nullable=False),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('products', 'version')
@@ -0,0 +1,36 @@
+"""add outbox
+
+Revision ID: c4a7e1f09d3b
+Revises: b81f3c2d9e47
+Create Date: 2026-10-16 14:22:07.913845
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4a7e1f09d3b'
+down_revision: Union[str, Sequence[str], None] = 'b81f3c2d9e47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'outbox',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('aggregate_type', sa.String(length=50), nullable=False),
+        sa.Column('aggregate_id', sa.Integer(), nullable=True),
+        sa.Column('event_type', sa.String(length=100), nullable=False),
+        sa.Column('payload', sa.JSON(), nullable=False),
+        sa.Column(
+            'created_at', sa.DateTime(), server_default=sa.func.now(), nullable=False
+        ),
+        sa.PrimaryKeyConstraint('id'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('outbox')
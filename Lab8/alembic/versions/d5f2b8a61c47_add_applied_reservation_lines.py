@@ -0,0 +1,33 @@
+"""add applied reservation lines
+
+Revision ID: d5f2b8a61c47
+Revises: c4a7e1f09d3b
+Create Date: 2026-10-16 18:05:41.273019
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5f2b8a61c47'
+down_revision: Union[str, Sequence[str], None] = 'c4a7e1f09d3b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'applied_reservation_lines',
+        sa.Column('reservation_id', sa.String(length=32), nullable=False),
+        sa.Column('product_id', sa.Integer(), nullable=False),
+        sa.Column(
+            'applied_at', sa.DateTime(), server_default=sa.func.now(), nullable=False
+        ),
+        sa.PrimaryKeyConstraint('reservation_id', 'product_id'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('applied_reservation_lines')
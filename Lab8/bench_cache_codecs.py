@@ -0,0 +1,92 @@
+"""
+Микробенчмарк кодеков кеша на реальных payload'ах сервисов.
+
+Запуск: python bench_cache_codecs.py [количество_итераций]
+"""
+
+import json
+import sys
+import timeit
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from src.services.product_service import ProductService
+from src.services.serializers import CacheSerializer, JsonCodec, MsgpackCodec, msgpack
+from src.services.user_service import UserService
+
+
+def build_payloads() -> dict:
+    """Payload'ы в том виде, в каком их кладут в кеш сервисы."""
+    product = SimpleNamespace(
+        id=42, name="Mechanical keyboard", price=89.99, stock_quantity=120
+    )
+    now = datetime.now(timezone.utc)
+    user = SimpleNamespace(
+        id=7,
+        username="alice",
+        email="alice@example.com",
+        full_name="Alice Liddell",
+        is_active=True,
+        created_at=now,
+        updated_at=now,
+    )
+    product_dict = ProductService._product_to_dict(product)
+    user_dict = UserService._user_to_dict(user)
+    return {
+        "product": product_dict,
+        "user": user_dict,
+        "product_page": {"items": [product_dict] * 50},
+    }
+
+
+def build_serializers() -> dict:
+    serializers = {
+        "json (legacy)": None,
+        "json": CacheSerializer(JsonCodec(), compress_threshold=None),
+        "json+zlib": CacheSerializer(JsonCodec(), compress_threshold=1024),
+    }
+    if msgpack is not None:
+        serializers["msgpack"] = CacheSerializer(
+            MsgpackCodec(), compress_threshold=None
+        )
+        serializers["msgpack+zlib"] = CacheSerializer(
+            MsgpackCodec(), compress_threshold=1024
+        )
+    else:
+        print("msgpack не установлен — пропускаем бинарный кодек")
+    return serializers
+
+
+def bench(serializer, value, number: int) -> tuple[int, float, float]:
+    """Размер, время dumps и loads в микросекундах на операцию."""
+    if serializer is None:
+        dumps = lambda: json.dumps(value, default=str)  # noqa: E731
+        data = dumps()
+        loads = lambda: json.loads(data)  # noqa: E731
+    else:
+        dumps = lambda: serializer.dumps(value)  # noqa: E731
+        data = dumps()
+        loads = lambda: serializer.loads(data)  # noqa: E731
+    dump_us = timeit.timeit(dumps, number=number) / number * 1e6
+    load_us = timeit.timeit(loads, number=number) / number * 1e6
+    return len(data), dump_us, load_us
+
+
+def main() -> None:
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    payloads = build_payloads()
+    serializers = build_serializers()
+
+    print(f"{'payload':<14}{'codec':<16}{'bytes':>8}{'dumps, us':>12}{'loads, us':>12}")
+    for payload_name, value in payloads.items():
+        for codec_name, serializer in serializers.items():
+            size, dump_us, load_us = bench(serializer, value, number)
+            print(
+                f"{payload_name:<14}{codec_name:<16}{size:>8}"
+                f"{dump_us:>12.2f}{load_us:>12.2f}"
+            )
+        print()
+
+
+if __name__ == "__main__":
+    main()
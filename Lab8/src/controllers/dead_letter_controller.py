@@ -0,0 +1,66 @@
+from typing import Annotated, Any, Dict
+
+from litestar import Controller, delete, get, post
+from litestar.exceptions import NotFoundException
+from litestar.params import Dependency, Parameter
+
+from src.services.dead_letter_service import DeadLetterService
+
+# Queues whose handlers dead-letter failed messages (src/messaging)
+DEAD_LETTER_QUEUES = ("order", "product")
+
+
+def _check_queue(queue: str) -> None:
+    if queue not in DEAD_LETTER_QUEUES:
+        raise NotFoundException(detail=f"Unknown queue '{queue}'")
+
+
+class DeadLetterController(Controller):
+    path = "/admin/dead-letters"
+    tags = ["Admin"]
+
+    @get("/{queue:str}")
+    async def list_dead_letters(
+        self,
+        dead_letter_service: Annotated[
+            DeadLetterService, Dependency(skip_validation=True)
+        ],
+        queue: str,
+        limit: int = Parameter(default=100, gt=0, le=1000),
+    ) -> Dict[str, Any]:
+        """List failed messages of a queue, oldest first"""
+        _check_queue(queue)
+        return {
+            "queue": queue,
+            "total": await dead_letter_service.count(queue),
+            "items": await dead_letter_service.list(queue, limit),
+        }
+
+    @post("/{queue:str}/{entry_id:str}/replay", status_code=202)
+    async def replay_dead_letter(
+        self,
+        dead_letter_service: Annotated[
+            DeadLetterService, Dependency(skip_validation=True)
+        ],
+        queue: str,
+        entry_id: str,
+    ) -> Dict[str, Any]:
+        """Publish a failed message back to its queue"""
+        _check_queue(queue)
+        if not await dead_letter_service.replay(queue, entry_id):
+            raise NotFoundException(detail=f"Dead letter {entry_id} not found")
+        return {"queue": queue, "replayed": entry_id}
+
+    @delete("/{queue:str}/{entry_id:str}")
+    async def discard_dead_letter(
+        self,
+        dead_letter_service: Annotated[
+            DeadLetterService, Dependency(skip_validation=True)
+        ],
+        queue: str,
+        entry_id: str,
+    ) -> None:
+        """Drop a failed message without replaying it"""
+        _check_queue(queue)
+        if not await dead_letter_service.discard(queue, entry_id):
+            raise NotFoundException(detail=f"Dead letter {entry_id} not found")
@@ -0,0 +1,17 @@
+from litestar import Controller, Response, get
+
+from src.services.cache_metrics import cache_metrics
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class MetricsController(Controller):
+    path = "/metrics"
+    tags = ["Metrics"]
+
+    @get(include_in_schema=False)
+    async def get_metrics(self) -> Response[str]:
+        """Cache metrics of this worker in the Prometheus text format"""
+        return Response(
+            content=cache_metrics.render(), media_type=PROMETHEUS_CONTENT_TYPE
+        )
@@ -1,10 +1,27 @@
-from typing import Annotated
+from datetime import datetime
+from typing import Annotated, Optional
 
-from litestar import Controller, delete, get, patch, post
-from litestar.exceptions import NotFoundException
+from litestar import Controller, Response, delete, get, patch, post
+from litestar.exceptions import HTTPException, NotFoundException
 from litestar.params import Dependency, Parameter
+from litestar.status_codes import HTTP_200_OK, HTTP_201_CREATED, HTTP_202_ACCEPTED
 
-from src.schemas.order import OrderCreate, OrderListResponse, OrderResponse, OrderUpdate
+from src.repositories.unit_of_work import UnitOfWork
+from src.schemas.order import (
+    OrderCancelRequest,
+    OrderCancelResponse,
+    OrderCreate,
+    OrderListResponse,
+    OrderRequestStatus,
+    OrderResponse,
+    OrderUpdate,
+    Status,
+)
+from src.services.idempotency_service import IdempotencyConflict, IdempotencyService
+from src.services.order_request_service import (
+    OrderIntakeUnavailable,
+    OrderRequestService,
+)
 from src.services.order_service import OrderService
 from src.utils.db_error_handler import handle_db_errors
 
@@ -19,10 +36,81 @@ class OrderController(Controller):
         self,
         order_service: Annotated[OrderService, Dependency(skip_validation=True)],
         data: OrderCreate,
-    ) -> OrderResponse:
-        """Create a new order (supports multiple items)"""
-        order = await order_service.create_order(data.model_dump())
-        return OrderResponse.model_validate(order)
+        idempotency_service: Annotated[
+            Optional[IdempotencyService], Dependency(default=None, skip_validation=True)
+        ],
+        unit_of_work: Annotated[
+            Optional[UnitOfWork], Dependency(default=None, skip_validation=True)
+        ],
+        idempotency_key: Optional[str] = Parameter(
+            header="Idempotency-Key", default=None, required=False, max_length=255
+        ),
+    ) -> Response[OrderResponse]:
+        """
+        Create a new order (supports multiple items).
+        Repeating a request with the same Idempotency-Key returns the first
+        response without placing the order again.
+        """
+        payload = data.model_dump()
+
+        async def place_order() -> dict:
+            order = await order_service.create_order(payload)
+            response = OrderResponse.model_validate(order).model_dump(mode="json")
+            # Commit before the response can be stored for replays
+            if unit_of_work is not None:
+                await unit_of_work.commit()
+            return response
+
+        if idempotency_key is None or idempotency_service is None:
+            return Response(await place_order(), status_code=HTTP_201_CREATED)
+
+        try:
+            response, replayed = await idempotency_service.execute(
+                idempotency_key, payload, place_order
+            )
+        except IdempotencyConflict as e:
+            raise HTTPException(status_code=e.status_code, detail=e.detail) from e
+
+        headers = {"Idempotent-Replayed": "true"} if replayed else None
+        return Response(response, status_code=HTTP_201_CREATED, headers=headers)
+
+    @post("/requests", status_code=HTTP_202_ACCEPTED)
+    async def request_order(
+        self,
+        order_request_service: Annotated[
+            OrderRequestService, Dependency(skip_validation=True)
+        ],
+        data: OrderCreate,
+    ) -> Response[OrderRequestStatus]:
+        """
+        Queue an order for placement by the order consumer.
+        Returns 202 with a tracking id; poll GET /orders/requests/{id}.
+        """
+        try:
+            record = await order_request_service.submit(data.model_dump())
+        except OrderIntakeUnavailable as e:
+            raise HTTPException(status_code=e.status_code, detail=e.detail) from e
+        return Response(
+            OrderRequestStatus(**record),
+            status_code=HTTP_202_ACCEPTED,
+            headers={"Location": f"{self.path}/requests/{record['id']}"},
+        )
+
+    @get("/requests/{request_id:str}")
+    async def get_order_request(
+        self,
+        order_request_service: Annotated[
+            OrderRequestService, Dependency(skip_validation=True)
+        ],
+        request_id: str = Parameter(max_length=64),
+    ) -> OrderRequestStatus:
+        """Status of an order queued through POST /orders/requests"""
+        record = await order_request_service.get(request_id)
+        if record is None:
+            raise NotFoundException(
+                detail=f"Order request {request_id} not found or expired"
+            )
+        return OrderRequestStatus(**record)
 
     @get("/{order_id:int}")
     @handle_db_errors
@@ -43,13 +131,46 @@ class OrderController(Controller):
         order_service: Annotated[OrderService, Dependency(skip_validation=True)],
         count: int = Parameter(default=10, gt=0, le=100),
         page: int = Parameter(default=1, gt=0),
+        cursor: Optional[str] = Parameter(
+            default=None,
+            required=False,
+            description="Opaque cursor from next_cursor; replaces page",
+        ),
+        user_id: Optional[int] = Parameter(default=None, gt=0, required=False),
+        status: Optional[Status] = Parameter(default=None, required=False),
+        created_from: Optional[datetime] = Parameter(
+            default=None, required=False, description="Created at or after"
+        ),
+        created_to: Optional[datetime] = Parameter(
+            default=None, required=False, description="Created before"
+        ),
     ) -> OrderListResponse:
-        result = await order_service.get_by_filter(count, page)
+        result = await order_service.get_by_filter(
+            count,
+            page,
+            cursor=cursor,
+            user_id=user_id,
+            status=status,
+            created_from=created_from,
+            created_to=created_to,
+        )
         return OrderListResponse(
             total=result["total"],
             items=[OrderResponse.model_validate(o) for o in result["items"]],
+            next_cursor=result.get("next_cursor"),
         )
 
+    @post("/cancel", status_code=HTTP_200_OK)
+    @handle_db_errors
+    async def cancel_orders(
+        self,
+        order_service: Annotated[OrderService, Dependency(skip_validation=True)],
+        data: OrderCancelRequest,
+    ) -> OrderCancelResponse:
+        """Cancel several orders and return their stock in one transaction"""
+        cancelled = await order_service.cancel_many(data.order_ids)
+        return OrderCancelResponse(cancelled=cancelled)
+
     @patch("/{order_id:int}")
     async def update_order(
         self,
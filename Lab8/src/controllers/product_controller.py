@@ -1,6 +1,6 @@
-from typing import Annotated
+from typing import Annotated, Optional
 
-from litestar import Controller, delete, get, post, put
+from litestar import Controller, MediaType, Response, delete, get, post, put
 from litestar.exceptions import NotFoundException
 from litestar.params import Dependency, Parameter
 
@@ -12,6 +12,7 @@ from src.schemas.product import (
 )
 from src.services.product_service import ProductService
 from src.utils.db_error_handler import handle_db_errors
+from src.utils.response_cache import CACHE_TAGS_OPT
 
 
 class ProductController(Controller):
@@ -24,26 +25,33 @@ class ProductController(Controller):
         self,
         product_service: Annotated[ProductService, Dependency(skip_validation=True)],
         product_id: int = Parameter(gt=0),
-    ) -> ProductResponse:
+    ) -> Response[ProductResponse]:
         """Get product by ID"""
-        product = await product_service.get_by_id(product_id)
-        if not product:
+        body = await product_service.get_json_by_id(product_id)
+        if body is None:
             raise NotFoundException(detail=f"Product with ID {product_id} not found")
-        return ProductResponse.model_validate(product)
+        # Cached body is already a ProductResponse; skip validation and re-encoding
+        return Response(content=body, media_type=MediaType.JSON)
 
-    @get()
+    @get(opt={CACHE_TAGS_OPT: [ProductService.CACHE_TAG]})
     @handle_db_errors
     async def get_all_products(
         self,
         product_service: Annotated[ProductService, Dependency(skip_validation=True)],
         count: int = Parameter(default=10, gt=0, le=100),
         page: int = Parameter(default=1, gt=0),
+        cursor: Optional[str] = Parameter(
+            default=None,
+            required=False,
+            description="Opaque cursor from next_cursor; replaces page",
+        ),
     ) -> ProductListResponse:
         """Get all products with pagination"""
-        result = await product_service.get_by_filter(count, page)
+        result = await product_service.get_by_filter(count, page, cursor=cursor)
         return ProductListResponse(
             total=result["total"],
             items=[ProductResponse.model_validate(p) for p in result["items"]],
+            next_cursor=result.get("next_cursor"),
         )
 
     @post()
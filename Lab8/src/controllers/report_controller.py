@@ -8,6 +8,7 @@ from litestar.exceptions import NotFoundException
 from litestar.status_codes import HTTP_200_OK
 
 from src.services.report_service import ReportService
+from src.utils.response_cache import CACHE_TAGS_OPT
 
 
 class ReportController(Controller):
@@ -24,6 +25,7 @@ class ReportController(Controller):
             "Отчет формируется автоматически из таблиц orders и order_items."
         ),
         status_code=HTTP_200_OK,
+        opt={CACHE_TAGS_OPT: [ReportService.CACHE_TAG]},
     )
     async def get_reports(
         self,
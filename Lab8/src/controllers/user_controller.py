@@ -1,12 +1,13 @@
-from typing import Annotated
+from typing import Annotated, Optional
 
-from litestar import Controller, delete, get, post, put
+from litestar import Controller, MediaType, Response, delete, get, post, put
 from litestar.exceptions import NotFoundException
 from litestar.params import Dependency, Parameter
 
 from src.schemas.user import UserCreate, UserListResponse, UserResponse, UserUpdate
 from src.services.user_service import UserService
 from src.utils.db_error_handler import handle_db_errors
+from src.utils.response_cache import CACHE_TAGS_OPT
 
 
 class UserController(Controller):
@@ -19,26 +20,33 @@ class UserController(Controller):
         self,
         user_service: Annotated[UserService, Dependency(skip_validation=True)],
         user_id: int = Parameter(gt=0),
-    ) -> UserResponse:
+    ) -> Response[UserResponse]:
         """Get user by ID"""
-        user = await user_service.get_by_id(user_id)
-        if not user:
+        body = await user_service.get_json_by_id(user_id)
+        if body is None:
             raise NotFoundException(detail=f"User with ID {user_id} not found")
-        return UserResponse.model_validate(user)
+        # Cached body is already a UserResponse; skip validation and re-encoding
+        return Response(content=body, media_type=MediaType.JSON)
 
-    @get()
+    @get(opt={CACHE_TAGS_OPT: [UserService.CACHE_TAG]})
     @handle_db_errors
     async def get_all_users(
         self,
         user_service: Annotated[UserService, Dependency(skip_validation=True)],
         count: int = Parameter(default=10, gt=0, le=100),
         page: int = Parameter(default=1, gt=0),
+        cursor: Optional[str] = Parameter(
+            default=None,
+            required=False,
+            description="Opaque cursor from next_cursor; replaces page",
+        ),
     ) -> UserListResponse:
         """Get all users"""
-        result = await user_service.get_by_filter(count, page)
+        result = await user_service.get_by_filter(count, page, cursor=cursor)
         return UserListResponse(
             total=result["total"],
             items=[UserResponse.model_validate(user) for user in result["items"]],
+            next_cursor=result.get("next_cursor"),
         )
 
     @post()
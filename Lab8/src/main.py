@@ -6,6 +6,7 @@ from typing import AsyncGenerator
 
 from litestar import Litestar
 from litestar.di import Provide
+from litestar.middleware import DefineMiddleware
 from redis.asyncio import Redis
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
@@ -14,6 +15,8 @@ from sqlalchemy.ext.asyncio import (
     create_async_engine,
 )
 
+from src.controllers.dead_letter_controller import DeadLetterController
+from src.controllers.metrics_controller import MetricsController
 from src.controllers.order_controller import OrderController
 from src.controllers.product_controller import ProductController
 from src.controllers.user_controller import UserController
@@ -24,11 +27,21 @@ from src.repositories.order_repository import OrderRepository
 from src.repositories.product_repository import ProductRepository
 from src.repositories.user_repository import UserRepository
 from src.repositories.report_repository import ReportRepository
-from src.services.cache_service import CacheService
+from src.repositories.unit_of_work import UnitOfWork
+from src.services.cache_service import CacheService, listen_for_invalidations
+from src.services.dead_letter_service import DeadLetterService
+from src.services.idempotency_service import IdempotencyService
+from src.services.local_cache import LocalCache
+from src.services.serializers import create_serializer
+from src.services.order_request_service import OrderRequestService
+from src.services.outbox_relay import OutboxRelay
 from src.services.order_service import OrderService
 from src.services.product_service import ProductService
+from src.services.reservation_service import ReservationService
 from src.services.user_service import UserService
 from src.services.report_service import ReportService
+from src.utils.response_cache import ResponseCacheMiddleware
+from src.utils.retry import RetryPolicy
 
 logger = logging.getLogger(__name__)
 
@@ -41,6 +54,8 @@ class DatabaseConfig:
             "DATABASE_URL", "postgresql+asyncpg://user:superpass@db:5432/db"
         )
         self.echo = True
+        self.pool_size = int(os.getenv("DB_POOL_SIZE", "10"))
+        self.max_overflow = int(os.getenv("DB_MAX_OVERFLOW", "20"))
 
     def create_engine(self) -> AsyncEngine:
         """Создает engine для подключения к БД."""
@@ -48,8 +63,8 @@ class DatabaseConfig:
             self.url,
             echo=self.echo,
             pool_pre_ping=True,
-            pool_size=10,
-            max_overflow=20,
+            pool_size=self.pool_size,
+            max_overflow=self.max_overflow,
         )
 
 
@@ -83,6 +98,53 @@ async_session_maker = async_sessionmaker(
 redis_config = RedisConfig()
 redis_client: Redis = None
 
+# L1-кеш в памяти процесса перед Redis; CACHE_L1_SIZE=0 отключает его
+CACHE_L1_SIZE = int(os.getenv("CACHE_L1_SIZE", "0"))
+CACHE_L1_TTL = float(os.getenv("CACHE_L1_TTL", "5"))
+local_cache: LocalCache | None = (
+    LocalCache(CACHE_L1_SIZE, CACHE_L1_TTL, prefixes=("product:", "user:"))
+    if CACHE_L1_SIZE > 0
+    else None
+)
+
+# Кодек значений в Redis (json или msgpack) и порог сжатия в байтах
+cache_serializer = create_serializer(
+    os.getenv("CACHE_CODEC", "json"),
+    compress_threshold=int(os.getenv("CACHE_COMPRESS_THRESHOLD", "1024")),
+)
+
+# Режим "сначала резерв в Redis, потом запись в БД" для оформления заказов
+ORDER_RESERVE_FIRST = os.getenv("ORDER_RESERVE_FIRST", "0") == "1"
+RESERVATION_TTL = int(os.getenv("RESERVATION_TTL", "900"))
+
+# Пакетная обработка очередей order/product: до MESSAGE_BATCH_SIZE сообщений
+# или MESSAGE_BATCH_WAIT_MS мс на одну транзакцию; 1 - по одному сообщению
+MESSAGE_BATCH_SIZE = int(os.getenv("MESSAGE_BATCH_SIZE", "1"))
+MESSAGE_BATCH_WAIT_MS = int(os.getenv("MESSAGE_BATCH_WAIT_MS", "50"))
+
+# Обработчик очереди (или пачка) держит одно соединение из пула, поэтому
+# одновременно их не больше, чем соединений в пуле. Лимиты каждой очереди:
+# {QUEUE}_MAX_IN_FLIGHT и {QUEUE}_PREFETCH_COUNT (см. ConsumerLimits)
+CONSUMER_MAX_IN_FLIGHT = int(os.getenv("CONSUMER_MAX_IN_FLIGHT", "10"))
+db_connection_slots = asyncio.Semaphore(db_config.pool_size + db_config.max_overflow)
+
+# Повтор сообщений при временных ошибках: не больше MESSAGE_MAX_ATTEMPTS
+# доставок, задержка MESSAGE_RETRY_DELAY_MS * 2^(n-1) мс после n-й попытки
+message_retry_policy = RetryPolicy(
+    max_attempts=int(os.getenv("MESSAGE_MAX_ATTEMPTS", "5")),
+    base_delay_ms=int(os.getenv("MESSAGE_RETRY_DELAY_MS", "1000")),
+)
+
+# Пересылка событий из таблицы outbox в RabbitMQ (exchange "events"):
+# OUTBOX_BATCH_SIZE событий за транзакцию, опрос раз в OUTBOX_POLL_INTERVAL с.
+# Несколько процессов делят таблицу через SKIP LOCKED; OUTBOX_RELAY=0 отключает
+OUTBOX_RELAY = os.getenv("OUTBOX_RELAY", "1") == "1"
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "100"))
+OUTBOX_POLL_INTERVAL = float(os.getenv("OUTBOX_POLL_INTERVAL", "1"))
+
+# TTL кеша ответов списков (/products, /users, /report) в секундах; 0 отключает
+RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", "30"))
+
 
 async def provide_db_session() -> AsyncGenerator[AsyncSession, None]:
     """Провайдер сессии базы данных."""
@@ -93,24 +155,80 @@ async def provide_db_session() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
+async def provide_unit_of_work() -> AsyncGenerator[UnitOfWork, None]:
+    """Провайдер единицы работы: один commit на запрос, rollback при ошибке."""
+    async with async_session_maker() as session:
+        async with UnitOfWork(session) as unit_of_work:
+            yield unit_of_work
+
+
+def create_cache_service() -> CacheService:
+    """
+    Создает сервис кеширования на текущем клиенте Redis.
+    Клиент создается в lifespan, поэтому его нельзя импортировать напрямую.
+    """
+    return CacheService(redis_client, local_cache, cache_serializer)
+
+
+def create_dead_letter_service() -> DeadLetterService:
+    """Создает хранилище dead letters; replay публикует через FastStream брокер."""
+    return DeadLetterService(redis_client, faststream_broker.publish)
+
+
+async def provide_dead_letter_service() -> DeadLetterService:
+    """Провайдер хранилища dead letters."""
+    return create_dead_letter_service()
+
+
+def create_order_request_service() -> OrderRequestService:
+    """Создает сервис асинхронного приема заказов через очередь order."""
+    return OrderRequestService(create_cache_service(), faststream_broker.publish)
+
+
+async def provide_order_request_service(
+    cache_service: CacheService,
+) -> OrderRequestService:
+    """Провайдер сервиса асинхронного приема заказов."""
+    return OrderRequestService(cache_service, faststream_broker.publish)
+
+
 async def provide_cache_service() -> CacheService:
     """Провайдер сервиса кеширования."""
-    return CacheService(redis_client)
+    return create_cache_service()
 
 
-async def provide_user_repository(db_session: AsyncSession) -> UserRepository:
+async def provide_idempotency_service(
+    cache_service: CacheService,
+) -> IdempotencyService:
+    """Провайдер сервиса идемпотентности (заголовок Idempotency-Key)."""
+    return IdempotencyService(cache_service)
+
+
+def create_reservation_service() -> ReservationService | None:
+    """Создает сервис резервирования (только в режиме ORDER_RESERVE_FIRST)."""
+    if not ORDER_RESERVE_FIRST:
+        return None
+    return ReservationService(redis_client, ttl=RESERVATION_TTL)
+
+
+async def provide_reservation_service() -> ReservationService | None:
+    """Провайдер сервиса резервирования (только в режиме ORDER_RESERVE_FIRST)."""
+    return create_reservation_service()
+
+
+async def provide_user_repository(unit_of_work: UnitOfWork) -> UserRepository:
     """Провайдер репозитория пользователей."""
-    return UserRepository(db_session)
+    return UserRepository(unit_of_work.session)
 
 
-async def provide_product_repository(db_session: AsyncSession) -> ProductRepository:
+async def provide_product_repository(unit_of_work: UnitOfWork) -> ProductRepository:
     """Провайдер репозитория продуктов."""
-    return ProductRepository(db_session)
+    return ProductRepository(unit_of_work.session)
 
 
-async def provide_order_repository(db_session: AsyncSession) -> OrderRepository:
+async def provide_order_repository(unit_of_work: UnitOfWork) -> OrderRepository:
     """Провайдер репозитория заказов."""
-    return OrderRepository(db_session)
+    return OrderRepository(unit_of_work.session)
 
 
 async def provide_report_repository(db_session: AsyncSession) -> ReportRepository:
@@ -119,26 +237,43 @@ async def provide_report_repository(db_session: AsyncSession) -> ReportRepositor
 
 
 async def provide_user_service(
-    user_repository: UserRepository, cache_service: CacheService
+    user_repository: UserRepository,
+    cache_service: CacheService,
+    unit_of_work: UnitOfWork,
 ) -> UserService:
     """Провайдер сервиса пользователей."""
-    return UserService(user_repository, cache_service)
+    return UserService(user_repository, cache_service, unit_of_work)
 
 
 async def provide_product_service(
-    product_repository: ProductRepository, cache_service: CacheService
+    product_repository: ProductRepository,
+    cache_service: CacheService,
+    unit_of_work: UnitOfWork,
+    reservation_service: ReservationService | None,
 ) -> ProductService:
     """Провайдер сервиса продуктов."""
-    return ProductService(product_repository, cache_service)
+    return ProductService(
+        product_repository, cache_service, unit_of_work, reservation_service
+    )
 
 
 async def provide_order_service(
     order_repository: OrderRepository,
     product_repository: ProductRepository,
     user_repository: UserRepository,
+    reservation_service: ReservationService | None,
+    cache_service: CacheService,
+    unit_of_work: UnitOfWork,
 ) -> OrderService:
     """Провайдер сервиса заказов."""
-    return OrderService(order_repository, product_repository, user_repository)
+    return OrderService(
+        order_repository,
+        product_repository,
+        user_repository,
+        reservation_service,
+        cache_service=cache_service,
+        unit_of_work=unit_of_work,
+    )
 
 
 async def provide_report_service(
@@ -177,6 +312,17 @@ async def _faststream_broker_connect(shutdown_event: asyncio.Event) -> None:
                 raise
 
 
+async def _outbox_relay_run(shutdown_event: asyncio.Event) -> None:
+    """Фоновая пересылка событий outbox через FastStream брокер."""
+    from src.messaging.events import OutboxPublisher
+
+    relay = OutboxRelay(
+        async_session_maker, OutboxPublisher(), batch_size=OUTBOX_BATCH_SIZE
+    )
+    logger.info("Outbox relay started")
+    await relay.run(shutdown_event, interval=OUTBOX_POLL_INTERVAL)
+
+
 async def _taskiq_worker_run(shutdown_event: asyncio.Event) -> None:
     """Запуск Taskiq worker для выполнения задач."""
     max_retries = 10
@@ -186,7 +332,7 @@ async def _taskiq_worker_run(shutdown_event: asyncio.Event) -> None:
         try:
             logger.info(f"Starting Taskiq worker (attempt {attempt + 1}/{max_retries})...")
             
-            from src.messaging.tasks import report  # noqa: F401
+            from src.messaging.tasks import report, reservation  # noqa: F401
             
             await taskiq_broker.startup()
             logger.info("Taskiq broker started successfully")
@@ -225,7 +371,7 @@ async def lifespan(app: Litestar):
 
     try:
         from src.messaging import order, product  # noqa: F401
-        from src.messaging.tasks import report  # noqa: F401
+        from src.messaging.tasks import report, reservation  # noqa: F401
         logger.info("Message handlers and tasks imported successfully")
     except Exception as e:
         logger.error(f"Failed to import handlers/tasks: {e}")
@@ -235,6 +381,17 @@ async def lifespan(app: Litestar):
 
     faststream_task = asyncio.create_task(_faststream_broker_connect(shutdown_event))
 
+    # Событие не публикуется в обработчике запроса: его отправит relay
+    outbox_task = None
+    if OUTBOX_RELAY:
+        outbox_task = asyncio.create_task(_outbox_relay_run(shutdown_event))
+
+    invalidation_task = None
+    if local_cache is not None:
+        invalidation_task = asyncio.create_task(
+            listen_for_invalidations(redis_client, local_cache, shutdown_event)
+        )
+
     start_taskiq_in_this_process = os.getenv("START_TASKIQ_WORKER", "0") == "1"
     
     taskiq_task = None
@@ -253,7 +410,12 @@ async def lifespan(app: Litestar):
         logger.info("Starting shutdown sequence...")
         shutdown_event.set()
 
-        for task, name in [(faststream_task, "FastStream"), (taskiq_task, "Taskiq")]:
+        for task, name in [
+            (faststream_task, "FastStream"),
+            (outbox_task, "Outbox relay"),
+            (taskiq_task, "Taskiq"),
+            (invalidation_task, "Cache invalidation"),
+        ]:
             if task is None:
                 continue
             task.cancel()
@@ -279,18 +441,34 @@ async def lifespan(app: Litestar):
 
 def create_app() -> Litestar:
     """Фабрика для создания приложения Litestar."""
+    middleware = []
+    if RESPONSE_CACHE_TTL > 0:
+        middleware.append(
+            DefineMiddleware(
+                ResponseCacheMiddleware,
+                cache_factory=create_cache_service,
+                ttl=RESPONSE_CACHE_TTL,
+            )
+        )
+
     return Litestar(
         route_handlers=[
             UserController,
             ProductController,
             OrderController,
             ReportController,
+            MetricsController,
+            DeadLetterController,
         ],
         dependencies={
             # Database
             "db_session": Provide(provide_db_session),
+            "unit_of_work": Provide(provide_unit_of_work),
             # Cache
             "cache_service": Provide(provide_cache_service),
+            "idempotency_service": Provide(provide_idempotency_service),
+            "reservation_service": Provide(provide_reservation_service),
+            "dead_letter_service": Provide(provide_dead_letter_service),
             # Repositories
             "user_repository": Provide(provide_user_repository),
             "product_repository": Provide(provide_product_repository),
@@ -300,8 +478,10 @@ def create_app() -> Litestar:
             "user_service": Provide(provide_user_service),
             "product_service": Provide(provide_product_service),
             "order_service": Provide(provide_order_service),
+            "order_request_service": Provide(provide_order_request_service),
             "report_service": Provide(provide_report_service),
         },
+        middleware=middleware,
         lifespan=[lifespan],
         debug=True,
     )
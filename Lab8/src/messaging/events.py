@@ -0,0 +1,44 @@
+from faststream.rabbit import ExchangeType, RabbitExchange
+
+from src.messaging.broker import broker
+from src.models.outbox import OutboxEvent
+
+# Topic exchange доменных событий; routing key - тип события
+# (order.created, product.stock_changed, ...), потребители привязывают
+# свои очереди по шаблону, например "order.*"
+events_exchange = RabbitExchange("events", type=ExchangeType.TOPIC, durable=True)
+
+
+class OutboxPublisher:
+    """
+    Публикует события из outbox в exchange events.
+    Exchange объявляется один раз, перед первой публикацией.
+    """
+
+    def __init__(self, exchange: RabbitExchange = events_exchange):
+        self.exchange = exchange
+        self._exchange_declared = False
+
+    async def __call__(self, event: OutboxEvent) -> None:
+        """
+        Опубликовать событие из outbox.
+
+        message_id равен id строки outbox: при повторной доставке
+        (at-least-once) потребитель может отбросить дубликат.
+        """
+        if not self._exchange_declared:
+            await broker.declare_exchange(self.exchange)
+            self._exchange_declared = True
+
+        await broker.publish(
+            event.payload,
+            exchange=self.exchange,
+            routing_key=event.event_type,
+            message_id=str(event.id),
+            headers={
+                "event_type": event.event_type,
+                "aggregate_type": event.aggregate_type,
+                "aggregate_id": event.aggregate_id,
+            },
+            persist=True,
+        )
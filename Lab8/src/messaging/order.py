@@ -1,21 +1,47 @@
 import logging
-from typing import Dict
-
-from faststream.rabbit import RabbitQueue
-
-from src.main import async_session_maker
+from typing import Dict, List, Optional, Tuple
+
+from faststream.rabbit import Channel, RabbitQueue
+from faststream.rabbit.annotations import RabbitMessage
+
+from src.main import (
+    CONSUMER_MAX_IN_FLIGHT,
+    MESSAGE_BATCH_SIZE,
+    MESSAGE_BATCH_WAIT_MS,
+    async_session_maker,
+    create_cache_service,
+    create_order_request_service,
+    create_reservation_service,
+    db_connection_slots,
+)
 from src.messaging.broker import broker
+from src.messaging.retry import handle_failure
+from src.models.order import Order
 from src.repositories.order_repository import OrderRepository
 from src.repositories.product_repository import ProductRepository
+from src.repositories.unit_of_work import UnitOfWork
 from src.repositories.user_repository import UserRepository
 from src.schemas.order import OrderCreate, OrderUpdate
 from src.services.order_service import OrderService
+from src.utils.batching import MessageBatcher
+from src.utils.concurrency import ConsumerLimits
 
 logger = logging.getLogger(__name__)
 
+# Ожидающие пачки сообщения тоже заняты в обработке, поэтому лимит по
+# умолчанию не меньше размера пачки
+order_limits = ConsumerLimits.from_env(
+    "order",
+    max_in_flight=max(CONSUMER_MAX_IN_FLIGHT, MESSAGE_BATCH_SIZE),
+    db_slots=db_connection_slots,
+)
+
 
-@broker.subscriber(RabbitQueue("order", durable=True))
-async def subscribe_order(message: Dict):
+@broker.subscriber(
+    queue=RabbitQueue("order", durable=True),
+    channel=Channel(prefetch_count=order_limits.prefetch_count),
+)
+async def subscribe_order(message: Dict, raw_message: RabbitMessage):
     """
     Обработчик очереди 'order'.
 
@@ -23,32 +49,84 @@ async def subscribe_order(message: Dict):
     - create: создание нового заказа с несколькими позициями
     - update_status: обновление статуса заказа
     - update: полное обновление заказа (статус + позиции)
+
+    Все изменения сообщения фиксируются одним commit.
+    Кеш затронутых заказов и списков сбрасывает OrderService.
+    При MESSAGE_BATCH_SIZE > 1 сообщения обрабатываются пачками
+    (см. process_order_batch). Упавшее сообщение повторяется с задержкой
+    или уходит в dead letters (см. handle_failure).
+    Сообщения из POST /orders/requests несут request_id: его статус
+    обновляется после commit или при отправке в dead letters.
     """
-    async with async_session_maker() as session:
-        try:
-            action = message.get("action")
-            data = message.get("data", {})
-
-            order_repo = OrderRepository(session)
-            product_repo = ProductRepository(session)
-            user_repo = UserRepository(session)
-            order_service = OrderService(order_repo, product_repo, user_repo)
-
-            if action == "create":
-                await handle_order_create(order_service, data)
-            elif action == "update_status":
-                await handle_order_update_status(order_service, data)
-            elif action == "update":
-                await handle_order_update(order_service, data)
+    try:
+        async with order_limits.handler():
+            if order_batcher is not None:
+                await order_batcher.submit(message)
             else:
-                logger.error(f"Unknown action for order queue: {action}")
-
-        except Exception as e:
-            logger.exception(f"Error processing order message: {e}")
-            raise
-
-
-async def handle_order_create(service: OrderService, data: Dict):
+                await process_order_batch([message])
+    except Exception as e:
+        logger.exception(f"Error processing order message: {e}")
+        retried = await handle_failure("order", message, raw_message.headers, e)
+        if not retried and message.get("request_id"):
+            await create_order_request_service().mark_failed(message["request_id"], e)
+
+
+async def process_order_batch(messages: List[Dict]):
+    """Обработать пачку сообщений в одной сессии и одной транзакции."""
+    # (request_id, order_id) созданных заказов из POST /orders/requests
+    completed: List[Tuple[str, int]] = []
+    async with order_limits.connection(), async_session_maker() as session:
+        async with UnitOfWork(session) as uow:
+            order_repo = OrderRepository(uow.session)
+            product_repo = ProductRepository(uow.session)
+            user_repo = UserRepository(uow.session)
+            order_service = OrderService(
+                order_repo,
+                product_repo,
+                user_repo,
+                create_reservation_service(),
+                cache_service=create_cache_service(),
+                unit_of_work=uow,
+            )
+
+            for message in messages:
+                order = await dispatch_order_message(order_service, message)
+                if order is not None and message.get("request_id"):
+                    completed.append((message["request_id"], order.id))
+
+    # Клиент видит заказ только после commit
+    if completed:
+        await create_order_request_service().mark_completed(completed)
+
+
+async def dispatch_order_message(
+    service: OrderService, message: Dict
+) -> Optional[Order]:
+    """Выполнить операцию одного сообщения и вернуть затронутый заказ."""
+    action = message.get("action")
+    # Копия: обработчики извлекают поля, а сообщение может повторяться
+    data = dict(message.get("data", {}))
+
+    if action == "create":
+        return await handle_order_create(service, data)
+    if action == "update_status":
+        return await handle_order_update_status(service, data)
+    if action == "update":
+        return await handle_order_update(service, data)
+    logger.error(f"Unknown action for order queue: {action}")
+    return None
+
+
+order_batcher: MessageBatcher[Dict] | None = (
+    MessageBatcher(
+        process_order_batch, MESSAGE_BATCH_SIZE, MESSAGE_BATCH_WAIT_MS / 1000
+    )
+    if MESSAGE_BATCH_SIZE > 1
+    else None
+)
+
+
+async def handle_order_create(service: OrderService, data: Dict) -> Order:
     """
     Создание нового заказа с несколькими позициями.
 
@@ -63,6 +141,7 @@ async def handle_order_create(service: OrderService, data: Dict):
             f"Order created: ID={order.id}, user_id={order.user_id}, "
             f"total={order.total_amount}, items_count={len(order.items)}"
         )
+        return order
     except ValueError as e:
         logger.error(f"Business logic error while creating order: {e}")
         raise
@@ -71,7 +150,7 @@ async def handle_order_create(service: OrderService, data: Dict):
         raise
 
 
-async def handle_order_update_status(service: OrderService, data: Dict):
+async def handle_order_update_status(service: OrderService, data: Dict) -> Order:
     """
     Обновление статуса заказа.
 
@@ -90,6 +169,7 @@ async def handle_order_update_status(service: OrderService, data: Dict):
         order = await service.update(order_id, update_data)
 
         logger.info(f"Order status updated: ID={order.id}, new_status={order.status}")
+        return order
     except ValueError as e:
         logger.error(f"Business logic error while updating order status: {e}")
         raise
@@ -98,7 +178,7 @@ async def handle_order_update_status(service: OrderService, data: Dict):
         raise
 
 
-async def handle_order_update(service: OrderService, data: Dict):
+async def handle_order_update(service: OrderService, data: Dict) -> Order:
     """
     Полное обновление заказа (статус и/или позиции).
     """
@@ -117,6 +197,7 @@ async def handle_order_update(service: OrderService, data: Dict):
             f"Order updated: ID={order.id}, status={order.status}, "
             f"items_count={len(order.items)}"
         )
+        return order
     except ValueError as e:
         logger.error(f"Business logic error while updating order: {e}")
         raise
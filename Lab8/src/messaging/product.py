@@ -1,20 +1,43 @@
 import logging
-from typing import Dict
-
-from faststream.rabbit import RabbitQueue
-
-from src.main import async_session_maker, redis_client
+from typing import Dict, List
+
+from faststream.rabbit import Channel, RabbitQueue
+from faststream.rabbit.annotations import RabbitMessage
+
+from src.main import (
+    CONSUMER_MAX_IN_FLIGHT,
+    MESSAGE_BATCH_SIZE,
+    MESSAGE_BATCH_WAIT_MS,
+    async_session_maker,
+    create_cache_service,
+    create_reservation_service,
+    db_connection_slots,
+)
 from src.messaging.broker import broker
+from src.messaging.retry import handle_failure
 from src.repositories.product_repository import ProductRepository
+from src.repositories.unit_of_work import UnitOfWork
 from src.schemas.product import ProductCreate, ProductUpdate
 from src.services.product_service import ProductService
-from src.services.cache_service import CacheService
+from src.utils.batching import MessageBatcher
+from src.utils.concurrency import ConsumerLimits
 
 logger = logging.getLogger(__name__)
 
+# Ожидающие пачки сообщения тоже заняты в обработке, поэтому лимит по
+# умолчанию не меньше размера пачки
+product_limits = ConsumerLimits.from_env(
+    "product",
+    max_in_flight=max(CONSUMER_MAX_IN_FLIGHT, MESSAGE_BATCH_SIZE),
+    db_slots=db_connection_slots,
+)
 
-@broker.subscriber(queue=RabbitQueue("product", durable=True))
-async def subscribe_product(message: Dict):
+
+@broker.subscriber(
+    queue=RabbitQueue("product", durable=True),
+    channel=Channel(prefetch_count=product_limits.prefetch_count),
+)
+async def subscribe_product(message: Dict, raw_message: RabbitMessage):
     """
     Обработчик очереди 'product'.
 
@@ -22,28 +45,64 @@ async def subscribe_product(message: Dict):
     - create: создание нового продукта
     - update: обновление существующего продукта
     - mark_out_of_stock: пометить продукт как закончившийся
+
+    При MESSAGE_BATCH_SIZE > 1 сообщения обрабатываются пачками
+    (см. process_product_batch), иначе каждое в своей транзакции.
+    Упавшее сообщение повторяется с задержкой или уходит в dead letters
+    (см. handle_failure).
     """
-    async with async_session_maker() as session:
-        try:
-            action = message.get("action")
-            data = message.get("data", {})
-
-            product_repo = ProductRepository(session)
-            cache_service = CacheService(redis_client)
-            product_service = ProductService(product_repo, cache_service)
-
-            if action == "create":
-                await handle_product_create(product_service, data)
-            elif action == "update":
-                await handle_product_update(product_service, data)
-            elif action == "mark_out_of_stock":
-                await handle_product_mark_out_of_stock(product_service, data)
+    try:
+        async with product_limits.handler():
+            if product_batcher is not None:
+                await product_batcher.submit(message)
             else:
-                logger.error(f"Unknown action for product queue: {action}")
-
-        except Exception as e:
-            logger.exception(f"Error processing product message: {e}")
-            raise
+                await process_product_batch([message])
+    except Exception as e:
+        logger.exception(f"Error processing product message: {e}")
+        await handle_failure("product", message, raw_message.headers, e)
+
+
+async def process_product_batch(messages: List[Dict]):
+    """Обработать пачку сообщений в одной сессии и одной транзакции."""
+    async with product_limits.connection(), async_session_maker() as session:
+        async with UnitOfWork(session) as uow:
+            product_repo = ProductRepository(uow.session)
+            cache_service = create_cache_service()
+            # Кеш обновляется только после commit всей пачки
+            product_service = ProductService(
+                product_repo,
+                cache_service,
+                uow,
+                create_reservation_service(),
+            )
+
+            for message in messages:
+                await dispatch_product_message(product_service, message)
+
+
+async def dispatch_product_message(service: ProductService, message: Dict):
+    """Выполнить операцию одного сообщения."""
+    action = message.get("action")
+    # Копия: обработчики извлекают поля, а сообщение может повторяться
+    data = dict(message.get("data", {}))
+
+    if action == "create":
+        await handle_product_create(service, data)
+    elif action == "update":
+        await handle_product_update(service, data)
+    elif action == "mark_out_of_stock":
+        await handle_product_mark_out_of_stock(service, data)
+    else:
+        logger.error(f"Unknown action for product queue: {action}")
+
+
+product_batcher: MessageBatcher[Dict] | None = (
+    MessageBatcher(
+        process_product_batch, MESSAGE_BATCH_SIZE, MESSAGE_BATCH_WAIT_MS / 1000
+    )
+    if MESSAGE_BATCH_SIZE > 1
+    else None
+)
 
 
 async def handle_product_create(service: ProductService, data: Dict):
@@ -0,0 +1,81 @@
+import logging
+from typing import Any, Dict, Set
+
+from faststream.rabbit import RabbitQueue
+
+from src.main import create_dead_letter_service, message_retry_policy
+from src.messaging.broker import broker
+
+logger = logging.getLogger(__name__)
+
+# Номер доставки сообщения; первая доставка заголовка не имеет
+ATTEMPT_HEADER = "x-attempt"
+
+_declared_queues: Set[str] = set()
+
+
+def retry_queue(queue: str, attempt: int) -> RabbitQueue:
+    """
+    Очередь задержки перед следующей попыткой.
+
+    Сообщение лежит в ней x-message-ttl миллисекунд, после чего RabbitMQ
+    через default exchange (x-dead-letter-*) возвращает его в исходную
+    очередь. Задержка входит в имя, поэтому смена MESSAGE_RETRY_DELAY_MS
+    не конфликтует с уже объявленными очередями.
+    """
+    delay_ms = message_retry_policy.delay_ms(attempt)
+    return RabbitQueue(
+        f"{queue}.retry.{delay_ms}ms",
+        durable=True,
+        arguments={
+            "x-message-ttl": delay_ms,
+            "x-dead-letter-exchange": "",
+            "x-dead-letter-routing-key": queue,
+        },
+    )
+
+
+async def handle_failure(
+    queue: str, message: Any, headers: Dict[str, Any], error: Exception
+) -> bool:
+    """
+    Решить судьбу сообщения, обработка которого завершилась ошибкой.
+
+    Временные ошибки (БД или Redis недоступны, конфликт блокировок)
+    повторяются через очередь задержки с экспоненциальным backoff, пока не
+    исчерпан MESSAGE_MAX_ATTEMPTS. Бизнес-ошибки (ValueError) и все прочие
+    сразу попадают в хранилище dead letters (см. DeadLetterService).
+    После возврата исходное сообщение подтверждается (ack); если не удалось
+    ни отложить, ни сохранить его, исключение пробрасывается брокеру.
+
+    Returns:
+        bool: True, если сообщение будет доставлено повторно
+    """
+    attempt = int(headers.get(ATTEMPT_HEADER, 1))
+
+    if message_retry_policy.should_retry(error, attempt):
+        delay_queue = retry_queue(queue, attempt)
+        if delay_queue.name not in _declared_queues:
+            await broker.declare_queue(delay_queue)
+            _declared_queues.add(delay_queue.name)
+        await broker.publish(
+            message, queue=delay_queue, headers={ATTEMPT_HEADER: attempt + 1}
+        )
+        logger.warning(
+            "Message from '%s' failed (attempt %s), retrying via %s: %r",
+            queue,
+            attempt,
+            delay_queue.name,
+            error,
+        )
+        return True
+
+    entry_id = await create_dead_letter_service().add(queue, message, error, attempt)
+    logger.error(
+        "Message from '%s' dead-lettered as %s after %s attempt(s): %r",
+        queue,
+        entry_id,
+        attempt,
+        error,
+    )
+    return False
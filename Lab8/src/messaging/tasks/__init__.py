@@ -1,3 +1,3 @@
-from src.messaging.tasks import report
+from src.messaging.tasks import report, reservation
 
-__all__ = ["report"]
+__all__ = ["report", "reservation"]
@@ -0,0 +1,96 @@
+import logging
+from datetime import datetime, timedelta, timezone
+
+from src.messaging.taskiq_broker import taskiq_broker
+from src.repositories.product_repository import ProductRepository
+from src.repositories.reservation_repository import ReservationRepository
+from src.repositories.unit_of_work import UnitOfWork
+from src.services.cache_service import CacheService
+from src.services.product_service import ProductService
+from src.services.reservation_service import ReservationService
+
+logger = logging.getLogger(__name__)
+
+
+@taskiq_broker.task(
+    schedule=[
+        {
+            "cron": "* * * * *",  # Каждую минуту
+            "schedule_id": "release_expired_reservations",
+        }
+    ]
+)
+async def release_expired_reservations() -> int:
+    """Возвращает в остатки резервы, срок которых истек."""
+    from src.main import redis_config
+
+    redis_client = redis_config.create_client()
+    try:
+        released = await ReservationService(redis_client).release_expired()
+        if released:
+            logger.info("Released %s expired reservations", released)
+        return released
+    finally:
+        await redis_client.close()
+
+
+@taskiq_broker.task(
+    schedule=[
+        {
+            "cron": "* * * * *",  # Каждую минуту
+            "schedule_id": "reconcile_reservations",
+        }
+    ]
+)
+async def reconcile_reservations(batch_size: int = 500) -> int:
+    """
+    Переносит подтвержденные резервы из Redis в таблицу products пачками.
+    Пачка удаляется из очереди только после успешного commit; резервы,
+    которые не удалось применить, возвращаются в конец очереди.
+    Примененные строки записываются в той же транзакции, поэтому пачка,
+    оставшаяся в очереди после сбоя, не списывается повторно.
+    """
+    from src.main import async_session_maker, redis_config
+
+    redis_client = redis_config.create_client()
+    reservations = ReservationService(redis_client)
+    reconciled = 0
+    changed = set()
+    try:
+        async with reservations.reconcile_lock() as acquired:
+            if not acquired:
+                logger.info("Reconciliation is already running, skipping")
+                return 0
+            while True:
+                async with async_session_maker() as session:
+                    async with UnitOfWork(session) as uow:
+                        batch, requeue, updated = await reservations.reconcile(
+                            ProductRepository(uow.session),
+                            ReservationRepository(uow.session),
+                            batch_size,
+                        )
+                if not batch:
+                    break
+                await reservations.acknowledge(batch, requeue)
+                reconciled += len(batch) - len(requeue)
+                changed.update(updated)
+                if len(requeue) == len(batch):
+                    # В очереди остались только отложенные резервы: до следующего запуска
+                    break
+            # Записи нужны, только пока пачка может остаться в очереди
+            async with async_session_maker() as session:
+                async with UnitOfWork(session) as uow:
+                    await ReservationRepository(uow.session).prune_applied(
+                        datetime.now(timezone.utc).replace(tzinfo=None)
+                        - timedelta(days=1)
+                    )
+        if reconciled:
+            logger.info("Reconciled %s reservations", reconciled)
+        if changed:
+            # Остатки в таблице products изменились: сбросить кеш товаров и их списка
+            cache = CacheService(redis_client)
+            await cache.delete_many(ProductService.cache_keys(sorted(changed)))
+            await cache.invalidate_namespace(ProductService.CACHE_TAG)
+        return reconciled
+    finally:
+        await redis_client.close()
@@ -0,0 +1,21 @@
+from sqlalchemy import JSON, Column, DateTime, Integer, String
+from sqlalchemy.sql import func
+
+from src.models.base import Base
+
+
+class OutboxEvent(Base):
+    """
+    Domain event written in the same transaction as the change it describes.
+    Rows are published to RabbitMQ by OutboxRelay and deleted afterwards,
+    so the table only holds events that are not delivered yet.
+    """
+
+    __tablename__ = "outbox"
+
+    id = Column(Integer, primary_key=True)
+    aggregate_type = Column(String(50), nullable=False)
+    aggregate_id = Column(Integer, nullable=True)
+    event_type = Column(String(100), nullable=False)
+    payload = Column(JSON, nullable=False)
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
@@ -11,5 +11,10 @@ class Product(Base):
     name = Column(String, nullable=False)
     price = Column(Float, nullable=False)
     stock_quantity = Column(Integer, nullable=False, default=0)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
 
     order_items = relationship("OrderItem", back_populates="product")
+
+    # Every ORM UPDATE checks and bumps the version, so concurrent
+    # read-modify-write cycles raise StaleDataError instead of losing writes
+    __mapper_args__ = {"version_id_col": version}
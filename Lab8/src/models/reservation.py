@@ -0,0 +1,19 @@
+from sqlalchemy import Column, DateTime, Integer, String
+from sqlalchemy.sql import func
+
+from src.models.base import Base
+
+
+class AppliedReservationLine(Base):
+    """
+    A confirmed hold line that reconciliation already subtracted from the
+    products table. It is written in the same transaction as the UPDATE, so
+    a batch replayed after a crash (or by an overlapping run) skips it
+    instead of decrementing stock twice.
+    """
+
+    __tablename__ = "applied_reservation_lines"
+
+    reservation_id = Column(String(32), primary_key=True)
+    product_id = Column(Integer, primary_key=True)
+    applied_at = Column(DateTime, nullable=False, server_default=func.now())
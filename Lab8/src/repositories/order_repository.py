@@ -1,47 +1,95 @@
+from datetime import datetime
 from typing import Dict, List, Optional, Tuple
 
-from sqlalchemy import select
+from sqlalchemy import case, delete, func, insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from src.models.order import Order, OrderItem
 from src.models.product import Product
 from src.models.user import User
+from src.repositories.outbox_repository import OutboxRepository
+
+
+def order_event_payload(order: Order) -> Dict:
+    return {
+        "order_id": order.id,
+        "user_id": order.user_id,
+        "status": order.status,
+        "total_amount": float(order.total_amount),
+        "items": [
+            {
+                "product_id": item.product_id,
+                "quantity": item.quantity,
+                "unit_price": float(item.unit_price),
+            }
+            for item in order.items
+        ],
+    }
 
 
 class OrderRepository:
+    """
+    Every mutation also stages an `order.*` event in the outbox, so the
+    event is committed (or rolled back) together with the change.
+    """
+
     def __init__(self, session: AsyncSession):
         self.session = session
+        self.outbox = OutboxRepository(session)
+
+    def _emit(self, event_type: str, payload: Dict, order_id: int) -> None:
+        self.outbox.add("order", f"order.{event_type}", payload, order_id)
 
-    async def create(self, user_id: int, items: List[Dict]) -> Order:
+    async def create(
+        self,
+        user_id: int,
+        items: List[Dict],
+        prices: Optional[Dict[int, float]] = None,
+    ) -> Order:
+        """
+        Insert an order and all of its items.
+
+        `prices` maps product_id to unit price; when the caller has already
+        loaded the products it is passed in and no product query is issued.
+        Items are written with one multi-row INSERT.
+        """
         user = await self.session.get(User, user_id)
         if not user:
             raise ValueError(f"User {user_id} not found")
 
-        order = Order(user_id=user_id, status="pending", total_amount=0)
+        product_ids = {int(it["product_id"]) for it in items}
+        if prices is None:
+            res = await self.session.execute(
+                select(Product.id, Product.price).where(Product.id.in_(product_ids))
+            )
+            prices = {row.id: float(row.price) for row in res}
+
+        missing = sorted(product_ids - prices.keys())
+        if missing:
+            raise ValueError(f"Product {missing[0]} not found")
+
+        rows = [
+            {
+                "product_id": int(it["product_id"]),
+                "quantity": int(it["quantity"]),
+                "unit_price": float(prices[int(it["product_id"])]),
+            }
+            for it in items
+        ]
+        total = sum(row["quantity"] * row["unit_price"] for row in rows)
+
+        order = Order(user_id=user_id, status="pending", total_amount=total)
         self.session.add(order)
         await self.session.flush()
 
-        total = 0
-        for it in items:
-            product_id = it["product_id"]
-            quantity = int(it["quantity"])
-            product = await self.session.get(Product, product_id)
-            if not product:
-                raise ValueError(f"Product {product_id} not found")
-            unit_price = float(product.price)
-            oi = OrderItem(
-                order_id=order.id,
-                product_id=product_id,
-                quantity=quantity,
-                unit_price=unit_price,
-            )
-            self.session.add(oi)
-            total += quantity * unit_price
+        if rows:
+            for row in rows:
+                row["order_id"] = order.id
+            await self.session.execute(insert(OrderItem).values(rows))
 
-        order.total_amount = total
-        await self.session.commit()
         await self.session.refresh(order, ["items"])
+        self._emit("created", order_event_payload(order), order.id)
         return order
 
     async def get_by_id(self, order_id: int) -> Optional[Order]:
@@ -51,34 +99,77 @@ class OrderRepository:
         result = await self.session.execute(stmt)
         return result.scalar_one_or_none()
 
-    async def list(
-        self,
-        limit: int = 10,
-        offset: int = 0,
+    @staticmethod
+    def _filter(
+        stmt,
         user_id: Optional[int] = None,
         status: Optional[str] = None,
-    ) -> Tuple[int, List[Order]]:
-        count_stmt = select(Order)
-        stmt = select(Order).options(selectinload(Order.items))
-
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+    ):
         if user_id is not None:
-            count_stmt = count_stmt.where(Order.user_id == user_id)
             stmt = stmt.where(Order.user_id == user_id)
-
         if status is not None:
-            count_stmt = count_stmt.where(Order.status == status)
             stmt = stmt.where(Order.status == status)
+        if created_from is not None:
+            stmt = stmt.where(Order.created_at >= created_from)
+        if created_to is not None:
+            stmt = stmt.where(Order.created_at < created_to)
+        return stmt
 
-        total_res = await self.session.execute(count_stmt)
-        all_rows = total_res.scalars().all()
-        total = len(all_rows)
+    async def list(
+        self,
+        limit: int = 10,
+        offset: int = 0,
+        user_id: Optional[int] = None,
+        status: Optional[str] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+    ) -> Tuple[int, List[Order]]:
+        filters = {
+            "user_id": user_id,
+            "status": status,
+            "created_from": created_from,
+            "created_to": created_to,
+        }
+        count_stmt = self._filter(
+            select(func.count()).select_from(Order),  # pylint: disable=not-callable
+            **filters,
+        )
+        total = (await self.session.execute(count_stmt)).scalar_one()
 
-        stmt = stmt.limit(limit).offset(offset)
+        stmt = self._filter(select(Order).options(selectinload(Order.items)), **filters)
+        stmt = stmt.order_by(Order.id).limit(limit).offset(offset)
         res = await self.session.execute(stmt)
         items = res.scalars().all()
 
         return total, items
 
+    async def list_after(
+        self,
+        after_id: int,
+        limit: int = 10,
+        user_id: Optional[int] = None,
+        status: Optional[str] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+    ) -> List[Order]:
+        """
+        Keyset pagination: orders with id greater than `after_id`.
+        Uses the primary key index instead of OFFSET, so every page
+        costs the same regardless of depth. No total is computed.
+        """
+        stmt = self._filter(
+            select(Order).options(selectinload(Order.items)),
+            user_id=user_id,
+            status=status,
+            created_from=created_from,
+            created_to=created_to,
+        )
+        stmt = stmt.where(Order.id > after_id).order_by(Order.id).limit(limit)
+        res = await self.session.execute(stmt)
+        return list(res.scalars().all())
+
     async def update(self, order_id: int, **patch) -> Optional[Order]:
         order = await self.get_by_id(order_id)
         if not order:
@@ -88,50 +179,124 @@ class OrderRepository:
             order.status = str(patch["status"])
 
         if "items" in patch and patch["items"] is not None:
-            new_items = patch["items"]
-            existing_by_product = {int(i.product_id): i for i in order.items}
-            seen_product_ids = set()
-            total = 0.0
-
-            for ni in new_items:
-                pid = int(ni["product_id"])
-                qty = int(ni["quantity"])
-                seen_product_ids.add(pid)
-
-                product = await self.session.get(Product, pid)
-                if not product:
-                    raise ValueError(f"Product {pid} not found")
-
-                unit_price = float(product.price)
-
-                if pid in existing_by_product:
-                    existing = existing_by_product[pid]
-                    existing.quantity = qty
-                    existing.unit_price = unit_price
-                    self.session.add(existing)
-                else:
-                    new_oi = OrderItem(
-                        order_id=order.id,
-                        product_id=pid,
-                        quantity=qty,
-                        unit_price=unit_price,
-                    )
-                    self.session.add(new_oi)
-
-                total += qty * unit_price
-
-            for pid, existing in existing_by_product.items():
-                if pid not in seen_product_ids:
-                    await self.session.delete(existing)
-
-            order.total_amount = total
-
-        await self.session.commit()
+            order.total_amount = await self._replace_items(order, patch["items"])
+
+        await self.session.flush()
         await self.session.refresh(order, ["items"])
+        self._emit("updated", order_event_payload(order), order.id)
         return order
 
+    async def _replace_items(self, order: Order, new_items: List[Dict]) -> float:
+        """
+        Replace order lines with set operations: one price query, one
+        UPDATE for kept lines, one multi-row INSERT for added lines and
+        one DELETE for the rest. Lines are merged per product.
+        Returns the new order total.
+        """
+        quantities: Dict[int, int] = {}
+        for ni in new_items:
+            pid = int(ni["product_id"])
+            quantities[pid] = quantities.get(pid, 0) + int(ni["quantity"])
+
+        prices: Dict[int, float] = {}
+        if quantities:
+            res = await self.session.execute(
+                select(Product.id, Product.price).where(
+                    Product.id.in_(quantities.keys())
+                )
+            )
+            prices = {row.id: float(row.price) for row in res}
+        missing = sorted(quantities.keys() - prices.keys())
+        if missing:
+            raise ValueError(f"Product {missing[0]} not found")
+
+        # Keep one existing line per product that stays in the order
+        kept: Dict[int, int] = {}
+        for item in order.items:
+            pid = int(item.product_id)
+            if pid in quantities and pid not in kept:
+                kept[pid] = item.id
+        kept_ids = list(kept.values())
+
+        delete_stmt = delete(OrderItem).where(OrderItem.order_id == order.id)
+        if kept_ids:
+            delete_stmt = delete_stmt.where(OrderItem.id.not_in(kept_ids))
+        await self.session.execute(
+            delete_stmt.execution_options(synchronize_session=False)
+        )
+
+        if kept:
+            await self.session.execute(
+                update(OrderItem)
+                .where(OrderItem.id.in_(kept_ids))
+                .values(
+                    quantity=case(
+                        {kept[pid]: quantities[pid] for pid in kept},
+                        value=OrderItem.id,
+                    ),
+                    unit_price=case(
+                        {kept[pid]: prices[pid] for pid in kept},
+                        value=OrderItem.id,
+                    ),
+                )
+                .execution_options(synchronize_session=False)
+            )
+
+        added = [
+            {
+                "order_id": order.id,
+                "product_id": pid,
+                "quantity": qty,
+                "unit_price": prices[pid],
+            }
+            for pid, qty in quantities.items()
+            if pid not in kept
+        ]
+        if added:
+            await self.session.execute(insert(OrderItem).values(added))
+
+        return sum(qty * prices[pid] for pid, qty in quantities.items())
+
+    async def cancel_many(
+        self, order_ids: List[int]
+    ) -> Tuple[List[int], Dict[int, int]]:
+        """
+        Mark orders as cancelled with one conditional UPDATE and sum the
+        quantities of their items per product with one grouped SELECT.
+        Orders that are already cancelled are skipped, so concurrent
+        cancellations never return the same stock twice.
+        Returns: (cancelled order ids, {product_id: quantity to restock})
+        """
+        if not order_ids:
+            return [], {}
+
+        res = await self.session.execute(
+            update(Order)
+            .where(
+                Order.id.in_(order_ids),
+                Order.status.is_distinct_from("cancelled"),
+            )
+            .values(status="cancelled")
+            .returning(Order.id)
+            .execution_options(synchronize_session=False)
+        )
+        cancelled = sorted(res.scalars().all())
+        if not cancelled:
+            return [], {}
+
+        res = await self.session.execute(
+            select(OrderItem.product_id, func.sum(OrderItem.quantity))
+            .where(OrderItem.order_id.in_(cancelled))
+            .group_by(OrderItem.product_id)
+        )
+        quantities = {int(pid): int(qty) for pid, qty in res.all()}
+        for order_id in cancelled:
+            self._emit("cancelled", {"order_id": order_id}, order_id)
+        return cancelled, quantities
+
     async def delete(self, order_id: int) -> None:
         order = await self.get_by_id(order_id)
         if order:
             await self.session.delete(order)
-            await self.session.commit()
+            await self.session.flush()
+            self._emit("deleted", {"order_id": order_id}, order_id)
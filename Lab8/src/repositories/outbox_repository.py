@@ -0,0 +1,55 @@
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models.outbox import OutboxEvent
+
+
+class OutboxRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    def add(
+        self,
+        aggregate_type: str,
+        event_type: str,
+        payload: Dict[str, Any],
+        aggregate_id: Optional[int] = None,
+    ) -> None:
+        """
+        Stage an event in the current transaction. No statement is issued
+        here: the row is inserted with the caller's next flush or commit.
+        """
+        self.session.add(
+            OutboxEvent(
+                aggregate_type=aggregate_type,
+                aggregate_id=aggregate_id,
+                event_type=event_type,
+                payload=payload,
+            )
+        )
+
+    async def fetch_batch(self, limit: int = 100) -> List[OutboxEvent]:
+        """
+        Oldest undelivered events, locked until the end of the transaction.
+        SKIP LOCKED lets several relays share the table without sending an
+        event twice.
+        """
+        stmt = (
+            select(OutboxEvent)
+            .order_by(OutboxEvent.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        res = await self.session.execute(stmt)
+        return list(res.scalars().all())
+
+    async def delete(self, event_ids: List[int]) -> None:
+        if not event_ids:
+            return
+        await self.session.execute(
+            delete(OutboxEvent)
+            .where(OutboxEvent.id.in_(event_ids))
+            .execution_options(synchronize_session=False)
+        )
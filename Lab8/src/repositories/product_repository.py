@@ -1,26 +1,130 @@
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional
 
-from sqlalchemy import func, select
+from sqlalchemy import case, func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.exc import StaleDataError
 
 from src.models.product import Product
+from src.repositories.outbox_repository import OutboxRepository
+
+
+def product_event_payload(product: Product) -> Dict[str, Any]:
+    return {
+        "product_id": product.id,
+        "name": product.name,
+        "price": float(product.price),
+        "stock_quantity": product.stock_quantity,
+        "version": product.version,
+    }
 
 
 class ProductRepository:
+    """
+    Every mutation also stages a `product.*` event in the outbox, so the
+    event is committed (or rolled back) together with the change.
+    """
+
+    # ORM updates re-read and re-apply the patch this many times when a
+    # concurrent write bumps the version first
+    MAX_UPDATE_ATTEMPTS = 3
+
     def __init__(self, session: AsyncSession):
         self.session = session
+        self.outbox = OutboxRepository(session)
+
+    def _emit(
+        self,
+        event_type: str,
+        payload: Dict[str, Any],
+        product_id: Optional[int] = None,
+    ) -> None:
+        self.outbox.add("product", f"product.{event_type}", payload, product_id)
+
+    def _emit_stock_changed(self, stock: Dict[int, int]) -> None:
+        if stock:
+            payload = {"stock": {str(pid): qty for pid, qty in stock.items()}}
+            self._emit("stock_changed", payload)
 
     async def create(self, **data) -> Product:
         product = Product(**data)
         self.session.add(product)
-        await self.session.commit()
         await self.session.flush()
         await self.session.refresh(product)
+        self._emit("created", product_event_payload(product), product.id)
         return product
 
     async def get_by_id(self, product_id: int) -> Optional[Product]:
         return await self.session.get(Product, product_id)
 
+    async def get_by_ids(self, product_ids: Iterable[int]) -> Dict[int, Product]:
+        """
+        Load several products with a single IN query.
+        Returns: {product_id: Product} for the ids that exist
+        """
+        ids = set(product_ids)
+        if not ids:
+            return {}
+        stmt = (
+            select(Product)
+            .where(Product.id.in_(ids))
+            .execution_options(populate_existing=True)
+        )
+        res = await self.session.execute(stmt)
+        return {product.id: product for product in res.scalars().all()}
+
+    async def decrement_stock(self, quantities: Dict[int, int]) -> Dict[int, int]:
+        """
+        Decrement stock for several products with one conditional UPDATE.
+        A row is only touched when it still has enough stock, so the caller
+        must compare the returned ids with the requested ones.
+        Negative quantities return stock and always succeed.
+
+        The stock check is the only predicate: the UPDATE is atomic, so a
+        version check would only turn unrelated concurrent writes into
+        conflicts. The version is still bumped for ORM read-modify-writes.
+        Returns: {product_id: new_stock_quantity} for the updated rows
+        """
+        if not quantities:
+            return {}
+        qty = case(quantities, value=Product.id)
+        stmt = (
+            update(Product)
+            .where(Product.id.in_(quantities.keys()), Product.stock_quantity >= qty)
+            .values(
+                stock_quantity=Product.stock_quantity - qty,
+                version=Product.version + 1,
+            )
+            .returning(Product)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        res = await self.session.execute(stmt)
+        updated = {product.id: product.stock_quantity for product in res.scalars()}
+        self._emit_stock_changed(updated)
+        return updated
+
+    async def increment_stock(self, quantities: Dict[int, int]) -> Dict[int, int]:
+        """
+        Return stock for several products with one UPDATE.
+        Returns: {product_id: new_stock_quantity} for the updated rows
+        """
+        if not quantities:
+            return {}
+        qty = case(quantities, value=Product.id)
+        stmt = (
+            update(Product)
+            .where(Product.id.in_(quantities.keys()))
+            .values(
+                stock_quantity=Product.stock_quantity + qty,
+                version=Product.version + 1,
+            )
+            .returning(Product)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        res = await self.session.execute(stmt)
+        updated = {product.id: product.stock_quantity for product in res.scalars()}
+        self._emit_stock_changed(updated)
+        return updated
+
     async def list(self) -> List[Product]:
         res = await self.session.execute(select(Product))
         return res.scalars().all()
@@ -41,24 +145,56 @@ class ProductRepository:
         total = total_result.scalar() or 0
 
         offset = (page - 1) * count
-        query = select(Product).offset(offset).limit(count)
+        query = select(Product).order_by(Product.id).offset(offset).limit(count)
         result = await self.session.execute(query)
         items = result.scalars().all()
 
         return {"total": total, "items": items}
 
+    async def get_after(self, after_id: int, count: int = 10) -> List[Product]:
+        """
+        Keyset page: products with id greater than `after_id`, ordered by id.
+        Costs the same for every page, so full-table walks stay linear.
+        """
+        query = (
+            select(Product)
+            .where(Product.id > after_id)
+            .order_by(Product.id)
+            .limit(count)
+        )
+        result = await self.session.execute(query)
+        return list(result.scalars().all())
+
     async def update(self, product_id: int, **patch) -> Optional[Product]:
+        """
+        Apply `patch` with a version-checked read-modify-write. A concurrent
+        change rolls back the savepoint; the row is then re-read and the
+        patch re-applied, up to MAX_UPDATE_ATTEMPTS times before
+        StaleDataError is raised.
+        """
         product = await self.get_by_id(product_id)
-        if not product:
-            return None
-        for k, v in patch.items():
-            setattr(product, k, v)
-        await self.session.commit()
+        for attempt in range(1, self.MAX_UPDATE_ATTEMPTS + 1):
+            if not product:
+                return None
+            try:
+                async with self.session.begin_nested():
+                    for k, v in patch.items():
+                        setattr(product, k, v)
+                    await self.session.flush()
+                break
+            except StaleDataError:
+                if attempt == self.MAX_UPDATE_ATTEMPTS:
+                    raise
+                product = await self.session.get(
+                    Product, product_id, populate_existing=True
+                )
         await self.session.refresh(product)
+        self._emit("updated", product_event_payload(product), product.id)
         return product
 
     async def delete(self, product_id: int) -> None:
         product = await self.get_by_id(product_id)
         if product:
             await self.session.delete(product)
-            await self.session.commit()
+            await self.session.flush()
+            self._emit("deleted", {"product_id": product_id}, product_id)
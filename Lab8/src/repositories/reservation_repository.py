@@ -0,0 +1,47 @@
+from datetime import datetime
+from typing import Iterable, List, Set, Tuple
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models.reservation import AppliedReservationLine
+
+
+class ReservationRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def applied_lines(self, reservation_ids: List[str]) -> Set[Tuple[str, int]]:
+        """(reservation id, product id) pairs already applied to stock."""
+        if not reservation_ids:
+            return set()
+        res = await self.session.execute(
+            select(
+                AppliedReservationLine.reservation_id,
+                AppliedReservationLine.product_id,
+            ).where(AppliedReservationLine.reservation_id.in_(reservation_ids))
+        )
+        return {(row.reservation_id, row.product_id) for row in res}
+
+    async def add_applied(self, lines: Iterable[Tuple[str, int]]) -> None:
+        """
+        Record lines as applied. The INSERT runs right away, so a concurrent
+        run that applied the same line fails on the primary key here instead
+        of committing a second decrement.
+        """
+        rows = [
+            {"reservation_id": reservation_id, "product_id": product_id}
+            for reservation_id, product_id in lines
+        ]
+        if not rows:
+            return
+        await self.session.execute(insert(AppliedReservationLine), rows)
+
+    async def prune_applied(self, before: datetime) -> int:
+        """Drop records older than `before`. Returns how many were deleted."""
+        res = await self.session.execute(
+            delete(AppliedReservationLine)
+            .where(AppliedReservationLine.applied_at < before)
+            .execution_options(synchronize_session=False)
+        )
+        return res.rowcount
@@ -0,0 +1,86 @@
+import logging
+from typing import Awaitable, Callable, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+Callback = Callable[[], Awaitable[None]]
+
+
+class UnitOfWork:
+    """
+    Единица работы: одна транзакция на границу сервиса.
+
+    Репозитории, созданные на общей сессии, выполняют только flush.
+    Фиксирует транзакцию тот, кто открыл единицу работы (HTTP-обработчик
+    или обработчик сообщения): commit при успехе, rollback при исключении.
+
+    Побочные эффекты вне БД (кеш, резервы в Redis) регистрируются через
+    after_commit / after_rollback и выполняются только после исхода
+    транзакции, поэтому читатели не видят незафиксированных данных.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self._after_commit: List[Callback] = []
+        self._after_rollback: List[Callback] = []
+
+    async def __aenter__(self) -> "UnitOfWork":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            await self.commit()
+        else:
+            await self.rollback()
+
+    def after_commit(self, callback: Callback) -> None:
+        """Выполнить callback после успешного commit."""
+        self._after_commit.append(callback)
+
+    def after_rollback(self, callback: Callback) -> None:
+        """Выполнить callback после rollback (в том числе неудачного commit)."""
+        self._after_rollback.append(callback)
+
+    async def commit(self) -> None:
+        """Зафиксировать все изменения единицы работы."""
+        try:
+            await self.session.commit()
+        except Exception:
+            await self.rollback()
+            raise
+        self._after_rollback.clear()
+        await self._run(self._after_commit, "after_commit")
+
+    async def rollback(self) -> None:
+        """Откатить все изменения единицы работы."""
+        self._after_commit.clear()
+        try:
+            await self.session.rollback()
+        finally:
+            await self._run(self._after_rollback, "after_rollback")
+
+    @staticmethod
+    async def _run(callbacks: List[Callback], stage: str) -> None:
+        # Транзакция уже завершена: ошибка callback не должна менять ее исход
+        pending = list(callbacks)
+        callbacks.clear()
+        for callback in pending:
+            try:
+                await callback()
+            except Exception:
+                logger.exception("Unit of work %s callback failed", stage)
+
+
+async def run_after_commit(
+    unit_of_work: Optional[UnitOfWork], callback: Callback
+) -> None:
+    """
+    Выполнить callback после commit единицы работы.
+    Без единицы работы (тесты, скрипты) callback выполняется сразу.
+    """
+    if unit_of_work is None:
+        await callback()
+    else:
+        unit_of_work.after_commit(callback)
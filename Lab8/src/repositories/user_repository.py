@@ -1,3 +1,5 @@
+from typing import Iterable
+
 from sqlalchemy import delete, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -14,16 +16,35 @@ class UserRepository:
         result = await self.session.execute(select(User).where(User.id == user_id))
         return result.scalar_one_or_none()
 
-    async def get_by_filter(self, count: int, page: int, **kwargs) -> list[User]:
-        """Получить список пользователей с пагинацией и фильтрацией"""
-        query = select(User)
+    async def get_by_ids(self, user_ids: Iterable[int]) -> dict[int, User]:
+        """Получить несколько пользователей одним запросом IN"""
+        ids = set(user_ids)
+        if not ids:
+            return {}
+        result = await self.session.execute(select(User).where(User.id.in_(ids)))
+        return {user.id: user for user in result.scalars().all()}
 
+    @staticmethod
+    def _filter(query, **kwargs):
         for key, value in kwargs.items():
             if hasattr(User, key) and value is not None:
                 query = query.where(getattr(User, key) == value)
+        return query
+
+    async def get_by_filter(self, count: int, page: int, **kwargs) -> list[User]:
+        """Получить список пользователей с пагинацией и фильтрацией"""
+        query = self._filter(select(User), **kwargs)
 
         offset = (page - 1) * count
-        query = query.offset(offset).limit(count)
+        query = query.order_by(User.id).offset(offset).limit(count)
+
+        result = await self.session.execute(query)
+        return list(result.scalars().all())
+
+    async def get_after(self, after_id: int, count: int, **kwargs) -> list[User]:
+        """Получить страницу пользователей с id больше after_id (keyset)"""
+        query = self._filter(select(User), **kwargs)
+        query = query.where(User.id > after_id).order_by(User.id).limit(count)
 
         result = await self.session.execute(query)
         return list(result.scalars().all())
@@ -32,7 +53,7 @@ class UserRepository:
         """Создать нового пользователя"""
         user = User(**user_data.model_dump())
         self.session.add(user)
-        await self.session.commit()
+        await self.session.flush()
         await self.session.refresh(user)
         return user
 
@@ -46,14 +67,14 @@ class UserRepository:
         for key, value in update_data.items():
             setattr(user, key, value)
 
-        await self.session.commit()
+        await self.session.flush()
         await self.session.refresh(user)
         return user
 
     async def delete(self, user_id: int) -> None:
         """Удалить пользователя"""
         await self.session.execute(delete(User).where(User.id == user_id))
-        await self.session.commit()
+        await self.session.flush()
 
     async def count(self, **filters) -> int:
         """Подсчитать количество пользователей с фильтрами"""
@@ -1,7 +1,7 @@
 from enum import Enum
-from typing import List, Optional
+from typing import List, Literal, Optional
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class Status(str, Enum):
@@ -49,7 +49,24 @@ class OrderResponse(BaseModel):
 
 
 class OrderListResponse(BaseModel):
-    total: int
+    total: Optional[int] = None
     items: List[OrderResponse]
+    next_cursor: Optional[str] = None
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class OrderCancelRequest(BaseModel):
+    order_ids: List[int] = Field(min_length=1, max_length=1000)
+
+
+class OrderCancelResponse(BaseModel):
+    cancelled: List[int]
+
+
+class OrderRequestStatus(BaseModel):
+    id: str
+    status: Literal["pending", "completed", "failed"]
+    order_id: Optional[int] = None
+    error: Optional[str] = None
+    updated_at: str
@@ -25,5 +25,6 @@ class ProductResponse(BaseModel):
 
 
 class ProductListResponse(BaseModel):
-    total: int
+    total: int | None = None
     items: list[ProductResponse]
+    next_cursor: str | None = None
@@ -43,5 +43,6 @@ class UserResponse(UserBase):
 
 
 class UserListResponse(BaseModel):
-    total: int
+    total: Optional[int] = None
     items: List[UserResponse]
+    next_cursor: Optional[str] = None
@@ -0,0 +1,154 @@
+import bisect
+from typing import Dict, List, Sequence, Tuple
+
+LabelValues = Tuple[str, ...]
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+SIZE_BUCKETS = (64, 256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+
+def _labels(names: Sequence[str], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    """Monotonic counter with labels."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str]):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def get(self, *labels: str) -> float:
+        return self.values.get(labels, 0)
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} counter",
+        ]
+        for labels, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{_labels(self.labelnames, labels)} {value}")
+        return lines
+
+
+class Histogram:
+    """Cumulative histogram with fixed buckets and labels."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str],
+        buckets: Sequence[float],
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # per label set: counts per bucket (+Inf last), sum of observations
+        self.values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        counts, total = self.values.setdefault(
+            labels, ([0] * (len(self.buckets) + 1), [0.0])
+        )
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        total[0] += value
+
+    def count(self, *labels: str) -> int:
+        counts, _ = self.values.get(labels, ([], []))
+        return sum(counts)
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        for labels, (counts, total) in sorted(self.values.items()):
+            cumulative = 0
+            bounds = [*map(str, self.buckets), "+Inf"]
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                label_str = _labels(self.labelnames, labels, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{label_str} {cumulative}")
+            label_str = _labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_str} {total[0]}")
+            lines.append(f"{self.name}_count{label_str} {cumulative}")
+        return lines
+
+
+class CacheMetrics:
+    """
+    Hit/miss/error counters and latency/size histograms for CacheService.
+
+    The namespace of a key is its first segment (`product:1` -> `product`),
+    so label cardinality stays bounded. Values are per process; each worker
+    exposes its own on /metrics and the scraper aggregates them.
+    """
+
+    def __init__(self):
+        self.hits = Counter(
+            "cache_hits_total",
+            "Cache lookups that found a value",
+            ("namespace", "layer"),
+        )
+        self.misses = Counter(
+            "cache_misses_total", "Cache lookups that found nothing", ("namespace",)
+        )
+        self.errors = Counter(
+            "cache_errors_total",
+            "Failed cache operations",
+            ("namespace", "operation"),
+        )
+        self.latency = Histogram(
+            "cache_operation_seconds",
+            "Redis round trip time of cache operations",
+            ("namespace", "operation"),
+            LATENCY_BUCKETS,
+        )
+        self.size = Histogram(
+            "cache_value_bytes",
+            "Serialized size of cached values",
+            ("namespace", "operation"),
+            SIZE_BUCKETS,
+        )
+
+    @staticmethod
+    def namespace(key: str | bytes) -> str:
+        if isinstance(key, bytes):
+            key = key.decode(errors="replace")
+        return key.split(":", 1)[0]
+
+    def hit(self, key: str, layer: str = "redis") -> None:
+        self.hits.inc(self.namespace(key), layer)
+
+    def miss(self, key: str) -> None:
+        self.misses.inc(self.namespace(key))
+
+    def error(self, key: str, operation: str) -> None:
+        self.errors.inc(self.namespace(key), operation)
+
+    def observe_latency(self, key: str, operation: str, seconds: float) -> None:
+        self.latency.observe(seconds, self.namespace(key), operation)
+
+    def observe_size(self, key: str, operation: str, size: int) -> None:
+        self.size.observe(size, self.namespace(key), operation)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+        for metric in (self.hits, self.misses, self.errors, self.latency, self.size):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Shared by every CacheService in the process (services are per request)
+cache_metrics = CacheMetrics()
@@ -1,37 +1,250 @@
-from typing import Optional, Any
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+import asyncio
+import copy
 import json
+import logging
+import math
+import random
+import time
+import uuid
 from redis.asyncio import Redis
 
+from src.services.cache_metrics import CacheMetrics, cache_metrics
+from src.services.local_cache import LocalCache
+from src.services.serializers import CacheSerializer
+
+logger = logging.getLogger(__name__)
+
+# Deletes the recompute lock only if this caller still owns it
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def ttl_with_jitter(ttl: int, jitter: float = 0.1) -> int:
+    """Spread expirations of keys written together by +/- `jitter` of the TTL."""
+    return max(1, round(ttl * random.uniform(1 - jitter, 1 + jitter)))
+
 
 class CacheService:
-    """Service for handling Redis caching operations"""
-    
-    def __init__(self, redis_client: Redis):
+    """
+    Service for handling Redis caching operations.
+
+    Values are encoded by a `CacheSerializer` (JSON by default, msgpack
+    optional), which tags each value with its codec and compresses large
+    payloads.
+
+    With a `local_cache`, reads are served from an in-process L1 first and
+    every write publishes the touched keys on INVALIDATION_CHANNEL so the
+    other workers drop their copies (see `listen_for_invalidations`).
+
+    Hits, misses, errors, Redis latency and value sizes are recorded per key
+    namespace in `metrics` (process-wide `cache_metrics` by default).
+    """
+
+    INVALIDATION_CHANNEL = "cache:invalidate"
+    # Cached in place of a value to remember that it does not exist
+    TOMBSTONE = {"__tombstone__": True}
+    LOCK_TTL = 5.0  # seconds one instance may spend recomputing a key
+    LOCK_POLL_INTERVAL = 0.05
+    # Namespace generations live in gen:{namespace}, see `namespaced_key`
+    GENERATION_PREFIX = "gen:"
+    DELETE_CHUNK_SIZE = 500  # keys per UNLINK
+    DELETE_PIPELINE_DEPTH = 10  # UNLINKs per round trip in delete_pattern
+
+    # Shared by all instances in the worker: requests are per-request objects
+    _inflight: Dict[str, asyncio.Future] = {}
+    # Last observed recompute time per key prefix, used by early refresh
+    _recompute_seconds: Dict[str, float] = {}
+
+    def __init__(
+        self,
+        redis_client: Redis,
+        local_cache: Optional[LocalCache] = None,
+        serializer: Optional[CacheSerializer] = None,
+        metrics: Optional[CacheMetrics] = None,
+    ):
         self.redis = redis_client
-    
+        self.local = local_cache
+        self.serializer = serializer or CacheSerializer()
+        self.metrics = metrics or cache_metrics
+        self._release_lock = redis_client.register_script(RELEASE_LOCK_SCRIPT)
+
+    def _local_get(self, key: str) -> Optional[Any]:
+        if self.local is None or not self.local.accepts(key):
+            return None
+        value = self.local.get(key)
+        if value is None:
+            return None
+        self.metrics.hit(key, "local")
+        # Callers may mutate what they get back; keep the L1 copy intact
+        return copy.deepcopy(value)
+
+    def _local_set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        if self.local is not None and value is not None and self.local.accepts(key):
+            self.local.set(key, copy.deepcopy(value), ttl)
+
+    def _error(self, key: str, operation: str, error: Exception) -> None:
+        self.metrics.error(key, operation)
+        logger.warning("Cache %s error for key %s: %s", operation, key, error)
+
+    def _observe_read(
+        self, key: str, operation: str, data: Optional[bytes], started: float
+    ) -> None:
+        self.metrics.observe_latency(key, operation, time.perf_counter() - started)
+        if data:
+            self.metrics.hit(key)
+            self.metrics.observe_size(key, operation, len(data))
+        else:
+            self.metrics.miss(key)
+
+    def _observe_write(
+        self, key: str, operation: str, size: int, started: float
+    ) -> None:
+        self.metrics.observe_latency(key, operation, time.perf_counter() - started)
+        self.metrics.observe_size(key, operation, size)
+
+    async def _invalidate(
+        self, keys: Iterable[str] = (), pattern: Optional[str] = None
+    ) -> None:
+        """Drop keys from this worker's L1 and tell the other workers to."""
+        if self.local is None:
+            return
+        keys = [k for k in keys if self.local.accepts(k)]
+        if pattern is not None:
+            self.local.delete_pattern(pattern)
+        elif not keys:
+            return
+        self.local.delete(keys)
+        message = {"origin": self.local.instance_id, "keys": keys, "pattern": pattern}
+        try:
+            await self.redis.publish(self.INVALIDATION_CHANNEL, json.dumps(message))
+        except Exception as e:
+            self._error(self.INVALIDATION_CHANNEL, "publish", e)
+
     async def get(self, key: str) -> Optional[dict]:
         """
         Get cached data by key
         """
+        value = self._local_get(key)
+        if value is not None:
+            return value
+        started = time.perf_counter()
         try:
             data = await self.redis.get(key)
-            return json.loads(data) if data else None
+            value = self.serializer.loads(data) if data else None
         except Exception as e:
-            print(f"Cache get error for key {key}: {e}")
+            self._error(key, "get", e)
             return None
+        self._observe_read(key, "get", data, started)
+        self._local_set(key, value)
+        return value
     
     async def set(self, key: str, value: Any, ttl: int) -> bool:
         """
         Set cache with TTL
         """
+        return await self._store(key, value, ttl, invalidate=True)
+
+    async def _store(self, key: str, value: Any, ttl: int, invalidate: bool) -> bool:
+        """
+        Write one value. Writes publish an invalidation; read-through fills
+        (`invalidate=False`) store what the database already holds, so the
+        other workers' L1 copies stay valid and are left alone.
+        """
+        started = time.perf_counter()
         try:
-            serialized = json.dumps(value, default=str)
+            serialized = self.serializer.dumps(value)
             await self.redis.setex(key, ttl, serialized)
-            return True
+            stored = True
         except Exception as e:
-            print(f"Cache set error for key {key}: {e}")
-            return False
+            self._error(key, "set", e)
+            stored = False
+        else:
+            self._observe_write(key, "set", len(serialized), started)
+        if invalidate:
+            # Invalidate after the write so no worker can re-read the old value
+            await self._invalidate([key])
+        if stored:
+            self._local_set(key, value, ttl)
+        return stored
     
+    async def get_bytes(self, key: str) -> Optional[bytes]:
+        """
+        Get bytes stored by `set_bytes` as they are, without decoding
+        """
+        data = self._local_get(key)
+        if data is not None:
+            return data
+        started = time.perf_counter()
+        try:
+            data = await self.redis.get(key)
+        except Exception as e:
+            self._error(key, "get", e)
+            return None
+        self._observe_read(key, "get", data, started)
+        self._local_set(key, data)
+        return data
+
+    async def set_bytes(
+        self, key: str, data: bytes, ttl: int, invalidate: bool = True
+    ) -> bool:
+        """
+        Set ready-made bytes (e.g. an encoded response body) with TTL,
+        bypassing the serializer. Read-through fills pass `invalidate=False`
+        (see `_store`)
+        """
+        started = time.perf_counter()
+        try:
+            await self.redis.setex(key, ttl, data)
+            stored = True
+        except Exception as e:
+            self._error(key, "set", e)
+            stored = False
+        else:
+            self._observe_write(key, "set", len(data), started)
+        if invalidate:
+            await self._invalidate([key])
+        if stored:
+            self._local_set(key, data, ttl)
+        return stored
+
+    async def add(self, key: str, value: Any, ttl: int) -> Optional[bool]:
+        """
+        Set cache with TTL only if the key does not exist yet (SET NX).
+        Returns True if stored, False if the key exists, None on Redis errors
+        """
+        try:
+            serialized = self.serializer.dumps(value)
+            return bool(await self.redis.set(key, serialized, ex=ttl, nx=True))
+        except Exception as e:
+            self._error(key, "add", e)
+            return None
+    
+    async def expire(self, key: str, ttl: int) -> bool:
+        """
+        Reset the TTL of an existing key.
+        Returns False if the key is gone or on Redis errors
+        """
+        try:
+            return bool(await self.redis.expire(key, ttl))
+        except Exception as e:
+            self._error(key, "expire", e)
+            return False
+
     async def delete(self, key: str) -> bool:
         """
         Delete cache key
@@ -40,21 +253,357 @@ class CacheService:
             await self.redis.delete(key)
             return True
         except Exception as e:
-            print(f"Cache delete error for key {key}: {e}")
+            self._error(key, "delete", e)
             return False
+        finally:
+            await self._invalidate([key])
     
+    async def get_many(self, keys: List[str]) -> List[Optional[dict]]:
+        """
+        Get several keys with one MGET.
+        Returns values in the order of `keys`, None for misses
+        """
+        if not keys:
+            return []
+        result = [self._local_get(key) for key in keys]
+        missing = [i for i, value in enumerate(result) if value is None]
+        if not missing:
+            return result
+        started = time.perf_counter()
+        try:
+            values = await self.redis.mget([keys[i] for i in missing])
+        except Exception as e:
+            self._error(keys[missing[0]], "get_many", e)
+            return result
+        self.metrics.observe_latency(
+            keys[missing[0]], "get_many", time.perf_counter() - started
+        )
+        for i, data in zip(missing, values):
+            if not data:
+                self.metrics.miss(keys[i])
+                continue
+            self.metrics.hit(keys[i])
+            self.metrics.observe_size(keys[i], "get_many", len(data))
+            try:
+                result[i] = self.serializer.loads(data)
+            except Exception as e:
+                self._error(keys[i], "decode", e)
+                continue
+            self._local_set(keys[i], result[i])
+        return result
+
+    async def set_many(
+        self, items: Dict[str, Any], ttl: int, invalidate: bool = True
+    ) -> bool:
+        """
+        Set several keys with TTL in one pipelined round trip.
+        Read-through fills pass `invalidate=False` (see `_store`)
+        """
+        if not items:
+            return True
+        first = next(iter(items))
+        started = time.perf_counter()
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for key, value in items.items():
+                    serialized = self.serializer.dumps(value)
+                    self.metrics.observe_size(key, "set_many", len(serialized))
+                    pipe.setex(key, ttl, serialized)
+                await pipe.execute()
+            stored = True
+        except Exception as e:
+            self._error(first, "set_many", e)
+            stored = False
+        else:
+            self.metrics.observe_latency(
+                first, "set_many", time.perf_counter() - started
+            )
+        if invalidate:
+            await self._invalidate(items.keys())
+        if stored:
+            for key, value in items.items():
+                self._local_set(key, value, ttl)
+        return stored
+
+    async def delete_many(self, keys: Iterable[str]) -> int:
+        """
+        Delete several keys with UNLINK (memory is freed in the background)
+        """
+        keys = list(keys)
+        if not keys:
+            return 0
+        try:
+            return await self._unlink(keys)
+        except Exception as e:
+            self._error(keys[0], "delete_many", e)
+            return 0
+        finally:
+            await self._invalidate(keys)
+
     async def delete_pattern(self, pattern: str) -> int:
         """
-        Delete all keys matching a pattern
+        Delete all keys matching a pattern.
+        This still walks the whole keyspace with SCAN; for data that is
+        dropped as a group, prefer `namespaced_key` + `invalidate_namespace`
         """
+        deleted = 0
         try:
             keys = []
-            async for key in self.redis.scan_iter(match=pattern):
+            async for key in self.redis.scan_iter(
+                match=pattern, count=self.DELETE_CHUNK_SIZE
+            ):
                 keys.append(key)
-            
+                if len(keys) >= self.DELETE_CHUNK_SIZE * self.DELETE_PIPELINE_DEPTH:
+                    deleted += await self._unlink(keys)
+                    keys = []
             if keys:
-                return await self.redis.delete(*keys)
-            return 0
+                deleted += await self._unlink(keys)
+            return deleted
         except Exception as e:
-            print(f"Cache delete pattern error for pattern {pattern}: {e}")
-            return 0
+            self._error(pattern, "delete_pattern", e)
+            return deleted
+        finally:
+            await self._invalidate(pattern=pattern)
+
+    async def _unlink(self, keys: List) -> int:
+        """UNLINK keys in chunks of DELETE_CHUNK_SIZE, sent in one pipeline"""
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for i in range(0, len(keys), self.DELETE_CHUNK_SIZE):
+                pipe.unlink(*keys[i : i + self.DELETE_CHUNK_SIZE])
+            return sum(await pipe.execute())
+
+    async def get_generation(self, namespace: str) -> Optional[int]:
+        """
+        Current generation of a namespace (0 until it is first invalidated).
+        Returns None on Redis errors
+        """
+        try:
+            value = await self.redis.get(f"{self.GENERATION_PREFIX}{namespace}")
+        except Exception as e:
+            self._error(namespace, "generation", e)
+            return None
+        return int(value) if value else 0
+
+    async def namespaced_key(self, namespace: str, key: str) -> Optional[str]:
+        """
+        Key for `key` in the current generation of `namespace`.
+        Returns None if the generation is unknown; callers then skip the
+        cache rather than risk reading a generation that was invalidated
+        """
+        generation = await self.get_generation(namespace)
+        if generation is None:
+            return None
+        return f"{namespace}:{generation}:{key}"
+
+    async def tagged_key(self, tags: Sequence[str], key: str) -> Optional[str]:
+        """
+        Key for `key` in the current generations of several namespaces
+        (read with one MGET), so invalidating any of the tags hides it.
+        Returns None if a generation is unknown, like `namespaced_key`
+        """
+        try:
+            values = await self.redis.mget(
+                [f"{self.GENERATION_PREFIX}{tag}" for tag in tags]
+            )
+        except Exception as e:
+            self._error(tags[0], "generation", e)
+            return None
+        parts = [
+            f"{tag}:{int(value) if value else 0}" for tag, value in zip(tags, values)
+        ]
+        return ":".join(parts + [key])
+
+    async def invalidate_namespace(self, namespace: str) -> Optional[int]:
+        """
+        Invalidate every key of a namespace with one INCR.
+        Keys of older generations are never read again and age out by TTL.
+        Returns the new generation, None on Redis errors
+        """
+        try:
+            generation = await self.redis.incr(f"{self.GENERATION_PREFIX}{namespace}")
+        except Exception as e:
+            self._error(namespace, "invalidate", e)
+            return None
+        await self._invalidate(pattern=f"{namespace}:*")
+        return generation
+
+    @classmethod
+    def is_tombstone(cls, value: Any) -> bool:
+        return isinstance(value, dict) and value.get("__tombstone__") is True
+
+    async def get_or_set(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: int | Callable[[Any], int],
+        beta: float = 1.0,
+        negative_ttl: Optional[int] = None,
+    ) -> Any:
+        """
+        Read-through get with stampede protection.
+
+        - Concurrent misses for a key in this worker share one `loader` call.
+        - Across workers a short Redis lock lets one instance recompute while
+          the others wait for its value (or keep serving the stale one).
+        - Hot keys are refreshed before they expire with probability growing
+          as expiry nears (XFetch); `beta` > 1 refreshes earlier.
+        `loader` returns the value to cache, or None for "does not exist".
+        `ttl` may be a function of the loaded value, e.g. by order status.
+        With `negative_ttl`, a None is cached as a tombstone for that long,
+        so repeated lookups of a missing key never reach the loader.
+        """
+        value, remaining = await self._get_with_ttl(key)
+        if self.is_tombstone(value):
+            return None
+        if value is not None and not self._should_refresh(key, remaining, beta):
+            return value
+
+        async def compute() -> Any:
+            return await self._recompute(key, loader, ttl, value, negative_ttl)
+
+        value = await self._single_flight(key, compute)
+        return None if self.is_tombstone(value) else value
+
+    async def _get_with_ttl(self, key: str) -> Tuple[Optional[Any], Optional[float]]:
+        """Value and remaining TTL in seconds (None if unknown) in one round trip"""
+        value = self._local_get(key)
+        if value is not None:
+            return value, None
+        started = time.perf_counter()
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.get(key)
+                pipe.pttl(key)
+                data, pttl = await pipe.execute()
+            value = self.serializer.loads(data) if data else None
+        except Exception as e:
+            self._error(key, "get", e)
+            return None, None
+        self._observe_read(key, "get", data, started)
+        self._local_set(key, value)
+        return value, (pttl / 1000 if pttl and pttl > 0 else None)
+
+    def _should_refresh(
+        self, key: str, remaining: Optional[float], beta: float
+    ) -> bool:
+        if remaining is None:
+            return False
+        delta = self._recompute_seconds.get(key.split(":", 1)[0], 0.0)
+        return delta * beta * -math.log(1.0 - random.random()) >= remaining
+
+    async def _single_flight(self, key: str, compute: Callable[[], Awaitable[Any]]):
+        future = self._inflight.get(key)
+        if future is not None:
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise  # this request itself was cancelled
+                return await compute()  # the leader was cancelled
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await compute()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # followers re-raise it; avoid "never retrieved"
+            raise
+        else:
+            future.set_result(value)
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _recompute(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: int | Callable[[Any], int],
+        stale: Optional[Any],
+        negative_ttl: Optional[int] = None,
+    ) -> Any:
+        lock_key = f"lock:{key}"
+        token = uuid.uuid4().hex
+        try:
+            locked = await self.redis.set(
+                lock_key, token, nx=True, px=int(self.LOCK_TTL * 1000)
+            )
+        except Exception as e:
+            self._error(key, "lock", e)
+            locked = True  # Redis is down: recompute without coordination
+
+        if not locked:
+            if stale is not None:
+                return stale  # another instance is already refreshing it
+            value = await self._wait_for_value(key)
+            if value is not None:
+                return value
+
+        started = time.monotonic()
+        try:
+            value = await loader()
+            self._recompute_seconds[key.split(":", 1)[0]] = time.monotonic() - started
+            if value is not None:
+                value_ttl = ttl(value) if callable(ttl) else ttl
+                await self._store(key, value, value_ttl, invalidate=False)
+            elif negative_ttl:
+                await self._store(key, self.TOMBSTONE, negative_ttl, invalidate=False)
+            return value
+        finally:
+            if locked:
+                try:
+                    await self._release_lock(keys=[lock_key], args=[token])
+                except Exception as e:
+                    self._error(key, "unlock", e)
+
+    async def _wait_for_value(self, key: str) -> Optional[Any]:
+        """Poll for the value another instance is computing, up to LOCK_TTL."""
+        deadline = time.monotonic() + self.LOCK_TTL
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.LOCK_POLL_INTERVAL)
+            value = await self.get(key)
+            if value is not None:
+                return value
+        return None
+
+
+def apply_invalidation(local_cache: LocalCache, data: Any) -> None:
+    """Apply one invalidation message published by `CacheService`."""
+    message = json.loads(data)
+    if message.get("origin") == local_cache.instance_id:
+        return
+    if message.get("pattern"):
+        local_cache.delete_pattern(message["pattern"])
+    local_cache.delete(message.get("keys") or [])
+
+
+async def listen_for_invalidations(
+    redis_client: Redis,
+    local_cache: LocalCache,
+    stop_event: asyncio.Event,
+    reconnect_delay: float = 1.0,
+) -> None:
+    """
+    Keep this worker's L1 in sync with writes made by other workers.
+    Messages missed while disconnected cannot be replayed, so the L1 is
+    cleared every time the subscription is (re)established.
+    """
+    while not stop_event.is_set():
+        pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+        try:
+            await pubsub.subscribe(CacheService.INVALIDATION_CHANNEL)
+            local_cache.clear()
+            while not stop_event.is_set():
+                message = await pubsub.get_message(timeout=1.0)
+                if message is not None:
+                    apply_invalidation(local_cache, message["data"])
+        except Exception as e:
+            logger.warning("Cache invalidation listener error: %s", e)
+            local_cache.clear()
+            await asyncio.sleep(reconnect_delay)
+        finally:
+            await pubsub.aclose()
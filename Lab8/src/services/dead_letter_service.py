@@ -0,0 +1,87 @@
+import json
+import logging
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from redis.asyncio import Redis
+
+logger = logging.getLogger(__name__)
+
+Publisher = Callable[..., Awaitable[Any]]
+
+
+class DeadLetterService:
+    """
+    Messages that failed permanently, kept in Redis for inspection and replay.
+
+    Each source queue has one hash ``dead_letters:{queue}`` mapping an entry
+    id to a JSON record with the original message, the error and the number
+    of delivery attempts. Ids start with a nanosecond timestamp, so sorting
+    them lists entries oldest first. ``replay`` publishes the message back
+    to its queue through ``publish`` (the FastStream broker's publish).
+    """
+
+    KEY_PREFIX = "dead_letters:"
+
+    def __init__(self, redis_client: Redis, publish: Optional[Publisher] = None):
+        self.redis = redis_client
+        self.publish = publish
+
+    def _key(self, queue: str) -> str:
+        return f"{self.KEY_PREFIX}{queue}"
+
+    async def add(
+        self,
+        queue: str,
+        message: Any,
+        error: BaseException | str,
+        attempts: int = 1,
+    ) -> str:
+        """Store a failed message. Returns the entry id."""
+        entry_id = f"{time.time_ns()}-{uuid.uuid4().hex[:8]}"
+        record = {
+            "id": entry_id,
+            "queue": queue,
+            "message": message,
+            "error": error if isinstance(error, str) else repr(error),
+            "attempts": attempts,
+            "failed_at": datetime.now(timezone.utc).isoformat(),
+        }
+        await self.redis.hset(self._key(queue), entry_id, json.dumps(record))
+        return entry_id
+
+    async def list(self, queue: str, limit: int = 100) -> List[Dict[str, Any]]:
+        """Oldest `limit` entries of a queue."""
+        entries = await self.redis.hgetall(self._key(queue))
+        records = [json.loads(value) for value in entries.values()]
+        records.sort(key=lambda record: record["id"])
+        return records[:limit]
+
+    async def count(self, queue: str) -> int:
+        return int(await self.redis.hlen(self._key(queue)))
+
+    async def get(self, queue: str, entry_id: str) -> Optional[Dict[str, Any]]:
+        value = await self.redis.hget(self._key(queue), entry_id)
+        return json.loads(value) if value is not None else None
+
+    async def discard(self, queue: str, entry_id: str) -> bool:
+        """Drop an entry without replaying it."""
+        return bool(await self.redis.hdel(self._key(queue), entry_id))
+
+    async def replay(self, queue: str, entry_id: str) -> bool:
+        """
+        Publish an entry back to its queue as a first delivery, then drop it.
+        The entry is removed only after the publish succeeded, so a failure
+        leaves it in place (at worst the message is replayed twice).
+        """
+        if self.publish is None:
+            raise RuntimeError("DeadLetterService has no publisher")
+        record = await self.get(queue, entry_id)
+        if record is None:
+            return False
+        await self.publish(record["message"], queue=queue)
+        await self.discard(queue, entry_id)
+        logger.info("Replayed dead letter %s to queue %s", entry_id, queue)
+        return True
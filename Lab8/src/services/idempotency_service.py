@@ -0,0 +1,122 @@
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from src.services.cache_service import CacheService
+
+logger = logging.getLogger(__name__)
+
+
+class IdempotencyConflict(Exception):
+    """Raised when an Idempotency-Key cannot be honoured."""
+
+    def __init__(self, detail: str, status_code: int = 409):
+        super().__init__(detail)
+        self.detail = detail
+        self.status_code = status_code
+
+
+class IdempotencyService:
+    """
+    Replays the first response for a repeated Idempotency-Key.
+
+    The first request claims the key with SET NX as "in progress"; duplicates
+    that arrive meanwhile poll until the stored response appears. If the
+    first request fails the claim is dropped so a retry can run again.
+    The claim is refreshed while the operation runs, so a slow request
+    keeps it and only a crashed one lets it expire.
+    """
+
+    IN_PROGRESS_TTL = 30  # seconds; bounds how long a crashed request blocks
+    REFRESH_INTERVAL_RATIO = 1 / 3  # of IN_PROGRESS_TTL, between claim refreshes
+    RESPONSE_TTL = 86400  # 24 hours
+    WAIT_TIMEOUT = 10.0
+    POLL_INTERVAL = 0.05
+
+    def __init__(self, cache_service: CacheService, scope: str = "orders"):
+        self.cache_service = cache_service
+        self.scope = scope
+
+    def _key(self, idempotency_key: str) -> str:
+        return f"idempotency:{self.scope}:{idempotency_key}"
+
+    @staticmethod
+    def fingerprint(payload: Any) -> str:
+        """Hash of the request body, to reject a key reused for another body."""
+        raw = json.dumps(payload, sort_keys=True, default=str).encode()
+        return hashlib.sha256(raw).hexdigest()
+
+    async def execute(
+        self,
+        idempotency_key: str,
+        payload: Any,
+        operation: Callable[[], Awaitable[Dict]],
+    ) -> Tuple[Dict, bool]:
+        """
+        Run `operation` once per key and store its JSON-ready result.
+        Returns: (response, replayed)
+        """
+        key = self._key(idempotency_key)
+        fingerprint = self.fingerprint(payload)
+        deadline = time.monotonic() + self.WAIT_TIMEOUT
+
+        while True:
+            claimed = await self.cache_service.add(
+                key,
+                {"state": "in_progress", "fingerprint": fingerprint},
+                self.IN_PROGRESS_TTL,
+            )
+            if claimed is None:
+                # Redis is unavailable: serve the request without dedup
+                logger.warning("Idempotency store unavailable, key %s", key)
+                return await operation(), False
+            if claimed:
+                break
+
+            record = await self._wait_for_result(key, deadline)
+            if record is None:
+                # The first request failed and released the key; try again
+                continue
+            if record.get("fingerprint") != fingerprint:
+                raise IdempotencyConflict(
+                    "Idempotency-Key was already used with a different request",
+                    status_code=422,
+                )
+            return record["response"], True
+
+        heartbeat = asyncio.create_task(self._keep_claim(key))
+        try:
+            response = await operation()
+        except Exception:
+            await self.cache_service.delete(key)
+            raise
+        finally:
+            heartbeat.cancel()
+
+        await self.cache_service.set(
+            key,
+            {"state": "done", "fingerprint": fingerprint, "response": response},
+            self.RESPONSE_TTL,
+        )
+        return response, False
+
+    async def _keep_claim(self, key: str) -> None:
+        """Extend the in-progress claim until cancelled."""
+        while True:
+            await asyncio.sleep(self.IN_PROGRESS_TTL * self.REFRESH_INTERVAL_RATIO)
+            await self.cache_service.expire(key, self.IN_PROGRESS_TTL)
+
+    async def _wait_for_result(self, key: str, deadline: float) -> Optional[Dict]:
+        """Poll until the stored response appears or the claim disappears."""
+        while True:
+            record = await self.cache_service.get(key)
+            if record is None or record.get("state") == "done":
+                return record
+            if time.monotonic() >= deadline:
+                raise IdempotencyConflict(
+                    "A request with this Idempotency-Key is still in progress"
+                )
+            await asyncio.sleep(self.POLL_INTERVAL)
@@ -0,0 +1,62 @@
+import fnmatch
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Iterable, Optional, Sequence, Tuple
+
+
+class LocalCache:
+    """
+    Process-wide LRU with per-entry expiry, used as the L1 tier in front
+    of Redis. Not thread-safe: it is only touched from the event loop.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 1024,
+        ttl: float = 5.0,
+        prefixes: Optional[Sequence[str]] = None,
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        # Only keys with these prefixes are kept locally (None means all)
+        self.prefixes = tuple(prefixes) if prefixes is not None else None
+        # Lets a worker skip invalidation messages it published itself
+        self.instance_id = uuid.uuid4().hex
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def accepts(self, key: str) -> bool:
+        return self.prefixes is None or key.startswith(self.prefixes)
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a value; the L1 TTL never exceeds `self.ttl`."""
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def delete(self, keys: Iterable[str]) -> None:
+        for key in keys:
+            self._data.pop(key, None)
+
+    def delete_pattern(self, pattern: str) -> None:
+        for key in [k for k in self._data if fnmatch.fnmatchcase(k, pattern)]:
+            del self._data[key]
+
+    def clear(self) -> None:
+        self._data.clear()
@@ -0,0 +1,116 @@
+import logging
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+from src.services.cache_service import CacheService
+
+logger = logging.getLogger(__name__)
+
+Publisher = Callable[..., Awaitable[Any]]
+
+
+class OrderIntakeUnavailable(Exception):
+    """Raised when an order request cannot be tracked or queued."""
+
+    def __init__(self, detail: str, status_code: int = 503):
+        super().__init__(detail)
+        self.detail = detail
+        self.status_code = status_code
+
+
+class OrderRequestService:
+    """
+    Asynchronous order intake through the `order` queue.
+
+    `submit` stores a "pending" status under ``order_request:{id}`` and
+    publishes a regular `create` message carrying the request id; the
+    order consumer marks the request "completed" (with the order id) once
+    its transaction is committed, or "failed" when the message is
+    dead-lettered. Statuses expire after `STATUS_TTL` seconds.
+    """
+
+    QUEUE = "order"
+    STATUS_TTL = 86400  # 24 hours
+    PENDING = "pending"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+    def __init__(
+        self, cache_service: CacheService, publish: Optional[Publisher] = None
+    ):
+        self.cache_service = cache_service
+        self.publish = publish
+
+    @staticmethod
+    def _key(request_id: str) -> str:
+        return f"order_request:{request_id}"
+
+    @staticmethod
+    def _record(request_id: str, status: str, **fields: Any) -> Dict[str, Any]:
+        return {
+            "id": request_id,
+            "status": status,
+            "order_id": None,
+            "error": None,
+            "updated_at": datetime.now(timezone.utc).isoformat(),
+            **fields,
+        }
+
+    async def _store(
+        self, request_id: str, status: str, **fields: Any
+    ) -> Optional[Dict[str, Any]]:
+        """Write a status record. Returns it, or None if Redis failed."""
+        record = self._record(request_id, status, **fields)
+        if not await self.cache_service.set(
+            self._key(request_id), record, self.STATUS_TTL
+        ):
+            return None
+        return record
+
+    async def submit(self, order_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Queue an order for placement. Returns the pending status record.
+        The status is stored before publishing, so a fast consumer cannot
+        complete a request that is not tracked yet.
+        """
+        if self.publish is None:
+            raise RuntimeError("OrderRequestService has no publisher")
+        request_id = uuid.uuid4().hex
+        record = await self._store(request_id, self.PENDING)
+        if record is None:
+            raise OrderIntakeUnavailable("Order intake is unavailable, try again")
+
+        message = {"action": "create", "data": order_data, "request_id": request_id}
+        try:
+            await self.publish(message, queue=self.QUEUE)
+        except Exception as e:
+            logger.exception("Failed to publish order request %s", request_id)
+            await self.cache_service.delete(self._key(request_id))
+            raise OrderIntakeUnavailable(
+                "Order intake is unavailable, try again"
+            ) from e
+        return record
+
+    async def get(self, request_id: str) -> Optional[Dict[str, Any]]:
+        return await self.cache_service.get(self._key(request_id))
+
+    async def mark_completed(self, results: Iterable[Tuple[str, int]]) -> None:
+        """Record (request id, order id) pairs of a committed batch."""
+        records = {
+            self._key(request_id): self._record(
+                request_id, self.COMPLETED, order_id=order_id
+            )
+            for request_id, order_id in results
+        }
+        await self.cache_service.set_many(records, self.STATUS_TTL)
+
+    async def mark_failed(self, request_id: str, error: BaseException) -> None:
+        """
+        Record a permanently failed request. Business errors are shown to
+        the client as is; anything else is reported generically.
+        """
+        detail = str(error) if isinstance(error, ValueError) else None
+        await self._store(
+            request_id, self.FAILED, error=detail or "Order could not be placed"
+        )
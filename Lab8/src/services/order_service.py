@@ -1,28 +1,59 @@
-from typing import Dict, List, Optional
+from datetime import datetime, timezone
+from functools import partial
+from typing import Dict, Iterable, List, Optional, Tuple
 
 from src.repositories.order_repository import OrderRepository
 from src.repositories.product_repository import ProductRepository
+from src.repositories.unit_of_work import UnitOfWork, run_after_commit
 from src.repositories.user_repository import UserRepository
+from src.services.cache_service import CacheService, ttl_with_jitter
+from src.services.product_service import ProductService
+from src.services.report_service import ReportService
+from src.services.reservation_service import ReservationService
+from src.utils.pagination import decode_cursor, next_cursor
 
 
 class OrderService:
+    MISSING_ORDER_TTL = 60  # Tombstone TTL for ids that do not exist
+    # Cache TTL by status: open orders still change, closed ones never do
+    ORDER_CACHE_TTLS = {
+        "pending": 30,
+        "processing": 60,
+        "shipped": 300,
+        "delivered": 86400,
+        "cancelled": 86400,
+    }
+    DEFAULT_ORDER_CACHE_TTL = 30
+
     def __init__(
         self,
         order_repository: OrderRepository,
         product_repository: ProductRepository,
         user_repository: UserRepository,
+        reservation_service: Optional[ReservationService] = None,
+        cache_service: Optional[CacheService] = None,
+        unit_of_work: Optional[UnitOfWork] = None,
     ):
         self.order_repository = order_repository
         self.user_repository = user_repository
         self.product_repository = product_repository
+        # When set, orders are placed against Redis holds ("reserve first,
+        # persist later") and the products table is updated by reconciliation
+        self.reservation_service = reservation_service
+        self.cache_service = cache_service
+        # Cache invalidation waits for its commit, so readers never see
+        # rolled-back orders
+        self.unit_of_work = unit_of_work
 
     async def create_order(self, order_data: Dict):
+        """
+        Place an order with a constant number of statements:
+        one IN query for products, one conditional stock UPDATE and
+        one multi-row INSERT for the items, regardless of cart size.
+        """
         user_id = order_data["user_id"]
-        print(f"Looking for user with ID: {user_id} (type: {type(user_id)})")
 
         user = await self.user_repository.get_by_id(user_id)
-        print(f"Found user: {user}")
-
         if not user:
             raise ValueError(f"User not found {user_id}")
 
@@ -35,36 +66,177 @@ class OrderService:
             if it["quantity"] <= 0:
                 raise ValueError("Quantity must be greater than 0")
 
-        total = 0.0
-        updated_products = []
-
+        quantities: Dict[int, int] = {}
         for it in items:
-            product = await self.product_repository.get_by_id(it["product_id"])
+            product_id = int(it["product_id"])
+            quantities[product_id] = quantities.get(product_id, 0) + it["quantity"]
+
+        # Reserved orders leave the products table to reconciliation
+        stock_changed: Iterable[int] = ()
+        if self.reservation_service is not None:
+            products = await self._load_products(quantities)
+            stock = {pid: product.stock_quantity for pid, product in products.items()}
+            prices = {pid: float(product.price) for pid, product in products.items()}
+            order = await self._create_reserved(
+                user.id, items, quantities, stock, prices
+            )
+        else:
+            products = await self._take_stock(quantities)
+            prices = {pid: float(product.price) for pid, product in products.items()}
+            order = await self.order_repository.create(
+                user_id=user.id, items=items, prices=prices
+            )
+            stock_changed = quantities.keys()
+
+        if self.cache_service is not None:
+            order_key = self._get_order_cache_key(order.id)
+
+            async def evict_tombstone() -> None:
+                # Ids are sequential, so probes for the next id may have left one
+                await self.cache_service.delete(order_key)
+
+            await run_after_commit(self.unit_of_work, evict_tombstone)
+        await self._invalidate_responses(stock_changed)
+        return order
+
+    async def _invalidate_responses(self, product_ids: Iterable[int] = ()) -> None:
+        """
+        Order writes change product stock and the order reports.
+        `product_ids` are the products whose stock column changed; their
+        cached dicts and bodies are evicted along with the list tags.
+        """
+        if self.cache_service is None:
+            return
+        product_keys = ProductService.cache_keys(sorted(set(product_ids)))
+
+        async def invalidate() -> None:
+            if product_keys:
+                await self.cache_service.delete_many(product_keys)
+            for tag in (ProductService.CACHE_TAG, ReportService.CACHE_TAG):
+                await self.cache_service.invalidate_namespace(tag)
+
+        await run_after_commit(self.unit_of_work, invalidate)
+
+    async def _load_products(self, quantities: Dict[int, int]) -> Dict:
+        """Read the products of a cart and check that each has enough stock."""
+        products = await self.product_repository.get_by_ids(quantities.keys())
+        for product_id, quantity in quantities.items():
+            product = products.get(product_id)
             if not product:
-                raise ValueError(f"Product {it['product_id']} not found")
-            if product.stock_quantity < it["quantity"]:
+                raise ValueError(f"Product {product_id} not found")
+            if product.stock_quantity < quantity:
                 raise ValueError("Insufficient stock")
-            total += product.price * it["quantity"]
-            updated_products.append((product, it["quantity"]))
+        return products
+
+    async def _take_stock(self, quantities: Dict[int, int]) -> Dict:
+        """
+        Read the cart and take its stock with one conditional UPDATE.
+        The UPDATE re-checks stock, so a concurrent order that got there
+        first shows up as a missing row here instead of an oversell.
+        """
+        products = await self._load_products(quantities)
+        updated = await self.product_repository.decrement_stock(quantities)
+        if len(updated) != len(quantities):
+            raise ValueError("Insufficient stock")
+        return products
 
-        for product, quantity in updated_products:
-            product.stock_quantity -= quantity
-            await self.product_repository.update(
-                product.id, stock_quantity=product.stock_quantity
+    async def _create_reserved(
+        self,
+        user_id: int,
+        items: List[Dict],
+        quantities: Dict[int, int],
+        stock: Dict[int, int],
+        prices: Dict[int, float],
+    ):
+        """
+        Hold the cart in Redis, write the order and confirm the hold.
+        Product rows are not locked; stock is applied by reconciliation.
+        With a unit of work the hold stays pending until the order is
+        committed, and a rollback returns it to the counters.
+        """
+        reservation_id = await self.reservation_service.reserve(quantities, stock)
+        try:
+            order = await self.order_repository.create(
+                user_id=user_id, items=items, prices=prices
             )
+        except Exception:
+            await self.reservation_service.release(reservation_id)
+            raise
 
-        order = await self.order_repository.create(user_id=user.id, items=items)
+        if self.unit_of_work is None:
+            await self.reservation_service.confirm(reservation_id)
+        else:
+            self.unit_of_work.after_commit(
+                partial(self.reservation_service.confirm, reservation_id)
+            )
+            self.unit_of_work.after_rollback(
+                partial(self.reservation_service.release, reservation_id)
+            )
         return order
 
+    @staticmethod
+    def _get_order_cache_key(order_id: int) -> str:
+        return f"order:{order_id}"
+
+    def _order_to_dict(self, order) -> dict:
+        """Convert Order model to dict for caching (OrderResponse fields)"""
+        return {
+            "id": order.id,
+            "user_id": order.user_id,
+            "total_amount": float(order.total_amount),
+            "status": order.status,
+            "items": [
+                {
+                    "id": item.id,
+                    "product_id": item.product_id,
+                    "quantity": item.quantity,
+                    "unit_price": float(item.unit_price),
+                }
+                for item in order.items
+            ],
+        }
+
+    def _order_cache_ttl(self, order: dict) -> int:
+        ttl = self.ORDER_CACHE_TTLS.get(order["status"], self.DEFAULT_ORDER_CACHE_TTL)
+        return ttl_with_jitter(ttl)
+
     async def get_by_id(self, order_id: int):
         """
         Get a single order by ID.
+        With a cache, the order is read through Redis as a dict and kept for
+        a time that depends on its status; misses are remembered briefly,
+        so repeated lookups of an unknown id are answered from Redis.
         """
-        order = await self.order_repository.get_by_id(order_id)
-        if not order:
+        if self.cache_service is None:
+            order = await self.order_repository.get_by_id(order_id)
+            if not order:
+                raise ValueError(f"Order {order_id} not found")
+            return order
+
+        async def load():
+            order = await self.order_repository.get_by_id(order_id)
+            return self._order_to_dict(order) if order else None
+
+        order = await self.cache_service.get_or_set(
+            self._get_order_cache_key(order_id),
+            load,
+            self._order_cache_ttl,
+            negative_ttl=self.MISSING_ORDER_TTL,
+        )
+        if order is None:
             raise ValueError(f"Order {order_id} not found")
         return order
 
+    async def _invalidate_orders(self, order_ids: List[int]) -> None:
+        if self.cache_service is None or not order_ids:
+            return
+        keys = [self._get_order_cache_key(order_id) for order_id in order_ids]
+
+        async def invalidate() -> None:
+            await self.cache_service.delete_many(keys)
+
+        await run_after_commit(self.unit_of_work, invalidate)
+
     async def delete(self, order_id: int):
         """
         Delete an order by ID.
@@ -73,6 +245,8 @@ class OrderService:
         if not order:
             raise ValueError(f"Order {order_id} not found")
         await self.order_repository.delete(order_id)
+        await self._invalidate_orders([order_id])
+        await self._invalidate_responses()
 
     async def update(self, order_id: int, update_data: Dict):
         """
@@ -83,6 +257,7 @@ class OrderService:
             raise ValueError(f"Order {order_id} not found")
 
         order_fields = {}
+        restocked: Dict[int, int] = {}
 
         if "status" in update_data and update_data["status"] is not None:
             status = update_data["status"]
@@ -101,58 +276,138 @@ class OrderService:
                 )
 
             if status_str == "cancelled" and order.status != "cancelled":
-                for item in order.items:
-                    product = await self.product_repository.get_by_id(item.product_id)
-                    if product:
-                        new_stock = product.stock_quantity + item.quantity
-                        await self.product_repository.update(
-                            product.id, stock_quantity=new_stock
-                        )
+                _, restocked = await self._cancel_and_restock([order_id])
 
             order_fields["status"] = status_str
 
+        stock_deltas: Dict[int, int] = {}
         if "items" in update_data and update_data["items"] is not None:
             items_list = []
             for item in update_data["items"]:
+                if item["quantity"] <= 0:
+                    raise ValueError("Quantity must be greater than 0")
                 items_list.append(
                     {"product_id": item["product_id"], "quantity": item["quantity"]}
                 )
             order_fields["items"] = items_list
 
+            # A cancelled order holds no stock, so its lines can change freely
+            new_status = order_fields.get("status", order.status)
+            if "cancelled" not in (order.status, new_status):
+                stock_deltas = self._stock_deltas(order.items, items_list)
+
         if order_fields:
             updated_order = await self.order_repository.update(order_id, **order_fields)
         else:
             updated_order = order
 
+        if stock_deltas:
+            # Positive deltas take stock, negative ones return it; one UPDATE
+            updated = await self.product_repository.decrement_stock(stock_deltas)
+            if len(updated) != len(stock_deltas):
+                raise ValueError("Insufficient stock")
+            await self._adjust_reserved_stock(
+                {pid: -delta for pid, delta in stock_deltas.items()}
+            )
+
+        await self._invalidate_orders([order_id])
+        await self._invalidate_responses([*restocked, *stock_deltas])
         return updated_order
 
+    @staticmethod
+    def _stock_deltas(old_items, new_items: List[Dict]) -> Dict[int, int]:
+        """Per-product change in reserved quantity between two sets of lines."""
+        deltas: Dict[int, int] = {}
+        for item in old_items:
+            pid = int(item.product_id)
+            deltas[pid] = deltas.get(pid, 0) - int(item.quantity)
+        for item in new_items:
+            pid = int(item["product_id"])
+            deltas[pid] = deltas.get(pid, 0) + int(item["quantity"])
+        return {pid: delta for pid, delta in deltas.items() if delta}
+
+    async def cancel_many(self, order_ids: List[int]) -> List[int]:
+        """
+        Cancel several orders at once and return their stock with a single
+        UPDATE, in the same transaction as the status change.
+        Returns the ids that were actually cancelled.
+        """
+        cancelled, restocked = await self._cancel_and_restock(sorted(set(order_ids)))
+        if cancelled:
+            await self._invalidate_orders(cancelled)
+            await self._invalidate_responses(restocked)
+        return cancelled
+
+    async def _cancel_and_restock(
+        self, order_ids: List[int]
+    ) -> Tuple[List[int], Dict[int, int]]:
+        """Returns the cancelled ids and the quantities put back in stock."""
+        cancelled, quantities = await self.order_repository.cancel_many(order_ids)
+        if quantities:
+            await self.product_repository.increment_stock(quantities)
+            await self._adjust_reserved_stock(quantities)
+        return cancelled, quantities
+
+    async def _adjust_reserved_stock(self, deltas: Dict[int, int]) -> None:
+        """Mirror committed stock changes to the Redis reservation counters."""
+        if self.reservation_service is None:
+            return
+
+        async def adjust() -> None:
+            await self.reservation_service.adjust(deltas)
+
+        await run_after_commit(self.unit_of_work, adjust)
+
     async def get_by_filter(
         self,
         count: int = 10,
         page: int = 1,
         user_id: Optional[int] = None,
         status: Optional[str] = None,
+        cursor: Optional[str] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
     ) -> Dict:
         """
         Returns paginated list of orders with optional filters.
+
+        When `cursor` is given, keyset pagination is used instead of OFFSET
+        and the total is not computed. `next_cursor` is the opaque cursor
+        of the following page, or None on the last page.
+        `created_from` is inclusive, `created_to` is exclusive.
         """
-        offset = (page - 1) * count
+        if status is not None:
+            status = status.value if hasattr(status, "value") else str(status)
+        filters = {
+            "user_id": user_id,
+            "status": status,
+            "created_from": self._as_naive_utc(created_from),
+            "created_to": self._as_naive_utc(created_to),
+        }
 
-        try:
-            total, items = await self.order_repository.list(
-                limit=count, offset=offset, user_id=user_id, status=status
+        if cursor is not None:
+            items = await self.order_repository.list_after(
+                decode_cursor(cursor), limit=count, **filters
             )
-        except TypeError:
-            total, all_orders = await self.order_repository.list(limit=1000, offset=0)
-
-            filtered_orders = all_orders
-            if user_id is not None:
-                filtered_orders = [o for o in filtered_orders if o.user_id == user_id]
-            if status is not None:
-                filtered_orders = [o for o in filtered_orders if o.status == status]
+            return {
+                "total": None,
+                "items": items,
+                "next_cursor": next_cursor(items, count),
+            }
 
-            total = len(filtered_orders)
+        total, items = await self.order_repository.list(
+            limit=count, offset=(page - 1) * count, **filters
+        )
 
-            items = filtered_orders[offset : offset + count]
+        return {
+            "total": total,
+            "items": items,
+            "next_cursor": next_cursor(items, count),
+        }
 
-        return {"total": total, "items": items}
+    @staticmethod
+    def _as_naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+        # orders.created_at is stored as UTC without a time zone
+        if value is None or value.tzinfo is None:
+            return value
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
@@ -0,0 +1,63 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.models.outbox import OutboxEvent
+from src.repositories.outbox_repository import OutboxRepository
+from src.repositories.unit_of_work import UnitOfWork
+
+logger = logging.getLogger(__name__)
+
+
+class OutboxRelay:
+    """
+    Moves committed outbox events to the message broker.
+
+    Each batch is read, published in id order and deleted in one
+    transaction. Rows are deleted only after every publish in the batch
+    succeeded, and a failed commit leaves them in place, so delivery is
+    at-least-once: consumers deduplicate by message id (the outbox row id).
+    """
+
+    def __init__(
+        self,
+        session_maker: async_sessionmaker[AsyncSession],
+        publish: Callable[[OutboxEvent], Awaitable[None]],
+        batch_size: int = 100,
+    ):
+        self.session_maker = session_maker
+        self.publish = publish
+        self.batch_size = batch_size
+
+    async def relay_batch(self) -> int:
+        """Publish up to `batch_size` events. Returns how many were sent."""
+        async with self.session_maker() as session:
+            async with UnitOfWork(session) as uow:
+                outbox = OutboxRepository(uow.session)
+                events = await outbox.fetch_batch(self.batch_size)
+                for event in events:
+                    await self.publish(event)
+                await outbox.delete([event.id for event in events])
+        return len(events)
+
+    async def run(self, shutdown_event: asyncio.Event, interval: float = 1.0) -> None:
+        """
+        Relay until `shutdown_event` is set. Full batches are followed
+        immediately by the next one; otherwise the relay polls every
+        `interval` seconds. Errors (broker not connected yet, database
+        unavailable) are logged and retried on the next poll.
+        """
+        while not shutdown_event.is_set():
+            try:
+                sent = await self.relay_batch()
+            except Exception:
+                logger.exception("Outbox relay failed, retrying in %ss", interval)
+                sent = 0
+            if sent == self.batch_size:
+                continue
+            try:
+                await asyncio.wait_for(shutdown_event.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
@@ -1,25 +1,59 @@
 import logging
-from typing import Any, Dict
+from typing import Any, Dict, Iterable, List, Optional
 
 from src.repositories.product_repository import ProductRepository
-from src.schemas.product import ProductCreate, ProductUpdate
-from src.services.cache_service import CacheService
+from src.repositories.unit_of_work import UnitOfWork, run_after_commit
+from src.schemas.product import ProductCreate, ProductResponse, ProductUpdate
+from src.services.cache_service import CacheService, ttl_with_jitter
+from src.services.reservation_service import ReservationService
+from src.utils.pagination import decode_cursor, next_cursor
 
 logger = logging.getLogger(__name__)
 
 
 class ProductService:
     PRODUCT_CACHE_TTL = 600 # Cache TTL: 10 min
+    MISSING_PRODUCT_TTL = 60  # Tombstone TTL for ids that do not exist
+    CACHE_TAG = "products"  # Response cache tag of the product list
 
-    def __init__(self, product_repository: ProductRepository, cache_service: CacheService):
+    def __init__(
+        self,
+        product_repository: ProductRepository,
+        cache_service: CacheService,
+        unit_of_work: Optional[UnitOfWork] = None,
+        reservation_service: Optional[ReservationService] = None,
+    ):
         self.product_repository = product_repository
         self.cache_service = cache_service
+        # Cache writes wait for its commit, so readers never see rolled-back rows
+        self.unit_of_work = unit_of_work
+        # When set, stock edits are mirrored to the Redis reservation counters
+        self.reservation_service = reservation_service
 
-    def _get_product_cache_key(self, product_id: int) -> str:
+    @staticmethod
+    def _get_product_cache_key(product_id: int) -> str:
         """Generate cache key for product"""
         return f"product:{product_id}"
 
-    def _product_to_dict(self, product) -> dict:
+    @staticmethod
+    def _get_product_body_key(product_id: int) -> str:
+        """Cache key for the encoded ProductResponse body"""
+        return f"product:{product_id}:json"
+
+    @classmethod
+    def cache_keys(cls, product_ids: Iterable[int]) -> List[str]:
+        """Per-product keys to evict when a product row changes"""
+        return [
+            key
+            for product_id in product_ids
+            for key in (
+                cls._get_product_cache_key(product_id),
+                cls._get_product_body_key(product_id),
+            )
+        ]
+
+    @staticmethod
+    def _product_to_dict(product) -> dict:
         """Convert Product model to dict for caching"""
         return {
             "id": product.id,
@@ -30,30 +64,121 @@ class ProductService:
 
     async def create(self, data: ProductCreate | dict) ->  Dict[str, Any]:
         payload = data.model_dump() if hasattr(data, "model_dump") else dict(data)
-        return await self.product_repository.create(**payload)
+        product = await self.product_repository.create(**payload)
+        product_dict = self._product_to_dict(product)
+
+        async def refresh_cache() -> None:
+            # Overwrites a tombstone left by earlier lookups of this id
+            await self.cache_service.set(
+                self._get_product_cache_key(product_dict["id"]),
+                product_dict,
+                ttl_with_jitter(self.PRODUCT_CACHE_TTL),
+            )
+            await self.cache_service.invalidate_namespace(self.CACHE_TAG)
+
+        await run_after_commit(self.unit_of_work, refresh_cache)
+        return product
 
     async def get_by_id(self, product_id: int):
-        """Get product by id (with caching)"""
-        cache_key = self._get_product_cache_key(product_id)
-        
-        cached_data = await self.cache_service.get(cache_key)
-        if cached_data:
-            logger.info(f"Cache HIT for product {product_id}")
-            return cached_data
-        
-        logger.info(f"Cache MISS for product {product_id}")
-        product = await self.product_repository.get_by_id(product_id)
-        
-        if product:
-            product_dict = self._product_to_dict(product)
-            await self.cache_service.set(cache_key, product_dict, self.PRODUCT_CACHE_TTL)
-            return product
-        
-        return None
+        """
+        Get product by id (with caching).
+        Concurrent misses are coalesced into one database read.
+        """
+
+        async def load():
+            product = await self.product_repository.get_by_id(product_id)
+            return self._product_to_dict(product) if product else None
+
+        return await self.cache_service.get_or_set(
+            self._get_product_cache_key(product_id),
+            load,
+            ttl_with_jitter(self.PRODUCT_CACHE_TTL),
+            negative_ttl=self.MISSING_PRODUCT_TTL,
+        )
+
+    async def get_json_by_id(self, product_id: int) -> bytes | None:
+        """
+        Get the product as an encoded ProductResponse JSON body.
+        A hit is served as stored, without decoding or validation.
+        """
+        body_key = self._get_product_body_key(product_id)
+        body = await self.cache_service.get_bytes(body_key)
+        if body is not None:
+            return body
+
+        product = await self.get_by_id(product_id)
+        if product is None:
+            return None
+        body = ProductResponse.model_validate(product).model_dump_json().encode()
+        await self.cache_service.set_bytes(
+            body_key, body, ttl_with_jitter(self.PRODUCT_CACHE_TTL), invalidate=False
+        )
+        return body
+
+    async def get_many_by_id(self, product_ids: Iterable[int]) -> Dict[int, dict]:
+        """
+        Get several products with one MGET and one IN query for the misses.
+        Returns: {product_id: product dict} for the products that exist
+        """
+        ids = list(dict.fromkeys(product_ids))
+        if not ids:
+            return {}
+
+        keys = [self._get_product_cache_key(product_id) for product_id in ids]
+        cached = await self.cache_service.get_many(keys)
+        found = {pid: data for pid, data in zip(ids, cached) if data}
 
-    async def get_by_filter(self, count: int = 10, page: int = 1) -> Dict[str, Any]:
-        """Get product with page filter"""
-        return await self.product_repository.get_by_filter(count, page)
+        missing = [product_id for product_id in ids if product_id not in found]
+        if missing:
+            products = await self.product_repository.get_by_ids(missing)
+            fresh = {pid: self._product_to_dict(p) for pid, p in products.items()}
+            await self.cache_service.set_many(
+                {self._get_product_cache_key(pid): data for pid, data in fresh.items()},
+                ttl_with_jitter(self.PRODUCT_CACHE_TTL),
+                invalidate=False,
+            )
+            tombstones = {
+                self._get_product_cache_key(pid): CacheService.TOMBSTONE
+                for pid in missing
+                if pid not in fresh
+            }
+            if tombstones:
+                await self.cache_service.set_many(
+                    tombstones, self.MISSING_PRODUCT_TTL, invalidate=False
+                )
+            found.update(fresh)
+
+        logger.debug(
+            "Cache batch for products: %s hits, %s misses",
+            len(ids) - len(missing),
+            len(missing),
+        )
+        return {
+            pid: found[pid]
+            for pid in ids
+            if pid in found and not CacheService.is_tombstone(found[pid])
+        }
+
+    async def get_by_filter(
+        self, count: int = 10, page: int = 1, cursor: str | None = None
+    ) -> Dict[str, Any]:
+        """
+        Get product with page filter.
+        With a cursor, pages by primary key and skips the total count.
+        """
+        if cursor is not None:
+            items = await self.product_repository.get_after(
+                decode_cursor(cursor), count
+            )
+            return {
+                "total": None,
+                "items": items,
+                "next_cursor": next_cursor(items, count),
+            }
+
+        result = await self.product_repository.get_by_filter(count, page)
+        result["next_cursor"] = next_cursor(result["items"], count)
+        return result
 
     async def update(self, product_id: int, data: ProductUpdate | dict) ->  Dict[str, Any]:
         """Update product with caching"""
@@ -62,21 +187,51 @@ class ProductService:
             if hasattr(data, "model_dump")
             else dict(data)
         )
-        
+        old_stock = None
+        if self.reservation_service is not None and "stock_quantity" in patch:
+            current = await self.product_repository.get_by_id(product_id)
+            old_stock = current.stock_quantity if current else None
+
         updated_product = await self.product_repository.update(product_id, **patch)
         
         if updated_product:
-            cache_key = self._get_product_cache_key(product_id)
             product_dict = self._product_to_dict(updated_product)
-            await self.cache_service.set(cache_key, product_dict, self.PRODUCT_CACHE_TTL)
-            logger.info(f"Cache UPDATED for product {product_id}")
+            if old_stock is not None:
+                await self._adjust_reserved_stock(
+                    product_id, product_dict["stock_quantity"] - old_stock
+                )
+
+            async def refresh_cache() -> None:
+                await self.cache_service.set(
+                    self._get_product_cache_key(product_id),
+                    product_dict,
+                    ttl_with_jitter(self.PRODUCT_CACHE_TTL),
+                )
+                await self.cache_service.delete(self._get_product_body_key(product_id))
+                await self.cache_service.invalidate_namespace(self.CACHE_TAG)
+                logger.debug("Cache UPDATED for product %s", product_id)
+
+            await run_after_commit(self.unit_of_work, refresh_cache)
         
         return updated_product
 
     async def delete(self, product_id: int) -> None:
         """Delete product from db and cache"""
         await self.product_repository.delete(product_id)
-        
-        cache_key = self._get_product_cache_key(product_id)
-        await self.cache_service.delete(cache_key)
-        logger.info(f"Cache DELETED for product {product_id}")
+
+        async def evict_cache() -> None:
+            await self.cache_service.delete_many(self.cache_keys([product_id]))
+            await self.cache_service.invalidate_namespace(self.CACHE_TAG)
+            logger.debug("Cache DELETED for product %s", product_id)
+
+        await run_after_commit(self.unit_of_work, evict_cache)
+
+    async def _adjust_reserved_stock(self, product_id: int, delta: int) -> None:
+        """Shift the available counter by a committed change of stock_quantity."""
+        if not delta:
+            return
+
+        async def adjust() -> None:
+            await self.reservation_service.adjust({product_id: delta})
+
+        await run_after_commit(self.unit_of_work, adjust)
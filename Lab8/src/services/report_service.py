@@ -6,6 +6,8 @@ from src.repositories.report_repository import ReportRepository
 
 class ReportService:
     """Сервис для работы с отчетами."""
+
+    CACHE_TAG = "reports"  # Тег кеша ответов /report, сбрасывается при записи заказов
     
     def __init__(self, report_repository: ReportRepository):
         self.report_repository = report_repository
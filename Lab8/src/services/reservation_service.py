@@ -0,0 +1,291 @@
+import logging
+import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from redis.asyncio import Redis
+
+from src.repositories.product_repository import ProductRepository
+from src.repositories.reservation_repository import ReservationRepository
+from src.services.cache_service import RELEASE_LOCK_SCRIPT
+
+logger = logging.getLogger(__name__)
+
+
+# KEYS: stock keys..., hold hash, expiry zset
+# ARGV: reservation id, expires_at, quantities..., product ids...
+# Returns 0 on success, i if product i is short, -i if its counter is missing.
+RESERVE_SCRIPT = """
+local n = #KEYS - 2
+for i = 1, n do
+    local available = redis.call('GET', KEYS[i])
+    if not available then
+        return -i
+    end
+    if tonumber(available) < tonumber(ARGV[i + 2]) then
+        return i
+    end
+end
+for i = 1, n do
+    redis.call('DECRBY', KEYS[i], ARGV[i + 2])
+    redis.call('HSET', KEYS[n + 1], ARGV[n + i + 2], ARGV[i + 2])
+end
+redis.call('ZADD', KEYS[n + 2], ARGV[2], ARGV[1])
+return 0
+"""
+
+# KEYS: hold hash, expiry zset; ARGV: reservation id, stock key prefix
+RELEASE_SCRIPT = """
+if redis.call('ZREM', KEYS[2], ARGV[1]) == 0 then
+    return 0
+end
+local hold = redis.call('HGETALL', KEYS[1])
+for i = 1, #hold, 2 do
+    redis.call('INCRBY', ARGV[2] .. hold[i], hold[i + 1])
+end
+redis.call('DEL', KEYS[1])
+return 1
+"""
+
+# KEYS: expiry zset, confirmed list; ARGV: reservation id
+CONFIRM_SCRIPT = """
+if redis.call('ZREM', KEYS[1], ARGV[1]) == 0 then
+    return 0
+end
+redis.call('RPUSH', KEYS[2], ARGV[1])
+return 1
+"""
+
+# KEYS: stock keys...; ARGV: deltas...
+ADJUST_SCRIPT = """
+for i = 1, #KEYS do
+    if redis.call('EXISTS', KEYS[i]) == 1 then
+        redis.call('INCRBY', KEYS[i], ARGV[i])
+    end
+end
+return 1
+"""
+
+
+class ReservationService:
+    """
+    Stock reservations held in Redis in front of the products table.
+
+    Available counts live in ``stock:{product_id}`` and are seeded from the
+    database the first time a product is reserved. A cart is reserved with
+    one Lua script, so either every line is held or none is. Holds expire
+    after ``ttl`` seconds and are returned by ``release_expired``; confirmed
+    holds are queued and applied to Postgres in batches by ``reconcile``,
+    which records every applied line so a replayed batch is not applied twice.
+
+    The scripts build hold and stock keys at run time, so they assume a
+    single Redis instance rather than a cluster.
+    """
+
+    STOCK_PREFIX = "stock:"
+    HOLD_PREFIX = "reservation:"
+    EXPIRY_KEY = "reservations:expiry"
+    CONFIRMED_KEY = "reservations:confirmed"
+    RECONCILE_LOCK_KEY = "reservations:reconcile:lock"
+
+    def __init__(self, redis_client: Redis, ttl: int = 900):
+        self.redis = redis_client
+        self.ttl = ttl
+        self._reserve = redis_client.register_script(RESERVE_SCRIPT)
+        self._release = redis_client.register_script(RELEASE_SCRIPT)
+        self._confirm = redis_client.register_script(CONFIRM_SCRIPT)
+        self._adjust = redis_client.register_script(ADJUST_SCRIPT)
+        self._release_lock = redis_client.register_script(RELEASE_LOCK_SCRIPT)
+
+    def _stock_key(self, product_id: int) -> str:
+        return f"{self.STOCK_PREFIX}{product_id}"
+
+    def _hold_key(self, reservation_id: str) -> str:
+        return f"{self.HOLD_PREFIX}{reservation_id}"
+
+    async def reserve(self, quantities: Dict[int, int], stock: Dict[int, int]) -> str:
+        """
+        Hold quantities for a whole cart.
+        `stock` is the database stock per product, used to seed counters
+        that do not exist yet.
+        Returns the reservation id; raises ValueError if any line is short.
+        """
+        product_ids = sorted(quantities)
+        reservation_id = uuid.uuid4().hex
+        keys = [self._stock_key(pid) for pid in product_ids]
+        keys += [self._hold_key(reservation_id), self.EXPIRY_KEY]
+        args = [reservation_id, time.time() + self.ttl]
+        args += [quantities[pid] for pid in product_ids]
+        args += product_ids
+
+        for _ in range(2):
+            result = int(await self._reserve(keys=keys, args=args))
+            if result == 0:
+                return reservation_id
+            if result > 0:
+                raise ValueError("Insufficient stock")
+            await self._seed({pid: stock[pid] for pid in product_ids})
+
+        raise ValueError("Insufficient stock")
+
+    async def _seed(self, stock: Dict[int, int]) -> None:
+        """Create missing counters; existing ones are left untouched."""
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for product_id, quantity in stock.items():
+                pipe.set(self._stock_key(product_id), quantity, nx=True)
+            await pipe.execute()
+
+    async def confirm(self, reservation_id: str) -> None:
+        """Queue a hold for reconciliation; raises ValueError if it expired."""
+        keys = [self.EXPIRY_KEY, self.CONFIRMED_KEY]
+        if not int(await self._confirm(keys=keys, args=[reservation_id])):
+            raise ValueError("Reservation expired")
+
+    async def release(self, reservation_id: str) -> bool:
+        """Return a pending hold to the available counters."""
+        keys = [self._hold_key(reservation_id), self.EXPIRY_KEY]
+        args = [reservation_id, self.STOCK_PREFIX]
+        return bool(int(await self._release(keys=keys, args=args)))
+
+    async def release_expired(self, batch_size: int = 500) -> int:
+        """Release holds whose TTL has passed. Returns how many were released."""
+        expired = await self.redis.zrangebyscore(
+            self.EXPIRY_KEY, "-inf", time.time(), start=0, num=batch_size
+        )
+        released = 0
+        for reservation_id in expired:
+            if isinstance(reservation_id, bytes):
+                reservation_id = reservation_id.decode()
+            released += await self.release(reservation_id)
+        return released
+
+    async def adjust(self, deltas: Dict[int, int]) -> None:
+        """
+        Apply stock changes made directly in the database (restocks, order
+        edits) to counters that are already seeded.
+        """
+        deltas = {pid: delta for pid, delta in deltas.items() if delta}
+        if not deltas:
+            return
+        product_ids = sorted(deltas)
+        await self._adjust(
+            keys=[self._stock_key(pid) for pid in product_ids],
+            args=[deltas[pid] for pid in product_ids],
+        )
+
+    @asynccontextmanager
+    async def reconcile_lock(self, timeout: int = 300) -> AsyncIterator[bool]:
+        """
+        Keep overlapping reconcile runs apart. Yields False when another run
+        holds the lock; it expires after `timeout` seconds if its owner dies.
+        """
+        token = uuid.uuid4().hex
+        acquired = bool(
+            await self.redis.set(self.RECONCILE_LOCK_KEY, token, nx=True, ex=timeout)
+        )
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                await self._release_lock(keys=[self.RECONCILE_LOCK_KEY], args=[token])
+
+    async def reconcile(
+        self,
+        product_repository: ProductRepository,
+        reservation_repository: ReservationRepository,
+        batch_size: int = 500,
+    ) -> Tuple[List[str], Dict[str, List[int]], List[int]]:
+        """
+        Apply the oldest confirmed holds to the products table with one
+        UPDATE. The caller commits and then calls `acknowledge` with the
+        result, so a failed commit leaves the batch queued.
+
+        Applied lines are recorded through `reservation_repository` in the
+        same transaction. Lines recorded by an earlier run whose acknowledge
+        never happened are skipped, and a run racing on the same lines fails
+        on the insert and rolls back, so stock is decremented once per line.
+
+        Returns the batch ids, the holds to requeue and the products whose
+        stock was updated. A product whose database stock is lower than its
+        reserved total is not updated, and every hold on it stays confirmed
+        (mapped to the products of that hold that were applied) to be
+        retried by a later run. Lines of deleted products are dropped.
+        """
+        ids = await self.redis.lrange(self.CONFIRMED_KEY, 0, batch_size - 1)
+        ids = [i.decode() if isinstance(i, bytes) else i for i in ids]
+        if not ids:
+            return [], {}, []
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for reservation_id in ids:
+                pipe.hgetall(self._hold_key(reservation_id))
+            holds = await pipe.execute()
+        holds = [
+            {int(product_id): int(quantity) for product_id, quantity in hold.items()}
+            for hold in holds
+        ]
+
+        applied = await reservation_repository.applied_lines(ids)
+        pending = [
+            {
+                product_id: quantity
+                for product_id, quantity in hold.items()
+                if (reservation_id, product_id) not in applied
+            }
+            for reservation_id, hold in zip(ids, holds)
+        ]
+
+        quantities: Dict[int, int] = {}
+        for hold in pending:
+            for product_id, quantity in hold.items():
+                quantities[product_id] = quantities.get(product_id, 0) + quantity
+
+        updated = await product_repository.decrement_stock(quantities)
+        skipped = quantities.keys() - updated.keys()
+        if skipped:
+            # A deleted product has no stock to apply; its lines are dropped
+            skipped &= (await product_repository.get_by_ids(skipped)).keys()
+        for product_id in sorted(skipped):
+            logger.warning(
+                "Reconciliation deferred product %s: database stock is lower "
+                "than the reserved quantity",
+                product_id,
+            )
+
+        await reservation_repository.add_applied(
+            (reservation_id, product_id)
+            for reservation_id, hold in zip(ids, pending)
+            for product_id in hold
+            if product_id not in skipped
+        )
+
+        requeue = {
+            reservation_id: sorted(hold.keys() - skipped)
+            for reservation_id, hold in zip(ids, holds)
+            if hold.keys() & skipped
+        }
+        return ids, requeue, sorted(updated)
+
+    async def acknowledge(
+        self,
+        reservation_ids: List[str],
+        requeue: Optional[Dict[str, List[int]]] = None,
+    ) -> None:
+        """
+        Drop a reconciled batch from the queue. Holds in `requeue` lose the
+        lines that were applied and go back to the end of the queue.
+        """
+        if not reservation_ids:
+            return
+        requeue = requeue or {}
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.ltrim(self.CONFIRMED_KEY, len(reservation_ids), -1)
+            done = [rid for rid in reservation_ids if rid not in requeue]
+            if done:
+                pipe.delete(*[self._hold_key(rid) for rid in done])
+            for reservation_id, applied in requeue.items():
+                if applied:
+                    pipe.hdel(self._hold_key(reservation_id), *applied)
+                pipe.rpush(self.CONFIRMED_KEY, reservation_id)
+            await pipe.execute()
@@ -0,0 +1,167 @@
+import json
+import zlib
+from abc import ABC, abstractmethod
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, Optional
+
+try:
+    import msgpack
+except ImportError:  # declared dependency; checked when CACHE_CODEC=msgpack
+    msgpack = None
+
+FLAG_ZLIB = 0x01
+_DATETIME_TAG = "__datetime__"
+_DATE_TAG = "__date__"
+_EXT_DATETIME = 1
+_EXT_DATE = 2
+
+
+class Codec(ABC):
+    """Turns cache values into bytes and back."""
+
+    codec_id: int
+    name: str
+
+    @abstractmethod
+    def encode(self, value: Any) -> bytes: ...
+
+    @abstractmethod
+    def decode(self, data: bytes) -> Any: ...
+
+
+class JsonCodec(Codec):
+    """JSON that keeps datetimes and dates as such instead of strings."""
+
+    codec_id = 1
+    name = "json"
+
+    @staticmethod
+    def _default(value: Any) -> Any:
+        if isinstance(value, datetime):
+            return {_DATETIME_TAG: value.isoformat()}
+        if isinstance(value, date):
+            return {_DATE_TAG: value.isoformat()}
+        if isinstance(value, Decimal):
+            return float(value)
+        return str(value)
+
+    @staticmethod
+    def _object_hook(obj: Dict) -> Any:
+        if len(obj) == 1:
+            if _DATETIME_TAG in obj:
+                return datetime.fromisoformat(obj[_DATETIME_TAG])
+            if _DATE_TAG in obj:
+                return date.fromisoformat(obj[_DATE_TAG])
+        return obj
+
+    def encode(self, value: Any) -> bytes:
+        return json.dumps(value, default=self._default, separators=(",", ":")).encode()
+
+    def decode(self, data: bytes) -> Any:
+        return json.loads(data, object_hook=self._object_hook)
+
+
+class MsgpackCodec(Codec):
+    """Binary msgpack with extension types for datetimes and dates."""
+
+    codec_id = 2
+    name = "msgpack"
+
+    def __init__(self):
+        if msgpack is None:
+            raise RuntimeError("msgpack is not installed")
+
+    @staticmethod
+    def _default(value: Any) -> Any:
+        if isinstance(value, datetime):
+            return msgpack.ExtType(_EXT_DATETIME, value.isoformat().encode())
+        if isinstance(value, date):
+            return msgpack.ExtType(_EXT_DATE, value.isoformat().encode())
+        if isinstance(value, Decimal):
+            return float(value)
+        return str(value)
+
+    @staticmethod
+    def _ext_hook(code: int, data: bytes) -> Any:
+        if code == _EXT_DATETIME:
+            return datetime.fromisoformat(data.decode())
+        if code == _EXT_DATE:
+            return date.fromisoformat(data.decode())
+        return msgpack.ExtType(code, data)
+
+    def encode(self, value: Any) -> bytes:
+        return msgpack.packb(value, default=self._default, use_bin_type=True)
+
+    def decode(self, data: bytes) -> Any:
+        return msgpack.unpackb(
+            data, ext_hook=self._ext_hook, raw=False, strict_map_key=False
+        )
+
+
+CODECS = {JsonCodec.codec_id: JsonCodec, MsgpackCodec.codec_id: MsgpackCodec}
+
+
+class CacheSerializer:
+    """
+    Frames encoded values as: codec id (1 byte), flags (1 byte), payload.
+
+    The codec id lets workers read values written with any known codec, so
+    a new codec can be rolled out without flushing Redis. Payloads larger
+    than `compress_threshold` bytes are zlib-compressed. Values without a
+    header are plain JSON written before framing existed.
+    """
+
+    def __init__(
+        self,
+        codec: Optional[Codec] = None,
+        compress_threshold: Optional[int] = 1024,
+        compress_level: int = 1,
+    ):
+        self.codec = codec or JsonCodec()
+        self.compress_threshold = compress_threshold
+        self.compress_level = compress_level
+        self._decoders: Dict[int, Codec] = {self.codec.codec_id: self.codec}
+
+    def dumps(self, value: Any) -> bytes:
+        payload = self.codec.encode(value)
+        flags = 0
+        if (
+            self.compress_threshold is not None
+            and len(payload) > self.compress_threshold
+        ):
+            payload = zlib.compress(payload, self.compress_level)
+            flags |= FLAG_ZLIB
+        return bytes((self.codec.codec_id, flags)) + payload
+
+    def loads(self, data: bytes | str) -> Any:
+        if isinstance(data, str):
+            data = data.encode()
+        if len(data) < 2 or data[0] not in CODECS:
+            return json.loads(data)  # legacy unframed JSON
+        codec_id, flags, payload = data[0], data[1], data[2:]
+        if flags & FLAG_ZLIB:
+            payload = zlib.decompress(payload)
+        return self._decoder(codec_id).decode(payload)
+
+    def _decoder(self, codec_id: int) -> Codec:
+        decoder = self._decoders.get(codec_id)
+        if decoder is None:
+            decoder = self._decoders[codec_id] = CODECS[codec_id]()
+        return decoder
+
+
+def create_serializer(
+    name: str = "json", compress_threshold: Optional[int] = 1024
+) -> CacheSerializer:
+    """
+    Build a serializer by codec name. Fails at startup when the codec is
+    unknown or msgpack is configured but not installed, rather than
+    silently writing a different format than the one configured.
+    """
+    codecs = {codec.name: codec for codec in CODECS.values()}
+    if name not in codecs:
+        raise ValueError(
+            f"Unknown cache codec {name!r}, expected one of {sorted(codecs)}"
+        )
+    return CacheSerializer(codecs[name](), compress_threshold)
@@ -1,25 +1,42 @@
 import logging
+from typing import Dict, Iterable, Optional
 
 from src.models.user import User
+from src.repositories.unit_of_work import UnitOfWork, run_after_commit
 from src.repositories.user_repository import UserRepository
-from src.schemas.user import UserCreate, UserUpdate
-from src.services.cache_service import CacheService
+from src.schemas.user import UserCreate, UserResponse, UserUpdate
+from src.services.cache_service import CacheService, ttl_with_jitter
+from src.utils.pagination import decode_cursor, next_cursor
 
 logger = logging.getLogger(__name__)
 
 
 class UserService:
     USER_CACHE_TTL = 3600 # Cache TTL: 1 hour
+    MISSING_USER_TTL = 60  # Tombstone TTL for ids that do not exist
+    CACHE_TAG = "users"  # Response cache tag of the user list
 
-    def __init__(self, user_repository: UserRepository, cache_service: CacheService):
+    def __init__(
+        self,
+        user_repository: UserRepository,
+        cache_service: CacheService,
+        unit_of_work: Optional[UnitOfWork] = None,
+    ):
         self.user_repository = user_repository
         self.cache_service = cache_service
+        # Cache writes wait for its commit, so readers never see rolled-back rows
+        self.unit_of_work = unit_of_work
 
     def _get_user_cache_key(self, user_id: int) -> str:
         """Generate cache key for user"""
         return f"user:{user_id}"
+
+    def _get_user_body_key(self, user_id: int) -> str:
+        """Cache key for the encoded UserResponse body"""
+        return f"user:{user_id}:json"
     
-    def _user_to_dict(self, user: User) -> dict:
+    @staticmethod
+    def _user_to_dict(user: User) -> dict:
         """Convert User model to dict for caching"""
         return {
             "id": user.id,
@@ -31,34 +48,127 @@ class UserService:
             "updated_at": user.updated_at.isoformat() if user.updated_at else None,
         }
 
-    async def get_by_id(self, user_id: int) -> User | None:
-        """Get user by ID"""
-        cache_key = self._get_user_cache_key(user_id)
+    async def get_by_id(self, user_id: int) -> dict | None:
+        """
+        Get user by ID (with caching).
+        Concurrent misses are coalesced into one database read.
+        """
 
-        cached_data = await self.cache_service.get(cache_key)
-        if cached_data:
-            logger.info(f"Cache HIT for user {user_id}")
-            return cached_data
-        
-        logger.info(f"Cache MISS for user {user_id}")
-        user = await self.user_repository.get_by_id(user_id)
-        
-        if user:
-            user_dict = self._user_to_dict(user)
-            await self.cache_service.set(cache_key, user_dict, self.USER_CACHE_TTL)
-            return user
-        
-        return None
+        async def load():
+            user = await self.user_repository.get_by_id(user_id)
+            return self._user_to_dict(user) if user else None
+
+        return await self.cache_service.get_or_set(
+            self._get_user_cache_key(user_id),
+            load,
+            ttl_with_jitter(self.USER_CACHE_TTL),
+            negative_ttl=self.MISSING_USER_TTL,
+        )
+
+    async def get_json_by_id(self, user_id: int) -> bytes | None:
+        """
+        Get the user as an encoded UserResponse JSON body.
+        A hit is served as stored, without decoding or validation.
+        """
+        body_key = self._get_user_body_key(user_id)
+        body = await self.cache_service.get_bytes(body_key)
+        if body is not None:
+            return body
+
+        user = await self.get_by_id(user_id)
+        if user is None:
+            return None
+        body = UserResponse.model_validate(user).model_dump_json().encode()
+        await self.cache_service.set_bytes(
+            body_key, body, ttl_with_jitter(self.USER_CACHE_TTL), invalidate=False
+        )
+        return body
+
+    async def get_many_by_id(self, user_ids: Iterable[int]) -> Dict[int, dict]:
+        """
+        Get several users with one MGET and one IN query for the misses.
+        Returns: {user_id: user dict} for the users that exist
+        """
+        ids = list(dict.fromkeys(user_ids))
+        if not ids:
+            return {}
+
+        keys = [self._get_user_cache_key(user_id) for user_id in ids]
+        cached = await self.cache_service.get_many(keys)
+        found = {uid: data for uid, data in zip(ids, cached) if data}
+
+        missing = [user_id for user_id in ids if user_id not in found]
+        if missing:
+            users = await self.user_repository.get_by_ids(missing)
+            fresh = {uid: self._user_to_dict(user) for uid, user in users.items()}
+            await self.cache_service.set_many(
+                {self._get_user_cache_key(uid): data for uid, data in fresh.items()},
+                ttl_with_jitter(self.USER_CACHE_TTL),
+                invalidate=False,
+            )
+            tombstones = {
+                self._get_user_cache_key(uid): CacheService.TOMBSTONE
+                for uid in missing
+                if uid not in fresh
+            }
+            if tombstones:
+                await self.cache_service.set_many(
+                    tombstones, self.MISSING_USER_TTL, invalidate=False
+                )
+            found.update(fresh)
+
+        logger.debug(
+            "Cache batch for users: %s hits, %s misses",
+            len(ids) - len(missing),
+            len(missing),
+        )
+        return {
+            uid: found[uid]
+            for uid in ids
+            if uid in found and not CacheService.is_tombstone(found[uid])
+        }
+
+    async def get_by_filter(
+        self, count: int, page: int, cursor: str | None = None, **kwargs
+    ) -> dict:
+        """
+        Get a list of users with filtering and the total number.
+        With a cursor, pages by primary key and skips the total count.
+        """
+        if cursor is not None:
+            users = await self.user_repository.get_after(
+                decode_cursor(cursor), count, **kwargs
+            )
+            return {
+                "total": None,
+                "items": users,
+                "next_cursor": next_cursor(users, count),
+            }
 
-    async def get_by_filter(self, count: int, page: int, **kwargs) -> dict:
-        """Get a list of users with filtering and the total number"""
         users = await self.user_repository.get_by_filter(count, page, **kwargs)
         total = await self.user_repository.count(**kwargs)
-        return {"total": total, "items": users}
+        return {
+            "total": total,
+            "items": users,
+            "next_cursor": next_cursor(users, count),
+        }
 
     async def create(self, user_data: UserCreate) -> User:
         """Create a new user"""
-        return await self.user_repository.create(user_data)
+        user = await self.user_repository.create(user_data)
+        user_dict = self._user_to_dict(user)
+
+        async def refresh_cache() -> None:
+            # Overwrites a tombstone left by earlier lookups of this id
+            await self.cache_service.set(
+                self._get_user_cache_key(user_dict["id"]),
+                user_dict,
+                ttl_with_jitter(self.USER_CACHE_TTL),
+            )
+            await self.cache_service.invalidate_namespace(self.CACHE_TAG)
+
+        await run_after_commit(self.unit_of_work, refresh_cache)
+        return user
 
     async def update(self, user_id: int, user_data: UserUpdate) -> User:
         """Update user data"""
@@ -71,17 +181,31 @@ class UserService:
         updated_user = await self.user_repository.update(user_id, user_data)
         
         if updated_user:
-            cache_key = self._get_user_cache_key(user_id)
             user_dict = self._user_to_dict(updated_user)
-            await self.cache_service.set(cache_key, user_dict, self.USER_CACHE_TTL)
-            logger.info(f"Cache UPDATED for user {user_id}")
+
+            async def refresh_cache() -> None:
+                await self.cache_service.set(
+                    self._get_user_cache_key(user_id),
+                    user_dict,
+                    ttl_with_jitter(self.USER_CACHE_TTL),
+                )
+                await self.cache_service.delete(self._get_user_body_key(user_id))
+                await self.cache_service.invalidate_namespace(self.CACHE_TAG)
+                logger.debug("Cache UPDATED for user %s", user_id)
+
+            await run_after_commit(self.unit_of_work, refresh_cache)
         
         return updated_user
 
     async def delete(self, user_id: int) -> None:
         """Удалить пользователя"""
         await self.user_repository.delete(user_id)
-        
-        cache_key = self._get_user_cache_key(user_id)
-        await self.cache_service.delete(cache_key)
-        logger.info(f"Cache DELETED for user {user_id}")
+
+        async def evict_cache() -> None:
+            await self.cache_service.delete_many(
+                [self._get_user_cache_key(user_id), self._get_user_body_key(user_id)]
+            )
+            await self.cache_service.invalidate_namespace(self.CACHE_TAG)
+            logger.debug("Cache DELETED for user %s", user_id)
+
+        await run_after_commit(self.unit_of_work, evict_cache)
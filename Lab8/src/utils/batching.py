@@ -0,0 +1,87 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Generic, List, Optional, Set, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class MessageBatcher(Generic[T]):
+    """
+    Groups messages that are delivered concurrently into batches.
+
+    A batch is closed after `max_size` messages or `max_wait` seconds from
+    its first message and handed to `process` as a whole (one session and
+    one transaction per batch). `submit` returns only once its batch has
+    been committed, so the broker acks the whole batch together. A failed
+    batch is split in half and each half is retried on its own until the
+    failure is narrowed down to single messages; only their `submit`
+    calls raise.
+    """
+
+    def __init__(
+        self,
+        process: Callable[[List[T]], Awaitable[None]],
+        max_size: int = 100,
+        max_wait: float = 0.05,
+    ):
+        self.process = process
+        self.max_size = max_size
+        self.max_wait = max_wait
+        self._pending: List[Tuple[T, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._lock = asyncio.Lock()  # batches are committed one at a time
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def submit(self, item: T) -> None:
+        """Queue a message and wait until its batch is committed."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        task = asyncio.get_running_loop().create_task(self._process(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _process(self, batch: List[Tuple[T, asyncio.Future]]) -> None:
+        async with self._lock:
+            try:
+                await self._run(batch)
+            except asyncio.CancelledError:
+                for _, future in batch:
+                    future.cancel()
+                raise
+
+    async def _run(self, batch: List[Tuple[T, asyncio.Future]]) -> None:
+        try:
+            await self.process([item for item, _ in batch])
+        except Exception as e:
+            if len(batch) == 1:
+                _, future = batch[0]
+                if not future.done():
+                    future.set_exception(e)
+                return
+            logger.warning(
+                "Batch of %s messages failed (%s), retrying in halves", len(batch), e
+            )
+            middle = len(batch) // 2
+            await self._run(batch[:middle])
+            await self._run(batch[middle:])
+            return
+
+        for _, future in batch:
+            if not future.done():
+                future.set_result(None)
@@ -0,0 +1,61 @@
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+
+class ConsumerLimits:
+    """
+    Concurrency limits of one queue consumer.
+
+    `prefetch_count` caps the unacknowledged deliveries RabbitMQ pushes to
+    the consumer's channel, `max_in_flight` caps the handlers running at
+    once. `db_slots` is shared by every consumer in the process and is
+    sized to the SQLAlchemy pool, so handlers wait here instead of timing
+    out on `pool.connect()`.
+    """
+
+    def __init__(
+        self,
+        prefetch_count: int,
+        max_in_flight: int,
+        db_slots: Optional[asyncio.Semaphore] = None,
+    ):
+        if prefetch_count < 1 or max_in_flight < 1:
+            raise ValueError("prefetch_count and max_in_flight must be positive")
+        self.prefetch_count = prefetch_count
+        self.max_in_flight = max_in_flight
+        self.db_slots = db_slots
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+
+    @classmethod
+    def from_env(
+        cls,
+        queue: str,
+        max_in_flight: int = 10,
+        db_slots: Optional[asyncio.Semaphore] = None,
+    ) -> "ConsumerLimits":
+        """
+        Read `{QUEUE}_MAX_IN_FLIGHT` and `{QUEUE}_PREFETCH_COUNT`.
+        Prefetch defaults to twice the in-flight limit, so the next
+        messages are already local when a handler finishes.
+        """
+        prefix = queue.upper()
+        max_in_flight = int(os.getenv(f"{prefix}_MAX_IN_FLIGHT", max_in_flight))
+        prefetch_count = int(os.getenv(f"{prefix}_PREFETCH_COUNT", max_in_flight * 2))
+        return cls(prefetch_count, max_in_flight, db_slots)
+
+    @asynccontextmanager
+    async def handler(self) -> AsyncIterator[None]:
+        """Hold one in-flight slot for the lifetime of a message handler."""
+        async with self._in_flight:
+            yield
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[None]:
+        """Hold one database slot while a session is open."""
+        if self.db_slots is None:
+            yield
+            return
+        async with self.db_slots:
+            yield
@@ -4,6 +4,7 @@ from typing import Any, Callable, Coroutine, ParamSpec, TypeVar
 
 from litestar.exceptions import HTTPException, NotFoundException
 from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.orm.exc import StaleDataError
 
 logger = logging.getLogger(__name__)
 
@@ -37,14 +38,20 @@ def handle_db_errors(
     async def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
         try:
             return await fn(*args, **kwargs)
-        except NotFoundException:
-            # Already a proper HTTP 404 — re-raise unchanged
+        except HTTPException:
+            # Already a proper HTTP error (e.g. 404) — re-raise unchanged
             raise
         except IntegrityError as e:
             logger.exception("IntegrityError in %s", fn.__name__)
             detail = _extract_integrity_detail(e)
             # 409 Conflict for unique/constraint violations
             raise HTTPException(status_code=409, detail=detail) from e
+        except StaleDataError as e:
+            logger.warning("Concurrent update conflict in %s: %s", fn.__name__, e)
+            # 409 Conflict: the row kept changing under us and retries ran out
+            raise HTTPException(
+                status_code=409, detail="Resource was modified concurrently, retry"
+            ) from e
         except OperationalError as e:
             logger.exception("OperationalError (DB) in %s", fn.__name__)
             # Service unavailable — transient DB issues
@@ -0,0 +1,28 @@
+import base64
+import binascii
+import json
+
+
+def encode_cursor(last_id: int) -> str:
+    """Encode the last seen primary key as an opaque, URL-safe cursor."""
+    raw = json.dumps({"id": last_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    """Decode a cursor produced by encode_cursor; raise ValueError if malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        last_id = json.loads(base64.urlsafe_b64decode(padded.encode()))["id"]
+    except (binascii.Error, ValueError, TypeError, KeyError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(last_id, int) or last_id < 0:
+        raise ValueError("Invalid cursor")
+    return last_id
+
+
+def next_cursor(items: list, count: int) -> str | None:
+    """Cursor for the page after `items`, or None if this page is the last."""
+    if items and len(items) == count:
+        return encode_cursor(items[-1].id)
+    return None
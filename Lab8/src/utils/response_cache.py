@@ -0,0 +1,111 @@
+import logging
+from typing import Callable, List
+from urllib.parse import parse_qsl, urlencode
+
+from litestar.middleware import MiddlewareProtocol
+from litestar.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.services.cache_service import CacheService, ttl_with_jitter
+
+logger = logging.getLogger(__name__)
+
+# Route handler opt key listing the cache tags of a GET endpoint, e.g.
+# @get(opt={CACHE_TAGS_OPT: [ProductService.CACHE_TAG]})
+CACHE_TAGS_OPT = "cache_tags"
+CACHE_HEADER = b"x-cache"
+
+
+def response_cache_key(scope: Scope) -> str:
+    """Route path plus query params in a stable order."""
+    query = parse_qsl(scope.get("query_string", b"").decode(), keep_blank_values=True)
+    return f"http:{scope['path']}?{urlencode(sorted(query))}"
+
+
+class ResponseCacheMiddleware(MiddlewareProtocol):
+    """
+    Caches successful JSON responses of GET handlers tagged with
+    CACHE_TAGS_OPT in Redis.
+
+    Keys embed the current generation of every tag (`CacheService.tagged_key`),
+    so a write invalidates all cached pages of a tag with one INCR, e.g.
+    `cache_service.invalidate_namespace(ProductService.CACHE_TAG)`.
+    Responses carry `X-Cache: HIT` or `X-Cache: MISS`.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        cache_factory: Callable[[], CacheService],
+        ttl: int = 30,
+    ):
+        self.app = app
+        self.cache_factory = cache_factory
+        self.ttl = ttl
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        tags = None
+        if scope["type"] == "http" and scope["method"] == "GET":
+            tags = scope["route_handler"].opt.get(CACHE_TAGS_OPT)
+        if not tags:
+            await self.app(scope, receive, send)
+            return
+
+        cache = self.cache_factory()
+        key = await cache.tagged_key(tags, response_cache_key(scope))
+        if key is None:  # generations unknown: Redis is unavailable
+            await self.app(scope, receive, send)
+            return
+
+        body = await cache.get_bytes(key)
+        if body is not None:
+            await self._send_hit(send, body)
+            return
+
+        messages: List[Message] = []
+
+        async def capture(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (CACHE_HEADER, b"MISS"),
+                ]
+            messages.append(message)
+            await send(message)
+
+        await self.app(scope, receive, capture)
+
+        body = self._cacheable_body(messages)
+        if body is not None:
+            await cache.set_bytes(
+                key, body, ttl_with_jitter(self.ttl), invalidate=False
+            )
+
+    @staticmethod
+    def _cacheable_body(messages: List[Message]) -> bytes | None:
+        """Body of a complete 200 JSON response, None for anything else."""
+        if not messages or messages[0]["type"] != "http.response.start":
+            return None
+        start = messages[0]
+        if start["status"] != 200:
+            return None
+        content_type = dict(start.get("headers", [])).get(b"content-type", b"")
+        if not content_type.startswith(b"application/json"):
+            return None
+        if messages[-1].get("more_body", False):
+            return None
+        return b"".join(m.get("body", b"") for m in messages[1:])
+
+    @staticmethod
+    async def _send_hit(send: Send, body: bytes) -> None:
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (CACHE_HEADER, b"HIT"),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
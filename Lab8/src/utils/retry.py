@@ -0,0 +1,53 @@
+from redis.exceptions import ConnectionError as RedisConnectionError
+from redis.exceptions import TimeoutError as RedisTimeoutError
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.orm.exc import StaleDataError
+
+# Failures that may succeed on a later attempt: lost connections, pool
+# exhaustion, lock/serialization conflicts. Everything else (business
+# ValueErrors, validation errors, bugs) fails the same way every time.
+TRANSIENT_ERRORS = (
+    OperationalError,
+    InterfaceError,
+    PoolTimeoutError,
+    StaleDataError,
+    RedisConnectionError,
+    RedisTimeoutError,
+    ConnectionError,
+    TimeoutError,
+)
+
+
+def is_transient(error: BaseException) -> bool:
+    """True if retrying the same message later may succeed."""
+    if isinstance(error, DBAPIError) and error.connection_invalidated:
+        return True
+    return isinstance(error, TRANSIENT_ERRORS)
+
+
+class RetryPolicy:
+    """
+    Exponential backoff for failed messages.
+
+    Attempt `n` (1 is the first delivery) is retried after
+    `base_delay_ms * 2 ** (n - 1)` milliseconds, capped at `max_delay_ms`.
+    Only transient errors are retried, and at most `max_attempts`
+    deliveries are made in total.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 5,
+        base_delay_ms: int = 1000,
+        max_delay_ms: int = 300_000,
+    ):
+        self.max_attempts = max_attempts
+        self.base_delay_ms = base_delay_ms
+        self.max_delay_ms = max_delay_ms
+
+    def should_retry(self, error: BaseException, attempt: int) -> bool:
+        return attempt < self.max_attempts and is_transient(error)
+
+    def delay_ms(self, attempt: int) -> int:
+        return min(self.base_delay_ms * 2 ** (attempt - 1), self.max_delay_ms)
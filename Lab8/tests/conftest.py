@@ -1,5 +1,7 @@
+import fnmatch
 import os
 import sys
+import time
 
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 if project_root not in sys.path:
@@ -13,6 +15,7 @@ from src.models.base import Base
 from src.repositories.user_repository import UserRepository
 from src.repositories.product_repository import ProductRepository
 from src.repositories.order_repository import OrderRepository
+from src.repositories.reservation_repository import ReservationRepository
 
 
 TEST_DATABASE_URL = "sqlite+aiosqlite:///./test.db"
@@ -53,3 +56,138 @@ def product_repository(session):
 @pytest.fixture
 def order_repository(session):
     return OrderRepository(session)
+
+
+@pytest.fixture
+def reservation_repository(session):
+    return ReservationRepository(session)
+
+
+class InMemoryCache:
+    """Dict-backed stand-in for CacheService (TTL is ignored)"""
+
+    def __init__(self):
+        self.data = {}
+        self.available = True  # False makes writes fail like a Redis outage
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ttl):
+        if not self.available:
+            return False
+        self.data[key] = value
+        return True
+
+    async def set_many(self, items, ttl, invalidate=True):
+        self.data.update(items)
+        return True
+
+    async def add(self, key, value, ttl):
+        if key in self.data:
+            return False
+        self.data[key] = value
+        return True
+
+    async def expire(self, key, ttl):
+        return key in self.data
+
+    async def delete(self, key):
+        self.data.pop(key, None)
+        return True
+
+
+class InMemoryRedis:
+    """Just enough of redis.asyncio.Redis for the cache and dead-letter services"""
+
+    def __init__(self):
+        self.data = {}
+        self.expires = {}
+        self.hashes = {}
+        self.unlinked = []  # size of every UNLINK call
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def setex(self, key, ttl, value):
+        self.data[key] = value
+        self.expires[key] = time.monotonic() + ttl
+
+    async def set(self, key, value, nx=False, px=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    async def pttl(self, key):
+        if key not in self.expires:
+            return -1
+        return int((self.expires[key] - time.monotonic()) * 1000)
+
+    async def publish(self, channel, message):
+        return 0
+
+    async def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    async def incr(self, key):
+        self.data[key] = str(int(self.data.get(key) or 0) + 1).encode()
+        return int(self.data[key])
+
+    async def unlink(self, *keys):
+        self.unlinked.append(len(keys))
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    async def scan_iter(self, match=None, count=None):
+        for key in list(self.data):
+            if fnmatch.fnmatchcase(key, match):
+                yield key
+
+    async def hset(self, key, field, value):
+        self.hashes.setdefault(key, {})[field] = value.encode()
+        return 1
+
+    async def hget(self, key, field):
+        return self.hashes.get(key, {}).get(field)
+
+    async def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    async def hlen(self, key):
+        return len(self.hashes.get(key, {}))
+
+    async def hdel(self, key, field):
+        return 1 if self.hashes.get(key, {}).pop(field, None) is not None else 0
+
+    def pipeline(self, transaction=True):
+        return InMemoryPipeline(self)
+
+    def register_script(self, script):
+        async def release(keys, args):
+            if self.data.get(keys[0]) == args[0]:
+                del self.data[keys[0]]
+                return 1
+            return 0
+
+        return release
+
+
+class InMemoryPipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.calls = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.calls.append((name, args, kwargs))
+
+    async def execute(self):
+        return [
+            await getattr(self.redis, name)(*args, **kwargs)
+            for name, args, kwargs in self.calls
+        ]
@@ -0,0 +1,339 @@
+import asyncio
+import json
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from conftest import InMemoryRedis
+
+from src.services.cache_metrics import CacheMetrics
+from src.services.cache_service import (
+    CacheService,
+    apply_invalidation,
+    ttl_with_jitter,
+)
+from src.services.local_cache import LocalCache
+
+
+@pytest.fixture
+def mock_redis():
+    """Mock async Redis client"""
+    redis = Mock()
+    redis.get = AsyncMock(return_value=None)
+    redis.setex = AsyncMock()
+    redis.delete = AsyncMock()
+    redis.publish = AsyncMock()
+    return redis
+
+
+def test_local_cache_evicts_least_recently_used():
+    """Test that the L1 stays bounded and keeps recently read keys"""
+    cache = LocalCache(max_size=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_local_cache_expires_entries():
+    """Test that entries never outlive the L1 TTL"""
+    cache = LocalCache(ttl=0)
+    cache.set("a", 1, ttl=600)
+    assert cache.get("a") is None
+
+
+@pytest.mark.asyncio
+async def test_get_served_from_local_cache(mock_redis):
+    """Test that a second read does not hit Redis"""
+    mock_redis.get.return_value = json.dumps({"id": 1}).encode()
+    cache = CacheService(mock_redis, LocalCache(ttl=60))
+
+    first = await cache.get("product:1")
+    first["id"] = 99  # callers cannot corrupt the L1 copy
+    second = await cache.get("product:1")
+
+    assert second == {"id": 1}
+    mock_redis.get.assert_called_once_with("product:1")
+
+
+@pytest.mark.asyncio
+async def test_write_publishes_invalidation(mock_redis):
+    """Test that writes update this worker and notify the others"""
+    local = LocalCache(ttl=60)
+    cache = CacheService(mock_redis, local)
+
+    await cache.set("product:1", {"id": 1, "name": "New"}, 600)
+
+    assert local.get("product:1") == {"id": 1, "name": "New"}
+    channel, data = mock_redis.publish.call_args.args
+    assert channel == CacheService.INVALIDATION_CHANNEL
+    assert json.loads(data)["keys"] == ["product:1"]
+
+
+@pytest.mark.asyncio
+async def test_keys_outside_prefixes_bypass_local_cache(mock_redis):
+    """Test that only configured prefixes are kept in memory"""
+    local = LocalCache(ttl=60, prefixes=("product:",))
+    cache = CacheService(mock_redis, local)
+
+    await cache.set("idempotency:orders:k", {"state": "done"}, 60)
+
+    assert len(local) == 0
+    mock_redis.publish.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_read_through_fill_does_not_publish_invalidation():
+    """Test that caching a loaded value leaves the other workers' L1 alone"""
+    redis = InMemoryRedis()
+    redis.publish = AsyncMock()
+    local = LocalCache(ttl=60)
+    cache = CacheService(redis, local)
+
+    async def load():
+        return {"id": 1}
+
+    assert await cache.get_or_set("product:1", load, 600) == {"id": 1}
+
+    assert local.get("product:1") == {"id": 1}
+    redis.publish.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_batch_and_bytes_fills_do_not_publish_invalidation(mock_redis):
+    """Test that set_many/set_bytes fills skip the invalidation broadcast"""
+    pipe = Mock()
+    pipe.execute = AsyncMock()
+    pipe.__aenter__ = AsyncMock(return_value=pipe)
+    pipe.__aexit__ = AsyncMock(return_value=False)
+    mock_redis.pipeline = Mock(return_value=pipe)
+    local = LocalCache(ttl=60)
+    cache = CacheService(mock_redis, local)
+
+    assert await cache.set_many({"product:1": {"id": 1}}, 600, invalidate=False)
+    assert await cache.set_bytes("product:1:json", b"{}", 600, invalidate=False)
+
+    assert local.get("product:1") == {"id": 1}
+    assert local.get("product:1:json") == b"{}"
+    mock_redis.publish.assert_not_called()
+
+
+def test_apply_invalidation_from_other_worker():
+    """Test that peers drop keys and patterns but skip their own messages"""
+    local = LocalCache(ttl=60)
+    local.set("product:1", {})
+    local.set("product:2", {})
+    local.set("user:1", {})
+
+    own = {"origin": local.instance_id, "keys": ["user:1"], "pattern": None}
+    apply_invalidation(local, json.dumps(own))
+    assert local.get("user:1") == {}
+
+    peer = {"origin": "other", "keys": ["user:1"], "pattern": "product:*"}
+    apply_invalidation(local, json.dumps(peer))
+    assert len(local) == 0
+
+
+@pytest.mark.asyncio
+async def test_get_or_set_coalesces_concurrent_misses():
+    """Test that concurrent misses in one worker share a single load"""
+    cache = CacheService(InMemoryRedis())
+    calls = []
+
+    async def load():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"id": 1}
+
+    results = await asyncio.gather(
+        *[cache.get_or_set("product:1", load, 600) for _ in range(10)]
+    )
+
+    assert results == [{"id": 1}] * 10
+    assert len(calls) == 1
+    assert await cache.get("product:1") == {"id": 1}
+
+
+@pytest.mark.asyncio
+async def test_get_or_set_waits_for_other_instance():
+    """Test that a locked key is not recomputed by a second instance"""
+    redis = InMemoryRedis()
+    redis.data["lock:product:2"] = "other-instance"
+    cache = CacheService(redis)
+    cache.LOCK_POLL_INTERVAL = 0.001
+
+    async def other_instance_finishes():
+        await asyncio.sleep(0.01)
+        await CacheService(redis).set("product:2", {"id": 2}, 600)
+
+    async def load():
+        raise AssertionError("should not recompute")
+
+    _, value = await asyncio.gather(
+        other_instance_finishes(), cache.get_or_set("product:2", load, 600)
+    )
+
+    assert value == {"id": 2}
+
+
+@pytest.mark.asyncio
+async def test_get_or_set_refreshes_hot_key_early():
+    """Test that a key close to expiry is recomputed before it expires"""
+    redis = InMemoryRedis()
+    cache = CacheService(redis)
+    await cache.set("user:3", {"v": "old"}, 1)
+    CacheService._recompute_seconds["user"] = 10.0
+
+    async def load():
+        return {"v": "new"}
+
+    try:
+        with patch("src.services.cache_service.random.random", return_value=0.5):
+            assert await cache.get_or_set("user:3", load, 600) == {"v": "new"}
+    finally:
+        CacheService._recompute_seconds.pop("user", None)
+
+
+def test_ttl_with_jitter_spreads_expirations():
+    """Test that jittered TTLs stay within +/-10% and are not all equal"""
+    ttls = {ttl_with_jitter(600) for _ in range(50)}
+
+    assert all(540 <= ttl <= 660 for ttl in ttls)
+    assert len(ttls) > 1
+
+
+@pytest.mark.asyncio
+async def test_get_or_set_caches_missing_keys():
+    """Test that a miss is remembered as a tombstone"""
+    redis = InMemoryRedis()
+    cache = CacheService(redis)
+    calls = []
+
+    async def load():
+        calls.append(1)
+        return None
+
+    assert await cache.get_or_set("product:404", load, 600, negative_ttl=60) is None
+    assert await cache.get_or_set("product:404", load, 600, negative_ttl=60) is None
+
+    assert len(calls) == 1
+    assert CacheService.is_tombstone(await cache.get("product:404"))
+
+
+@pytest.mark.asyncio
+async def test_set_bytes_round_trips_without_serializer():
+    """Test that raw bytes are stored and returned unchanged"""
+    redis = InMemoryRedis()
+    cache = CacheService(redis)
+    body = b'{"id":1,"name":"Lamp"}'
+
+    assert await cache.set_bytes("product:1:json", body, 60)
+
+    assert redis.data["product:1:json"] == body
+    assert await cache.get_bytes("product:1:json") == body
+    assert await cache.get_bytes("product:2:json") is None
+
+
+@pytest.mark.asyncio
+async def test_invalidate_namespace_moves_to_new_generation():
+    """Test that one INCR hides every key written in the old generation"""
+    redis = InMemoryRedis()
+    cache = CacheService(redis)
+
+    old_key = await cache.namespaced_key("products", "page=1")
+    await cache.set(old_key, {"items": []}, 60)
+    assert await cache.invalidate_namespace("products") == 1
+
+    new_key = await cache.namespaced_key("products", "page=1")
+    assert (old_key, new_key) == ("products:0:page=1", "products:1:page=1")
+    assert await cache.get(new_key) is None
+
+
+@pytest.mark.asyncio
+async def test_namespaced_key_unknown_when_redis_fails(mock_redis):
+    """Test that a failed generation read bypasses the cache"""
+    mock_redis.get.side_effect = ConnectionError("down")
+    cache = CacheService(mock_redis)
+
+    assert await cache.namespaced_key("products", "page=1") is None
+
+
+@pytest.mark.asyncio
+async def test_delete_pattern_unlinks_in_chunks():
+    """Test that matching keys are unlinked in bounded chunks"""
+    redis = InMemoryRedis()
+    cache = CacheService(redis)
+    cache.DELETE_CHUNK_SIZE = 2
+    for i in range(5):
+        await redis.setex(f"report:{i}", 60, b"1")
+    await redis.setex("product:1", 60, b"1")
+
+    assert await cache.delete_pattern("report:*") == 5
+
+    assert redis.unlinked == [2, 2, 1]
+    assert list(redis.data) == ["product:1"]
+
+
+@pytest.mark.asyncio
+async def test_tagged_key_follows_every_tag():
+    """Test that invalidating any tag of a key moves it to a new key"""
+    cache = CacheService(InMemoryRedis())
+
+    key = await cache.tagged_key(["products", "reports"], "http:/report/?")
+    assert key == "products:0:reports:0:http:/report/?"
+
+    await cache.invalidate_namespace("reports")
+    assert await cache.tagged_key(["products", "reports"], "http:/report/?") == (
+        "products:0:reports:1:http:/report/?"
+    )
+
+
+@pytest.mark.asyncio
+async def test_metrics_count_hits_misses_and_sizes():
+    """Test that reads and writes are recorded per key namespace"""
+    metrics = CacheMetrics()
+    cache = CacheService(InMemoryRedis(), LocalCache(ttl=60), metrics=metrics)
+
+    await cache.get("product:1")
+    await cache.set("product:1", {"id": 1}, 60)
+    await cache.get("product:1")
+    await cache.get_many(["user:1", "user:2"])
+
+    assert metrics.misses.get("product") == 1
+    assert metrics.misses.get("user") == 2
+    assert metrics.hits.get("product", "local") == 1
+    assert metrics.latency.count("product", "get") == 1
+    assert metrics.latency.count("product", "set") == 1
+    assert metrics.size.count("product", "set") == 1
+
+
+@pytest.mark.asyncio
+async def test_metrics_count_errors(mock_redis):
+    """Test that Redis failures are counted instead of printed"""
+    metrics = CacheMetrics()
+    mock_redis.get.side_effect = ConnectionError("down")
+    cache = CacheService(mock_redis, metrics=metrics)
+
+    assert await cache.get("order:1") is None
+    assert metrics.errors.get("order", "get") == 1
+
+
+def test_metrics_render_prometheus_text():
+    """Test the exposition format served on /metrics"""
+    metrics = CacheMetrics()
+    metrics.hit("product:1")
+    metrics.observe_latency("product:1", "get", 0.002)
+
+    text = metrics.render()
+
+    assert 'cache_hits_total{namespace="product",layer="redis"} 1' in text
+    assert (
+        'cache_operation_seconds_bucket{namespace="product",operation="get",'
+        'le="0.0025"} 1'
+    ) in text
+    assert (
+        'cache_operation_seconds_count{namespace="product",operation="get"} 1'
+    ) in text
@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+
+from src.utils.concurrency import ConsumerLimits
+
+
+def test_from_env_reads_queue_settings(monkeypatch):
+    """Test that per-queue env vars override the defaults"""
+    monkeypatch.setenv("ORDER_MAX_IN_FLIGHT", "4")
+    monkeypatch.setenv("ORDER_PREFETCH_COUNT", "16")
+
+    limits = ConsumerLimits.from_env("order", max_in_flight=10)
+
+    assert limits.max_in_flight == 4
+    assert limits.prefetch_count == 16
+
+
+def test_from_env_defaults_prefetch_to_twice_in_flight(monkeypatch):
+    """Test that prefetch follows the in-flight limit when not set"""
+    monkeypatch.delenv("PRODUCT_MAX_IN_FLIGHT", raising=False)
+    monkeypatch.delenv("PRODUCT_PREFETCH_COUNT", raising=False)
+
+    limits = ConsumerLimits.from_env("product", max_in_flight=5)
+
+    assert limits.max_in_flight == 5
+    assert limits.prefetch_count == 10
+
+
+def test_limits_must_be_positive():
+    """Test that a zero limit is rejected"""
+    with pytest.raises(ValueError):
+        ConsumerLimits(prefetch_count=0, max_in_flight=1)
+
+
+@pytest.mark.asyncio
+async def test_handlers_and_connections_are_capped():
+    """Test that in-flight and database slots bound concurrent handlers"""
+    db_slots = asyncio.Semaphore(2)
+    first = ConsumerLimits(prefetch_count=8, max_in_flight=3, db_slots=db_slots)
+    second = ConsumerLimits(prefetch_count=8, max_in_flight=3, db_slots=db_slots)
+    running = {"handlers": 0, "connections": 0}
+    peak = {"handlers": 0, "connections": 0}
+
+    async def handle(limits):
+        async with limits.handler():
+            running["handlers"] += 1
+            peak["handlers"] = max(peak["handlers"], running["handlers"])
+            async with limits.connection():
+                running["connections"] += 1
+                peak["connections"] = max(peak["connections"], running["connections"])
+                await asyncio.sleep(0.01)
+                running["connections"] -= 1
+            running["handlers"] -= 1
+
+    await asyncio.gather(*(handle(first) for _ in range(6)))
+    assert peak["handlers"] == 3
+
+    peak["connections"] = 0
+    await asyncio.gather(*(handle(lim) for lim in (first, second) * 3))
+    assert peak["connections"] == 2
@@ -0,0 +1,65 @@
+from unittest.mock import AsyncMock
+
+import pytest
+from conftest import InMemoryRedis
+
+from src.services.dead_letter_service import DeadLetterService
+
+
+@pytest.fixture
+def publish():
+    return AsyncMock()
+
+
+@pytest.fixture
+def service(publish):
+    return DeadLetterService(InMemoryRedis(), publish)
+
+
+@pytest.mark.asyncio
+async def test_add_and_list(service):
+    """Test that entries are stored per queue, oldest first"""
+    message = {"action": "create", "data": {"user_id": 1}}
+    first = await service.add("order", message, ValueError("User not found"))
+    second = await service.add("order", {"action": "update"}, "boom", attempts=5)
+    await service.add("product", {"action": "create"}, "other queue")
+
+    entries = await service.list("order")
+
+    assert [entry["id"] for entry in entries] == [first, second]
+    assert entries[0]["message"] == message
+    assert entries[0]["error"] == "ValueError('User not found')"
+    assert entries[1]["attempts"] == 5
+    assert await service.count("order") == 2
+
+
+@pytest.mark.asyncio
+async def test_replay_publishes_and_removes(service, publish):
+    """Test that replay republishes the original message to its queue"""
+    message = {"action": "create", "data": {"name": "Pen"}}
+    entry_id = await service.add("product", message, "boom")
+
+    assert await service.replay("product", entry_id)
+
+    publish.assert_awaited_once_with(message, queue="product")
+    assert await service.get("product", entry_id) is None
+
+
+@pytest.mark.asyncio
+async def test_failed_replay_keeps_entry(service, publish):
+    """Test that an entry survives a failed publish"""
+    publish.side_effect = ConnectionError("broker down")
+    entry_id = await service.add("order", {"action": "create"}, "boom")
+
+    with pytest.raises(ConnectionError):
+        await service.replay("order", entry_id)
+
+    assert await service.get("order", entry_id) is not None
+
+
+@pytest.mark.asyncio
+async def test_unknown_entry(service, publish):
+    """Test replay and discard of a missing entry"""
+    assert not await service.replay("order", "missing")
+    assert not await service.discard("order", "missing")
+    publish.assert_not_awaited()
@@ -0,0 +1,132 @@
+import asyncio
+
+import pytest
+from conftest import InMemoryCache
+
+from src.services.idempotency_service import IdempotencyConflict, IdempotencyService
+
+
+@pytest.fixture
+def idempotency_service():
+    service = IdempotencyService(InMemoryCache())
+    service.POLL_INTERVAL = 0.001
+    return service
+
+
+@pytest.mark.asyncio
+async def test_replay_returns_stored_response(idempotency_service):
+    """Test that a repeated key does not run the operation again"""
+    calls = []
+
+    async def operation():
+        calls.append(1)
+        return {"id": len(calls)}
+
+    first = await idempotency_service.execute("k1", {"a": 1}, operation)
+    second = await idempotency_service.execute("k1", {"a": 1}, operation)
+
+    assert first == ({"id": 1}, False)
+    assert second == ({"id": 1}, True)
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_duplicate_waits_for_first(idempotency_service):
+    """Test that an in-flight duplicate waits and gets the same response"""
+    started = asyncio.Event()
+    finish = asyncio.Event()
+    calls = []
+
+    async def operation():
+        calls.append(1)
+        started.set()
+        await finish.wait()
+        return {"id": 42}
+
+    first = asyncio.create_task(idempotency_service.execute("k2", {"a": 1}, operation))
+    await started.wait()
+    duplicate = asyncio.create_task(
+        idempotency_service.execute("k2", {"a": 1}, operation)
+    )
+    await asyncio.sleep(0.01)
+    finish.set()
+
+    assert await first == ({"id": 42}, False)
+    assert await duplicate == ({"id": 42}, True)
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_request_releases_key(idempotency_service):
+    """Test that a retry runs again when the first attempt failed"""
+
+    async def failing():
+        raise ValueError("Insufficient stock")
+
+    async def succeeding():
+        return {"id": 7}
+
+    with pytest.raises(ValueError):
+        await idempotency_service.execute("k3", {"a": 1}, failing)
+
+    assert await idempotency_service.execute("k3", {"a": 1}, succeeding) == (
+        {"id": 7},
+        False,
+    )
+
+
+@pytest.mark.asyncio
+async def test_key_reused_with_different_payload(idempotency_service):
+    """Test that a key cannot be replayed for another request body"""
+
+    async def operation():
+        return {"id": 1}
+
+    await idempotency_service.execute("k4", {"a": 1}, operation)
+
+    with pytest.raises(IdempotencyConflict) as exc:
+        await idempotency_service.execute("k4", {"a": 2}, operation)
+    assert exc.value.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_store_unavailable_runs_without_dedup():
+    """Test that Redis errors do not block order placement"""
+
+    class BrokenCache(InMemoryCache):
+        async def add(self, key, value, ttl):
+            return None
+
+    service = IdempotencyService(BrokenCache())
+
+    async def operation():
+        return {"id": 3}
+
+    assert await service.execute("k5", {}, operation) == ({"id": 3}, False)
+
+
+@pytest.mark.asyncio
+async def test_slow_request_keeps_its_claim(idempotency_service):
+    """Test that the in-progress claim is refreshed until the operation ends"""
+    cache = idempotency_service.cache_service
+    refreshed = []
+
+    async def expire(key, ttl):
+        refreshed.append((key, ttl))
+        return key in cache.data
+
+    cache.expire = expire
+    idempotency_service.IN_PROGRESS_TTL = 0.03
+
+    async def slow():
+        await asyncio.sleep(0.05)
+        return {"id": 8}
+
+    assert await idempotency_service.execute("k6", {}, slow) == ({"id": 8}, False)
+    calls = len(refreshed)
+    await asyncio.sleep(0.03)
+
+    assert calls >= 2
+    assert refreshed[0] == ("idempotency:orders:k6", 0.03)
+    # The refresh stops with the operation
+    assert len(refreshed) == calls
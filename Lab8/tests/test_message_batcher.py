@@ -0,0 +1,65 @@
+import asyncio
+
+import pytest
+
+from src.utils.batching import MessageBatcher
+
+
+class Recorder:
+    """Records every batch and commits the ones without a poison message"""
+
+    def __init__(self, poison=None):
+        self.poison = poison
+        self.batches = []
+        self.committed = []
+
+    async def process(self, items):
+        self.batches.append(list(items))
+        if self.poison in items:
+            raise ValueError(f"bad message {self.poison}")
+        self.committed.extend(items)
+
+
+@pytest.mark.asyncio
+async def test_full_batch_is_processed_at_once():
+    """Test that max_size messages go through one process call"""
+    recorder = Recorder()
+    batcher = MessageBatcher(recorder.process, max_size=3, max_wait=10)
+
+    await asyncio.gather(*(batcher.submit(i) for i in range(3)))
+
+    assert recorder.batches == [[0, 1, 2]]
+
+
+@pytest.mark.asyncio
+async def test_partial_batch_is_flushed_after_max_wait():
+    """Test that a batch is closed by the timer when traffic is low"""
+    recorder = Recorder()
+    batcher = MessageBatcher(recorder.process, max_size=100, max_wait=0.01)
+
+    await asyncio.wait_for(
+        asyncio.gather(batcher.submit("a"), batcher.submit("b")), timeout=1
+    )
+
+    assert recorder.batches == [["a", "b"]]
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_is_split_until_the_bad_message():
+    """Test that only the failing message is rejected"""
+    recorder = Recorder(poison="c")
+    batcher = MessageBatcher(recorder.process, max_size=4, max_wait=10)
+
+    results = await asyncio.gather(
+        *(batcher.submit(item) for item in "abcd"), return_exceptions=True
+    )
+
+    assert [isinstance(r, ValueError) for r in results] == [False, False, True, False]
+    assert recorder.committed == ["a", "b", "d"]
+    assert recorder.batches == [
+        ["a", "b", "c", "d"],
+        ["a", "b"],
+        ["c", "d"],
+        ["c"],
+        ["d"],
+    ]
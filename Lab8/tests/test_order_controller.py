@@ -14,9 +14,10 @@ from src.schemas.order import OrderCreate, OrderResponse, OrderListResponse, Ord
 class OrderService(Protocol):
     async def create_order(self, data: dict): ...
     async def get_by_id(self, order_id: int): ...
-    async def get_by_filter(self, count: int, page: int): ...
+    async def get_by_filter(self, count: int, page: int, **filters): ...
     async def update(self, order_id: int, data: dict): ...
     async def delete(self, order_id: int): ...
+    async def cancel_many(self, order_ids: list[int]): ...
 
 
 class OrderCreateFactory(ModelFactory[OrderCreate]):
@@ -65,6 +66,50 @@ async def test_create_order(order_create: OrderCreate, order_response: OrderResp
         assert response.json() == order_response.model_dump(mode="json")
 
 
+@pytest.mark.asyncio
+async def test_create_order_idempotent_replay(
+    order_create: OrderCreate, order_response: OrderResponse
+):
+    """Test that a repeated Idempotency-Key replays the first response"""
+    calls = []
+
+    class MockOrderService:
+        async def create_order(self, data: dict):
+            calls.append(data)
+            return order_response
+
+    class MockIdempotencyService:
+        def __init__(self):
+            self.responses = {}
+
+        async def execute(self, key, payload, operation):
+            if key in self.responses:
+                return self.responses[key], True
+            self.responses[key] = await operation()
+            return self.responses[key], False
+
+    idempotency_service = MockIdempotencyService()
+
+    with create_test_client(
+        route_handlers=[OrderController],
+        dependencies={
+            "order_service": Provide(lambda: MockOrderService(), sync_to_thread=False),
+            "idempotency_service": Provide(
+                lambda: idempotency_service, sync_to_thread=False
+            ),
+        },
+    ) as client:
+        headers = {"Idempotency-Key": "retry-1"}
+        first = client.post("/orders", json=order_create.model_dump(), headers=headers)
+        second = client.post("/orders", json=order_create.model_dump(), headers=headers)
+
+        assert first.status_code == second.status_code == HTTP_201_CREATED
+        assert second.json() == first.json() == order_response.model_dump(mode="json")
+        assert "idempotent-replayed" not in first.headers
+        assert second.headers["idempotent-replayed"] == "true"
+        assert len(calls) == 1
+
+
 @pytest.mark.asyncio
 async def test_get_order_by_id(order_response: OrderResponse):
     """Test retrieving an order by ID"""
@@ -109,7 +154,7 @@ async def test_list_orders(order_response: OrderResponse):
     orders = [order_response]
 
     class MockOrderService:
-        async def get_by_filter(self, count: int, page: int):
+        async def get_by_filter(self, count: int, page: int, **filters):
             return {"total": 1, "items": orders}
 
     with create_test_client(
@@ -126,6 +171,54 @@ async def test_list_orders(order_response: OrderResponse):
         assert data["items"][0] == order_response.model_dump(mode="json")
 
 
+@pytest.mark.asyncio
+async def test_list_orders_keyset(order_response: OrderResponse):
+    """Test listing orders with an opaque cursor"""
+    orders = [order_response]
+
+    class MockOrderService:
+        async def get_by_filter(self, count: int, page: int, cursor=None, **filters):
+            assert cursor == "eyJpZCI6NDJ9"
+            return {"total": None, "items": orders, "next_cursor": "eyJpZCI6NDN9"}
+
+    with create_test_client(
+        route_handlers=[OrderController],
+        dependencies={
+            "order_service": Provide(lambda: MockOrderService(), sync_to_thread=False)
+        },
+    ) as client:
+        response = client.get("/orders?count=1&cursor=eyJpZCI6NDJ9")
+        assert response.status_code == HTTP_200_OK
+        data = response.json()
+        assert data["total"] is None
+        assert data["next_cursor"] == "eyJpZCI6NDN9"
+
+
+@pytest.mark.asyncio
+async def test_list_orders_filters(order_response: OrderResponse):
+    """Test that user, status and date filters reach the service"""
+
+    class MockOrderService:
+        async def get_by_filter(self, count: int, page: int, **filters):
+            assert filters["user_id"] == 7
+            assert filters["status"] == "pending"
+            assert filters["created_from"].year == 2025
+            assert filters["created_to"] is None
+            return {"total": 0, "items": []}
+
+    with create_test_client(
+        route_handlers=[OrderController],
+        dependencies={
+            "order_service": Provide(lambda: MockOrderService(), sync_to_thread=False)
+        },
+    ) as client:
+        response = client.get(
+            "/orders?user_id=7&status=pending&created_from=2025-01-01T00:00:00"
+        )
+        assert response.status_code == HTTP_200_OK
+        assert response.json()["total"] == 0
+
+
 @pytest.mark.asyncio
 async def test_update_order(order_response: OrderResponse, order_update: OrderUpdate):
     """Test updating an order"""
@@ -148,6 +241,26 @@ async def test_update_order(order_response: OrderResponse, order_update: OrderUp
         assert response.json() == order_response.model_dump(mode="json")
 
 
+@pytest.mark.asyncio
+async def test_cancel_orders():
+    """Test cancelling several orders in one request"""
+
+    class MockOrderService:
+        async def cancel_many(self, order_ids: list[int]):
+            assert order_ids == [1, 2, 3]
+            return [1, 3]
+
+    with create_test_client(
+        route_handlers=[OrderController],
+        dependencies={
+            "order_service": Provide(lambda: MockOrderService(), sync_to_thread=False)
+        },
+    ) as client:
+        response = client.post("/orders/cancel", json={"order_ids": [1, 2, 3]})
+        assert response.status_code == HTTP_200_OK
+        assert response.json() == {"cancelled": [1, 3]}
+
+
 @pytest.mark.asyncio
 async def test_delete_order(order_response: OrderResponse):
     """Test deleting an order"""
@@ -185,3 +298,67 @@ async def test_delete_order_not_found():
     ) as client:
         response = client.delete("/orders/999")
         assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_request_order_accepted(order_create: OrderCreate):
+    """Test that async intake queues the order and returns 202"""
+    submitted = []
+
+    class MockOrderRequestService:
+        async def submit(self, data: dict):
+            submitted.append(data)
+            return {
+                "id": "abc123",
+                "status": "pending",
+                "order_id": None,
+                "error": None,
+                "updated_at": "2024-12-12T00:00:00+00:00",
+            }
+
+    with create_test_client(
+        route_handlers=[OrderController],
+        dependencies={
+            "order_request_service": Provide(
+                lambda: MockOrderRequestService(), sync_to_thread=False
+            )
+        },
+    ) as client:
+        response = client.post("/orders/requests", json=order_create.model_dump())
+        assert response.status_code == 202
+        assert response.json()["id"] == "abc123"
+        assert response.json()["status"] == "pending"
+        assert response.headers["location"] == "/orders/requests/abc123"
+        assert submitted == [order_create.model_dump()]
+
+
+@pytest.mark.asyncio
+async def test_get_order_request():
+    """Test reading the outcome of a queued order"""
+
+    class MockOrderRequestService:
+        async def get(self, request_id: str):
+            if request_id != "abc123":
+                return None
+            return {
+                "id": "abc123",
+                "status": "completed",
+                "order_id": 42,
+                "error": None,
+                "updated_at": "2024-12-12T00:00:00+00:00",
+            }
+
+    with create_test_client(
+        route_handlers=[OrderController],
+        dependencies={
+            "order_request_service": Provide(
+                lambda: MockOrderRequestService(), sync_to_thread=False
+            )
+        },
+    ) as client:
+        response = client.get("/orders/requests/abc123")
+        assert response.status_code == HTTP_200_OK
+        assert response.json()["order_id"] == 42
+
+        response = client.get("/orders/requests/missing")
+        assert response.status_code == 404
@@ -1,4 +1,5 @@
 import uuid
+from datetime import datetime, timedelta, timezone
 
 import pytest
 
@@ -197,6 +198,57 @@ async def test_update_order_total_recalculated(
     assert float(updated_order.total_amount) == 250.00
 
 
+@pytest.mark.asyncio
+async def test_update_order_items_diff(order_repository, test_user, product_repository):
+    """Test that kept, added and removed lines are all reflected after update"""
+    kept = await product_repository.create(
+        name=f"Diff Kept {uuid.uuid4().hex[:8]}", price=10.00, stock_quantity=100
+    )
+    removed = await product_repository.create(
+        name=f"Diff Removed {uuid.uuid4().hex[:8]}", price=20.00, stock_quantity=100
+    )
+    added = await product_repository.create(
+        name=f"Diff Added {uuid.uuid4().hex[:8]}", price=30.00, stock_quantity=100
+    )
+    order = await order_repository.create(
+        user_id=test_user.id,
+        items=[
+            {"product_id": kept.id, "quantity": 1},
+            {"product_id": removed.id, "quantity": 1},
+        ],
+    )
+    kept_line_id = next(i.id for i in order.items if i.product_id == kept.id)
+
+    updated_order = await order_repository.update(
+        order.id,
+        items=[
+            {"product_id": kept.id, "quantity": 4},
+            {"product_id": added.id, "quantity": 2},
+        ],
+    )
+
+    lines = {i.product_id: i for i in updated_order.items}
+    assert set(lines) == {kept.id, added.id}
+    assert lines[kept.id].id == kept_line_id
+    assert lines[kept.id].quantity == 4
+    assert lines[added.id].quantity == 2
+    assert float(updated_order.total_amount) == 10.00 * 4 + 30.00 * 2
+
+
+@pytest.mark.asyncio
+async def test_update_order_items_unknown_product(
+    order_repository, test_user, test_product
+):
+    """Test that replacing items with an unknown product fails"""
+    items = [{"product_id": test_product.id, "quantity": 1}]
+    order = await order_repository.create(user_id=test_user.id, items=items)
+
+    with pytest.raises(ValueError, match="Product 99999 not found"):
+        await order_repository.update(
+            order.id, items=[{"product_id": 99999, "quantity": 1}]
+        )
+
+
 @pytest.mark.asyncio
 async def test_delete_order_cascades_to_items(
     order_repository, test_user, test_product
@@ -249,6 +301,90 @@ async def test_list_orders_pagination_consistency(
     assert len(page1_ids.intersection(page2_ids)) == 0
 
 
+@pytest.mark.asyncio
+async def test_list_orders_total_counts_filtered_rows(
+    order_repository, test_user, test_product
+):
+    """Test that the SQL count honours the filters"""
+    for _ in range(3):
+        items = [{"product_id": test_product.id, "quantity": 1}]
+        await order_repository.create(user_id=test_user.id, items=items)
+
+    total, orders = await order_repository.list(limit=2, user_id=test_user.id)
+
+    assert total == 3
+    assert len(orders) == 2
+
+
+@pytest.mark.asyncio
+async def test_list_orders_after_cursor(order_repository, test_user, test_product):
+    """Test keyset pagination walks orders by id without overlap"""
+    created = []
+    for _ in range(5):
+        items = [{"product_id": test_product.id, "quantity": 1}]
+        created.append(await order_repository.create(user_id=test_user.id, items=items))
+
+    first = await order_repository.list_after(0, limit=3, user_id=test_user.id)
+    second = await order_repository.list_after(
+        first[-1].id, limit=3, user_id=test_user.id
+    )
+
+    assert [o.id for o in first + second] == [o.id for o in created]
+
+
+@pytest.mark.asyncio
+async def test_list_orders_by_status_and_created_range(
+    order_repository, test_user, test_product
+):
+    """Test status and created_at range filters"""
+    items = [{"product_id": test_product.id, "quantity": 1}]
+    await order_repository.create(user_id=test_user.id, items=items)
+    shipped = await order_repository.create(user_id=test_user.id, items=items)
+    await order_repository.update(shipped.id, status="shipped")
+
+    total, orders = await order_repository.list(user_id=test_user.id, status="shipped")
+    assert total == 1
+    assert orders[0].id == shipped.id
+
+    future = datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(days=1)
+    total, _ = await order_repository.list(user_id=test_user.id, created_from=future)
+    assert total == 0
+    total, _ = await order_repository.list(user_id=test_user.id, created_to=future)
+    assert total == 2
+
+
+@pytest.mark.asyncio
+async def test_cancel_many_sums_items_per_product(
+    order_repository, test_user, product_repository
+):
+    """Test bulk cancellation skips cancelled orders and groups quantities"""
+    p1 = await product_repository.create(name="Cancel 1", price=1.00, stock_quantity=9)
+    p2 = await product_repository.create(name="Cancel 2", price=1.00, stock_quantity=9)
+    first = await order_repository.create(
+        user_id=test_user.id,
+        items=[
+            {"product_id": p1.id, "quantity": 2},
+            {"product_id": p2.id, "quantity": 1},
+        ],
+    )
+    second = await order_repository.create(
+        user_id=test_user.id, items=[{"product_id": p1.id, "quantity": 3}]
+    )
+    done = await order_repository.create(
+        user_id=test_user.id, items=[{"product_id": p2.id, "quantity": 4}]
+    )
+    await order_repository.update(done.id, status="cancelled")
+
+    cancelled, quantities = await order_repository.cancel_many(
+        [first.id, second.id, done.id]
+    )
+
+    assert cancelled == sorted([first.id, second.id])
+    assert quantities == {p1.id: 5, p2.id: 1}
+    again, _ = await order_repository.cancel_many([first.id])
+    assert again == []
+
+
 @pytest.mark.asyncio
 async def test_order_items_preserve_order(
     order_repository, test_user, product_repository
@@ -0,0 +1,78 @@
+from unittest.mock import AsyncMock
+
+import pytest
+from conftest import InMemoryCache
+
+from src.services.order_request_service import (
+    OrderIntakeUnavailable,
+    OrderRequestService,
+)
+
+
+@pytest.fixture
+def cache():
+    return InMemoryCache()
+
+
+@pytest.fixture
+def publish():
+    return AsyncMock()
+
+
+@pytest.fixture
+def service(cache, publish):
+    return OrderRequestService(cache, publish)
+
+
+@pytest.mark.asyncio
+async def test_submit_tracks_and_publishes(service, publish):
+    """Test that a request is stored as pending and sent to the order queue"""
+    order = {"user_id": 1, "items": [{"product_id": 2, "quantity": 3}]}
+
+    record = await service.submit(order)
+
+    assert record["status"] == OrderRequestService.PENDING
+    assert await service.get(record["id"]) == record
+    publish.assert_awaited_once_with(
+        {"action": "create", "data": order, "request_id": record["id"]},
+        queue="order",
+    )
+
+
+@pytest.mark.asyncio
+async def test_submit_without_redis_is_rejected(service, cache, publish):
+    """Test that an untrackable request is not queued"""
+    cache.available = False
+
+    with pytest.raises(OrderIntakeUnavailable):
+        await service.submit({"user_id": 1, "items": []})
+
+    publish.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_failed_publish_drops_status(service, cache, publish):
+    """Test that a request the broker did not accept is forgotten"""
+    publish.side_effect = ConnectionError("broker down")
+
+    with pytest.raises(OrderIntakeUnavailable):
+        await service.submit({"user_id": 1, "items": []})
+
+    assert cache.data == {}
+
+
+@pytest.mark.asyncio
+async def test_mark_completed_and_failed(service):
+    """Test the outcomes reported by the order consumer"""
+    first = await service.submit({"user_id": 1, "items": []})
+    second = await service.submit({"user_id": 2, "items": []})
+    third = await service.submit({"user_id": 3, "items": []})
+
+    await service.mark_completed([(first["id"], 10)])
+    await service.mark_failed(second["id"], ValueError("Insufficient stock"))
+    await service.mark_failed(third["id"], KeyError("secret internals"))
+
+    assert (await service.get(first["id"]))["order_id"] == 10
+    assert (await service.get(first["id"]))["status"] == "completed"
+    assert (await service.get(second["id"]))["error"] == "Insufficient stock"
+    assert (await service.get(third["id"]))["error"] == "Order could not be placed"
@@ -1,6 +1,13 @@
+from datetime import datetime, timedelta, timezone
+
 import pytest
 from unittest.mock import Mock, AsyncMock, patch
+
+from src.repositories.unit_of_work import UnitOfWork
 from src.services.order_service import OrderService
+from src.services.product_service import ProductService
+from src.services.report_service import ReportService
+from src.utils.pagination import decode_cursor, encode_cursor
 
 
 @pytest.fixture
@@ -12,6 +19,8 @@ def mock_order_repository():
     repo.update = AsyncMock()
     repo.delete = AsyncMock()
     repo.list = AsyncMock()
+    repo.list_after = AsyncMock()
+    repo.cancel_many = AsyncMock()
     return repo
 
 
@@ -20,6 +29,9 @@ def mock_product_repository():
     """Mock product repository"""
     repo = Mock()
     repo.get_by_id = AsyncMock()
+    repo.get_by_ids = AsyncMock()
+    repo.decrement_stock = AsyncMock()
+    repo.increment_stock = AsyncMock()
     repo.update = AsyncMock()
     return repo
 
@@ -56,7 +68,8 @@ async def test_create_order_success(
     mock_user_repository.get_by_id.return_value = mock_user
 
     mock_product = Mock(id=1, price=50.0, stock_quantity=100)
-    mock_product_repository.get_by_id.return_value = mock_product
+    mock_product_repository.get_by_ids.return_value = {1: mock_product}
+    mock_product_repository.decrement_stock.return_value = {1: 98}
 
     mock_order = Mock(id=1, user_id=1, status="pending", total_amount=100.0)
     mock_order_repository.create.return_value = mock_order
@@ -67,9 +80,338 @@ async def test_create_order_success(
     assert result.id == 1
     assert result.user_id == 1
     mock_user_repository.get_by_id.assert_called_once_with(1)
-    mock_product_repository.get_by_id.assert_called_once_with(1)
-    mock_product_repository.update.assert_called_once_with(1, stock_quantity=98)
-    mock_order_repository.create.assert_called_once()
+    mock_product_repository.get_by_ids.assert_called_once()
+    mock_product_repository.decrement_stock.assert_called_once_with({1: 2})
+    mock_product_repository.update.assert_not_called()
+    mock_order_repository.create.assert_called_once_with(
+        user_id=1, items=order_data["items"], prices={1: 50.0}
+    )
+
+
+@pytest.mark.asyncio
+async def test_create_order_merges_duplicate_lines(
+    order_service_with_mocks,
+    mock_user_repository,
+    mock_product_repository,
+    mock_order_repository,
+):
+    """Test that repeated product lines are decremented in one batch"""
+    mock_user_repository.get_by_id.return_value = Mock(id=1)
+    mock_product_repository.get_by_ids.return_value = {
+        1: Mock(id=1, price=10.0, stock_quantity=10),
+        2: Mock(id=2, price=20.0, stock_quantity=10),
+    }
+    mock_product_repository.decrement_stock.return_value = {1: 5, 2: 9}
+
+    order_data = {
+        "user_id": 1,
+        "items": [
+            {"product_id": 1, "quantity": 2},
+            {"product_id": 2, "quantity": 1},
+            {"product_id": 1, "quantity": 3},
+        ],
+    }
+    await order_service_with_mocks.create_order(order_data)
+
+    mock_product_repository.decrement_stock.assert_called_once_with({1: 5, 2: 1})
+
+
+@pytest.mark.asyncio
+async def test_create_order_concurrent_stock_shortfall(
+    order_service_with_mocks,
+    mock_user_repository,
+    mock_product_repository,
+    mock_order_repository,
+):
+    """Test order fails when the conditional UPDATE skips a product"""
+    mock_user_repository.get_by_id.return_value = Mock(id=1)
+    mock_product_repository.get_by_ids.return_value = {
+        1: Mock(id=1, price=10.0, stock_quantity=5),
+        2: Mock(id=2, price=20.0, stock_quantity=5),
+    }
+    mock_product_repository.decrement_stock.return_value = {1: 4}
+
+    order_data = {
+        "user_id": 1,
+        "items": [{"product_id": 1, "quantity": 1}, {"product_id": 2, "quantity": 1}],
+    }
+
+    with pytest.raises(ValueError, match="Insufficient stock"):
+        await order_service_with_mocks.create_order(order_data)
+
+    mock_order_repository.create.assert_not_called()
+
+
+@pytest.fixture
+def mock_reservation_service():
+    """Mock Redis reservation service"""
+    service = Mock()
+    service.reserve = AsyncMock(return_value="r1")
+    service.confirm = AsyncMock()
+    service.release = AsyncMock()
+    service.adjust = AsyncMock()
+    return service
+
+
+@pytest.fixture
+def reserving_order_service(
+    mock_order_repository,
+    mock_product_repository,
+    mock_user_repository,
+    mock_reservation_service,
+):
+    """Order service in reserve-first mode"""
+    return OrderService(
+        order_repository=mock_order_repository,
+        product_repository=mock_product_repository,
+        user_repository=mock_user_repository,
+        reservation_service=mock_reservation_service,
+    )
+
+
+@pytest.mark.asyncio
+async def test_create_order_reserve_first(
+    reserving_order_service,
+    mock_user_repository,
+    mock_product_repository,
+    mock_order_repository,
+    mock_reservation_service,
+):
+    """Test that reserve-first mode holds stock in Redis, not in the table"""
+    mock_user_repository.get_by_id.return_value = Mock(id=1)
+    mock_product_repository.get_by_ids.return_value = {
+        1: Mock(id=1, price=10.0, stock_quantity=5)
+    }
+    mock_order_repository.create.return_value = Mock(id=7)
+
+    order_data = {"user_id": 1, "items": [{"product_id": 1, "quantity": 2}]}
+    result = await reserving_order_service.create_order(order_data)
+
+    assert result.id == 7
+    mock_reservation_service.reserve.assert_called_once_with({1: 2}, {1: 5})
+    mock_reservation_service.confirm.assert_called_once_with("r1")
+    mock_reservation_service.release.assert_not_called()
+    mock_product_repository.decrement_stock.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_create_order_reserve_first_releases_on_failure(
+    reserving_order_service,
+    mock_user_repository,
+    mock_product_repository,
+    mock_order_repository,
+    mock_reservation_service,
+):
+    """Test that the hold is released when the order cannot be written"""
+    mock_user_repository.get_by_id.return_value = Mock(id=1)
+    mock_product_repository.get_by_ids.return_value = {
+        1: Mock(id=1, price=10.0, stock_quantity=5)
+    }
+    mock_order_repository.create.side_effect = ValueError("User 1 not found")
+
+    order_data = {"user_id": 1, "items": [{"product_id": 1, "quantity": 2}]}
+    with pytest.raises(ValueError):
+        await reserving_order_service.create_order(order_data)
+
+    mock_reservation_service.confirm.assert_not_called()
+    mock_reservation_service.release.assert_called_once_with("r1")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("committed", [True, False])
+async def test_create_order_reserve_first_settles_hold_with_transaction(
+    committed,
+    mock_order_repository,
+    mock_product_repository,
+    mock_user_repository,
+    mock_reservation_service,
+):
+    """Test that the hold is confirmed on commit and released on rollback"""
+    mock_user_repository.get_by_id.return_value = Mock(id=1)
+    mock_product_repository.get_by_ids.return_value = {
+        1: Mock(id=1, price=10.0, stock_quantity=5)
+    }
+    mock_order_repository.create.return_value = Mock(id=7)
+    uow = UnitOfWork(Mock(commit=AsyncMock(), rollback=AsyncMock()))
+    service = OrderService(
+        order_repository=mock_order_repository,
+        product_repository=mock_product_repository,
+        user_repository=mock_user_repository,
+        reservation_service=mock_reservation_service,
+        unit_of_work=uow,
+    )
+
+    order_data = {"user_id": 1, "items": [{"product_id": 1, "quantity": 2}]}
+    await service.create_order(order_data)
+    mock_reservation_service.confirm.assert_not_called()
+
+    await (uow.commit() if committed else uow.rollback())
+
+    if committed:
+        mock_reservation_service.confirm.assert_called_once_with("r1")
+        mock_reservation_service.release.assert_not_called()
+    else:
+        mock_reservation_service.confirm.assert_not_called()
+        mock_reservation_service.release.assert_called_once_with("r1")
+
+
+@pytest.mark.asyncio
+async def test_cancel_adjusts_reserved_counters(
+    reserving_order_service,
+    mock_order_repository,
+    mock_product_repository,
+    mock_reservation_service,
+):
+    """Test that restocked quantities are mirrored to the Redis counters"""
+    mock_order_repository.cancel_many.return_value = ([1], {3: 4})
+
+    await reserving_order_service.cancel_many([1])
+
+    mock_product_repository.increment_stock.assert_called_once_with({3: 4})
+    mock_reservation_service.adjust.assert_called_once_with({3: 4})
+
+
+@pytest.fixture
+def mock_cache_service():
+    """Mock cache service"""
+    cache = Mock()
+    cache.get = AsyncMock(return_value=None)
+    cache.set = AsyncMock()
+    cache.delete = AsyncMock()
+    cache.delete_many = AsyncMock()
+    cache.get_or_set = AsyncMock()
+    cache.invalidate_namespace = AsyncMock()
+    return cache
+
+
+@pytest.fixture
+def caching_order_service(
+    mock_order_repository,
+    mock_product_repository,
+    mock_user_repository,
+    mock_cache_service,
+):
+    """Order service with a read-through order cache"""
+    return OrderService(
+        order_repository=mock_order_repository,
+        product_repository=mock_product_repository,
+        user_repository=mock_user_repository,
+        cache_service=mock_cache_service,
+    )
+
+
+@pytest.mark.asyncio
+async def test_get_order_cached_for_status_ttl(
+    caching_order_service, mock_order_repository, mock_cache_service
+):
+    """Test that orders are cached as dicts for a time set by their status"""
+    item = Mock(id=7, product_id=3, quantity=2, unit_price=5.0)
+    mock_order_repository.get_by_id.return_value = Mock(
+        id=1, user_id=2, total_amount=10.0, status="delivered", items=[item]
+    )
+
+    async def get_or_set(key, loader, ttl, negative_ttl=None):
+        value = await loader()
+        stored.append((key, ttl(value), negative_ttl))
+        return value
+
+    stored = []
+    mock_cache_service.get_or_set.side_effect = get_or_set
+
+    order = await caching_order_service.get_by_id(1)
+
+    assert order == {
+        "id": 1,
+        "user_id": 2,
+        "total_amount": 10.0,
+        "status": "delivered",
+        "items": [{"id": 7, "product_id": 3, "quantity": 2, "unit_price": 5.0}],
+    }
+    [(key, ttl, negative_ttl)] = stored
+    assert key == "order:1"
+    assert ttl >= 0.9 * OrderService.ORDER_CACHE_TTLS["delivered"]
+    assert negative_ttl == OrderService.MISSING_ORDER_TTL
+
+
+@pytest.mark.asyncio
+async def test_get_missing_order_from_cache(caching_order_service, mock_cache_service):
+    """Test that a cached miss (tombstone) is reported as not found"""
+    mock_cache_service.get_or_set.return_value = None
+
+    with pytest.raises(ValueError, match="Order 404 not found"):
+        await caching_order_service.get_by_id(404)
+
+
+@pytest.mark.asyncio
+async def test_update_order_invalidates_cache(
+    caching_order_service, mock_order_repository, mock_cache_service
+):
+    """Test that an update drops the cached order"""
+    mock_order_repository.get_by_id.return_value = Mock(
+        id=1, status="pending", items=[]
+    )
+
+    await caching_order_service.update(1, {"status": "shipped"})
+
+    mock_cache_service.delete_many.assert_called_once_with(["order:1"])
+
+
+@pytest.mark.asyncio
+async def test_create_order_clears_caches(
+    caching_order_service,
+    mock_user_repository,
+    mock_product_repository,
+    mock_order_repository,
+    mock_cache_service,
+):
+    """Test that placing an order clears its tombstone and the list caches"""
+    mock_user_repository.get_by_id.return_value = Mock(id=1)
+    mock_product_repository.get_by_ids.return_value = {
+        1: Mock(id=1, price=10.0, stock_quantity=5)
+    }
+    mock_product_repository.decrement_stock.return_value = {1: 4}
+    mock_order_repository.create.return_value = Mock(id=12)
+
+    order_data = {"user_id": 1, "items": [{"product_id": 1, "quantity": 1}]}
+    await caching_order_service.create_order(order_data)
+
+    mock_cache_service.delete.assert_called_once_with("order:12")
+    # The stock column changed, so the cached product views are stale
+    mock_cache_service.delete_many.assert_called_once_with(
+        ["product:1", "product:1:json"]
+    )
+    tags = {c.args[0] for c in mock_cache_service.invalidate_namespace.call_args_list}
+    assert tags == {ProductService.CACHE_TAG, ReportService.CACHE_TAG}
+
+
+@pytest.mark.asyncio
+async def test_cancel_via_update_evicts_restocked_products(
+    caching_order_service, mock_order_repository, mock_cache_service
+):
+    """Test that cancelling through update drops the restocked product cache"""
+    mock_order_repository.get_by_id.return_value = Mock(
+        id=1, status="pending", items=[]
+    )
+    mock_order_repository.cancel_many.return_value = ([1], {4: 2})
+
+    await caching_order_service.update(1, {"status": "cancelled"})
+
+    mock_cache_service.delete_many.assert_any_call(["product:4", "product:4:json"])
+
+
+@pytest.mark.asyncio
+async def test_cancel_many_evicts_restocked_products(
+    caching_order_service, mock_order_repository, mock_cache_service
+):
+    """Test that cancelling orders drops the cache of every restocked product"""
+    mock_order_repository.cancel_many.return_value = ([1, 2], {3: 1, 1: 7})
+
+    await caching_order_service.cancel_many([1, 2])
+
+    mock_cache_service.delete_many.assert_any_call(["order:1", "order:2"])
+    mock_cache_service.delete_many.assert_any_call(
+        ["product:1", "product:1:json", "product:3", "product:3:json"]
+    )
 
 
 @pytest.mark.asyncio
@@ -94,7 +436,7 @@ async def test_create_order_product_not_found(
     """Test order creation fails when product not found"""
     mock_user = Mock(id=1, username="testuser")
     mock_user_repository.get_by_id.return_value = mock_user
-    mock_product_repository.get_by_id.return_value = None
+    mock_product_repository.get_by_ids.return_value = {}
 
     order_data = {"user_id": 1, "items": [{"product_id": 999, "quantity": 1}]}
 
@@ -111,14 +453,14 @@ async def test_create_order_insufficient_stock(
     mock_user_repository.get_by_id.return_value = mock_user
 
     mock_product = Mock(id=1, price=50.0, stock_quantity=5)
-    mock_product_repository.get_by_id.return_value = mock_product
+    mock_product_repository.get_by_ids.return_value = {1: mock_product}
 
     order_data = {"user_id": 1, "items": [{"product_id": 1, "quantity": 10}]}
 
     with pytest.raises(ValueError, match="Insufficient stock"):
         await order_service_with_mocks.create_order(order_data)
 
-    mock_product_repository.update.assert_not_called()
+    mock_product_repository.decrement_stock.assert_not_called()
 
 
 @pytest.mark.asyncio
@@ -169,14 +511,10 @@ async def test_create_order_multiple_items_stock_validation(
     mock_user = Mock(id=1, username="testuser")
     mock_user_repository.get_by_id.return_value = mock_user
 
-    def get_product(product_id):
-        if product_id == 1:
-            return Mock(id=1, price=10.0, stock_quantity=50)
-        elif product_id == 2:
-            return Mock(id=2, price=20.0, stock_quantity=3)
-        return None
-
-    mock_product_repository.get_by_id.side_effect = get_product
+    mock_product_repository.get_by_ids.return_value = {
+        1: Mock(id=1, price=10.0, stock_quantity=50),
+        2: Mock(id=2, price=20.0, stock_quantity=3),
+    }
 
     order_data = {
         "user_id": 1,
@@ -186,7 +524,7 @@ async def test_create_order_multiple_items_stock_validation(
     with pytest.raises(ValueError, match="Insufficient stock"):
         await order_service_with_mocks.create_order(order_data)
 
-    mock_product_repository.update.assert_not_called()
+    mock_product_repository.decrement_stock.assert_not_called()
 
 
 @pytest.mark.asyncio
@@ -257,17 +595,100 @@ async def test_cancel_order_restores_stock(
 
     mock_order_repository.get_by_id.return_value = mock_order
     mock_order_repository.update.return_value = mock_updated_order
-
-    mock_product = Mock(id=1, stock_quantity=95)
-    mock_product_repository.get_by_id.return_value = mock_product
+    mock_order_repository.cancel_many.return_value = ([1], {1: 5})
 
     result = await order_service_with_mocks.update(1, {"status": "cancelled"})
 
-    mock_product_repository.get_by_id.assert_called_once_with(1)
-    mock_product_repository.update.assert_called_once_with(1, stock_quantity=100)
+    mock_order_repository.cancel_many.assert_called_once_with([1])
+    mock_product_repository.increment_stock.assert_called_once_with({1: 5})
+    mock_product_repository.get_by_id.assert_not_called()
+    mock_product_repository.update.assert_not_called()
     assert result.status == "cancelled"
 
 
+@pytest.mark.asyncio
+async def test_cancel_many_restocks_once(
+    order_service_with_mocks, mock_order_repository, mock_product_repository
+):
+    """Test bulk cancellation issues a single restock for all orders"""
+    mock_order_repository.cancel_many.return_value = ([1, 2], {1: 7, 3: 1})
+
+    result = await order_service_with_mocks.cancel_many([2, 1, 2])
+
+    assert result == [1, 2]
+    mock_order_repository.cancel_many.assert_called_once_with([1, 2])
+    mock_product_repository.increment_stock.assert_called_once_with({1: 7, 3: 1})
+
+
+@pytest.mark.asyncio
+async def test_cancel_many_skips_already_cancelled(
+    order_service_with_mocks, mock_order_repository, mock_product_repository
+):
+    """Test that nothing is restocked when no order changed status"""
+    mock_order_repository.cancel_many.return_value = ([], {})
+
+    result = await order_service_with_mocks.cancel_many([5])
+
+    assert result == []
+    mock_product_repository.increment_stock.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_update_order_items_applies_stock_deltas(
+    order_service_with_mocks, mock_order_repository, mock_product_repository
+):
+    """Test that changed quantities adjust stock in one batch"""
+    old_items = [Mock(product_id=1, quantity=2), Mock(product_id=2, quantity=3)]
+    mock_order = Mock(id=1, user_id=1, status="pending", items=old_items)
+    mock_order_repository.get_by_id.return_value = mock_order
+    mock_order_repository.update.return_value = mock_order
+    mock_product_repository.decrement_stock.return_value = {1: 0, 2: 0, 3: 0}
+
+    new_items = [
+        {"product_id": 1, "quantity": 5},
+        {"product_id": 3, "quantity": 1},
+    ]
+    await order_service_with_mocks.update(1, {"items": new_items})
+
+    mock_product_repository.decrement_stock.assert_called_once_with({1: 3, 2: -3, 3: 1})
+
+
+@pytest.mark.asyncio
+async def test_update_order_items_insufficient_stock(
+    order_service_with_mocks, mock_order_repository, mock_product_repository
+):
+    """Test that an edit needing more stock than available fails"""
+    mock_order = Mock(
+        id=1, user_id=1, status="pending", items=[Mock(product_id=1, quantity=1)]
+    )
+    mock_order_repository.get_by_id.return_value = mock_order
+    mock_order_repository.update.return_value = mock_order
+    mock_product_repository.decrement_stock.return_value = {}
+
+    with pytest.raises(ValueError, match="Insufficient stock"):
+        await order_service_with_mocks.update(
+            1, {"items": [{"product_id": 1, "quantity": 50}]}
+        )
+
+
+@pytest.mark.asyncio
+async def test_update_cancelled_order_items_keeps_stock(
+    order_service_with_mocks, mock_order_repository, mock_product_repository
+):
+    """Test that editing a cancelled order does not touch stock"""
+    mock_order = Mock(
+        id=1, user_id=1, status="cancelled", items=[Mock(product_id=1, quantity=1)]
+    )
+    mock_order_repository.get_by_id.return_value = mock_order
+    mock_order_repository.update.return_value = mock_order
+
+    await order_service_with_mocks.update(
+        1, {"items": [{"product_id": 1, "quantity": 5}]}
+    )
+
+    mock_product_repository.decrement_stock.assert_not_called()
+
+
 @pytest.mark.asyncio
 async def test_delete_order(order_service_with_mocks, mock_order_repository):
     """Test deleting an order"""
@@ -302,7 +723,7 @@ async def test_get_by_filter_pagination(
     assert result["total"] == 5
     assert len(result["items"]) == 3
     mock_order_repository.list.assert_called_once_with(
-        limit=3, offset=0, user_id=None, status=None
+        limit=3, offset=0, user_id=None, status=None, created_from=None, created_to=None
     )
 
 
@@ -324,6 +745,37 @@ async def test_get_by_filter_pagination_pages_differ(
     assert page1["items"][0].id != page2["items"][0].id
 
 
+@pytest.mark.asyncio
+async def test_get_by_filter_keyset(order_service_with_mocks, mock_order_repository):
+    """Test keyset pagination skips the count and returns a cursor"""
+    mock_order_repository.list_after.return_value = [Mock(id=11), Mock(id=12)]
+
+    result = await order_service_with_mocks.get_by_filter(
+        count=2, cursor=encode_cursor(10)
+    )
+
+    assert result["total"] is None
+    assert decode_cursor(result["next_cursor"]) == 12
+    mock_order_repository.list.assert_not_called()
+    mock_order_repository.list_after.assert_called_once_with(
+        10, limit=2, user_id=None, status=None, created_from=None, created_to=None
+    )
+
+
+@pytest.mark.asyncio
+async def test_get_by_filter_keyset_last_page(
+    order_service_with_mocks, mock_order_repository
+):
+    """Test that a short page has no next cursor"""
+    mock_order_repository.list_after.return_value = [Mock(id=13)]
+
+    result = await order_service_with_mocks.get_by_filter(
+        count=2, cursor=encode_cursor(12)
+    )
+
+    assert result["next_cursor"] is None
+
+
 @pytest.mark.asyncio
 async def test_filter_by_user_id(order_service_with_mocks, mock_order_repository):
     """Test filtering orders by user_id"""
@@ -335,7 +787,12 @@ async def test_filter_by_user_id(order_service_with_mocks, mock_order_repository
     assert result["total"] == 3
     assert all(order.user_id == 1 for order in result["items"])
     mock_order_repository.list.assert_called_once_with(
-        limit=10, offset=0, user_id=1, status=None
+        limit=10,
+        offset=0,
+        user_id=1,
+        status=None,
+        created_from=None,
+        created_to=None,
     )
 
 
@@ -350,27 +807,36 @@ async def test_filter_by_status(order_service_with_mocks, mock_order_repository)
     assert result["total"] == 3
     assert all(order.status == "pending" for order in result["items"])
     mock_order_repository.list.assert_called_once_with(
-        limit=10, offset=0, user_id=None, status="pending"
+        limit=10,
+        offset=0,
+        user_id=None,
+        status="pending",
+        created_from=None,
+        created_to=None,
     )
 
 
 @pytest.mark.asyncio
-async def test_filter_fallback_when_repository_lacks_filters(
+async def test_filter_by_created_range(order_service_with_mocks, mock_order_repository):
+    """Test that aware datetimes are passed to the repository as naive UTC"""
+    mock_order_repository.list.return_value = (0, [])
+    created_from = datetime(2025, 1, 1, 3, 0, tzinfo=timezone(timedelta(hours=3)))
+
+    await order_service_with_mocks.get_by_filter(created_from=created_from)
+
+    kwargs = mock_order_repository.list.call_args.kwargs
+    assert kwargs["created_from"] == datetime(2025, 1, 1, 0, 0)
+    assert kwargs["created_to"] is None
+
+
+@pytest.mark.asyncio
+async def test_filter_repository_errors_propagate(
     order_service_with_mocks, mock_order_repository
 ):
-    """Test fallback behavior when repository doesn't support filtering"""
-    all_orders = [
-        Mock(id=1, user_id=1, status="pending"),
-        Mock(id=2, user_id=2, status="pending"),
-        Mock(id=3, user_id=1, status="shipped"),
-    ]
+    """Test that repository errors are not hidden behind a partial re-query"""
+    mock_order_repository.list.side_effect = TypeError("boom")
 
-    mock_order_repository.list.side_effect = [
-        TypeError("unexpected keyword argument"),
-        (3, all_orders),
-    ]
+    with pytest.raises(TypeError):
+        await order_service_with_mocks.get_by_filter(user_id=1)
 
-    result = await order_service_with_mocks.get_by_filter(user_id=1)
-
-    assert result["total"] == 2
-    assert all(order.user_id == 1 for order in result["items"])
+    mock_order_repository.list.assert_called_once()
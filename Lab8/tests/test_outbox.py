@@ -0,0 +1,122 @@
+import uuid
+from unittest.mock import AsyncMock
+
+import pytest
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.models.outbox import OutboxEvent
+from src.repositories.product_repository import ProductRepository
+from src.schemas.user import UserCreate
+from src.services.outbox_relay import OutboxRelay
+
+
+async def staged_events(session):
+    await session.flush()
+    res = await session.execute(select(OutboxEvent).order_by(OutboxEvent.id))
+    return list(res.scalars().all())
+
+
+@pytest.fixture
+def session_maker(engine):
+    return async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+
+@pytest.fixture
+async def empty_outbox(session_maker):
+    async with session_maker() as session:
+        await session.execute(delete(OutboxEvent))
+        await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_product_mutations_stage_events(session, product_repository):
+    """Test that product writes add outbox rows in the same session"""
+    product = await product_repository.create(
+        name=f"Outbox {uuid.uuid4().hex[:8]}", price=10.0, stock_quantity=5
+    )
+    await product_repository.decrement_stock({product.id: 2})
+    await product_repository.update(product.id, price=12.5)
+
+    events = [e for e in await staged_events(session) if e.aggregate_type == "product"]
+
+    assert [e.event_type for e in events][-3:] == [
+        "product.created",
+        "product.stock_changed",
+        "product.updated",
+    ]
+    assert events[-3].aggregate_id == product.id
+    assert events[-2].payload == {"stock": {str(product.id): 3}}
+    assert events[-1].payload["price"] == 12.5
+    await session.rollback()
+
+
+@pytest.mark.asyncio
+async def test_order_mutations_stage_events(
+    session, user_repository, product_repository, order_repository
+):
+    """Test that order writes add outbox rows with an order snapshot"""
+    unique_id = uuid.uuid4().hex[:8]
+    user = await user_repository.create(
+        UserCreate(username=f"outbox_{unique_id}", email=f"{unique_id}@example.com")
+    )
+    product = await product_repository.create(
+        name=f"Outbox {unique_id}", price=4.0, stock_quantity=10
+    )
+
+    order = await order_repository.create(
+        user.id, [{"product_id": product.id, "quantity": 3}]
+    )
+    await order_repository.cancel_many([order.id])
+
+    events = [
+        e
+        for e in await staged_events(session)
+        if e.aggregate_type == "order" and e.aggregate_id == order.id
+    ]
+
+    assert [e.event_type for e in events] == ["order.created", "order.cancelled"]
+    assert events[0].payload["total_amount"] == 12.0
+    assert events[0].payload["items"] == [
+        {"product_id": product.id, "quantity": 3, "unit_price": 4.0}
+    ]
+
+
+@pytest.mark.asyncio
+async def test_relay_publishes_in_order_and_deletes(session_maker, empty_outbox):
+    """Test that relayed events are published oldest first and removed"""
+    async with session_maker() as session:
+        repo = ProductRepository(session)
+        for i in range(3):
+            await repo.create(name=f"Relay {i}", price=1.0, stock_quantity=i)
+        await session.commit()
+
+    publish = AsyncMock()
+    relay = OutboxRelay(session_maker, publish, batch_size=2)
+
+    assert await relay.relay_batch() == 2
+    assert await relay.relay_batch() == 1
+    assert await relay.relay_batch() == 0
+
+    names = [call.args[0].payload["name"] for call in publish.await_args_list]
+    assert names == ["Relay 0", "Relay 1", "Relay 2"]
+
+
+@pytest.mark.asyncio
+async def test_relay_keeps_events_when_publish_fails(session_maker, empty_outbox):
+    """Test at-least-once delivery: a failed batch stays in the outbox"""
+    async with session_maker() as session:
+        await ProductRepository(session).create(
+            name="Unsent", price=1.0, stock_quantity=1
+        )
+        await session.commit()
+
+    relay = OutboxRelay(
+        session_maker, AsyncMock(side_effect=ConnectionError("broker down"))
+    )
+    with pytest.raises(ConnectionError):
+        await relay.relay_batch()
+
+    publish = AsyncMock()
+    assert await OutboxRelay(session_maker, publish).relay_batch() == 1
+    assert publish.await_args.args[0].payload["name"] == "Unsent"
@@ -17,7 +17,8 @@ from src.schemas.product import (
 
 class ProductService(Protocol):
     async def get_by_id(self, product_id: int): ...
-    async def get_by_filter(self, count: int, page: int): ...
+    async def get_json_by_id(self, product_id: int): ...
+    async def get_by_filter(self, count: int, page: int, cursor=None): ...
     async def create(self, data: ProductCreate): ...
     async def update(self, product_id: int, data: ProductUpdate): ...
     async def delete(self, product_id: int): ...
@@ -55,8 +56,8 @@ async def test_get_product_by_id(product_response: ProductResponse):
     """Test retrieving a product by ID"""
 
     class MockProductService:
-        async def get_by_id(self, product_id: int):
-            return product_response
+        async def get_json_by_id(self, product_id: int):
+            return product_response.model_dump_json().encode()
 
     with create_test_client(
         route_handlers=[ProductController],
@@ -68,6 +69,7 @@ async def test_get_product_by_id(product_response: ProductResponse):
     ) as client:
         response = client.get(f"/products/{product_response.id}")
         assert response.status_code == HTTP_200_OK
+        assert response.headers["content-type"] == "application/json"
         assert response.json() == product_response.model_dump(mode="json")
 
 
@@ -76,7 +78,7 @@ async def test_get_product_by_id_not_found():
     """Test retrieving a non-existent product"""
 
     class MockProductService:
-        async def get_by_id(self, product_id: int):
+        async def get_json_by_id(self, product_id: int):
             return None
 
     with create_test_client(
@@ -98,7 +100,7 @@ async def test_get_all_products(product_response: ProductResponse):
     products = [product_response]
 
     class MockProductService:
-        async def get_by_filter(self, count: int, page: int):
+        async def get_by_filter(self, count: int, page: int, cursor=None):
             return {"total": 1, "items": products}
 
     with create_test_client(
@@ -123,7 +125,7 @@ async def test_get_all_products_default_pagination(product_response: ProductResp
     products = [product_response]
 
     class MockProductService:
-        async def get_by_filter(self, count: int, page: int):
+        async def get_by_filter(self, count: int, page: int, cursor=None):
             assert count == 10
             assert page == 1
             return {"total": 1, "items": products}
@@ -140,6 +142,31 @@ async def test_get_all_products_default_pagination(product_response: ProductResp
         assert response.status_code == HTTP_200_OK
 
 
+@pytest.mark.asyncio
+async def test_get_all_products_cursor(product_response: ProductResponse):
+    """Test listing products with an opaque cursor"""
+    products = [product_response]
+
+    class MockProductService:
+        async def get_by_filter(self, count: int, page: int, cursor=None):
+            assert cursor == "abc"
+            return {"total": None, "items": products, "next_cursor": "def"}
+
+    with create_test_client(
+        route_handlers=[ProductController],
+        dependencies={
+            "product_service": Provide(
+                lambda: MockProductService(), sync_to_thread=False
+            )
+        },
+    ) as client:
+        response = client.get("/products?count=1&cursor=abc")
+        assert response.status_code == HTTP_200_OK
+        data = response.json()
+        assert data["total"] is None
+        assert data["next_cursor"] == "def"
+
+
 @pytest.mark.asyncio
 async def test_create_product(
     product_create: ProductCreate, product_response: ProductResponse
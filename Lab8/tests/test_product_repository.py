@@ -1,6 +1,10 @@
 from decimal import Decimal
 
 import pytest
+from sqlalchemy import update
+from sqlalchemy.orm.exc import StaleDataError
+
+from src.models.product import Product
 
 
 @pytest.mark.asyncio
@@ -117,3 +121,132 @@ async def test_list_products_pagination(product_repository):
 
     if len(page1) > 0 and len(page2) > 0:
         assert page1[0].id != page2[0].id
+
+
+@pytest.mark.asyncio
+async def test_get_products_by_ids(product_repository):
+    """Test loading several products at once"""
+    p1 = await product_repository.create(name="Batch 1", price=1.00, stock_quantity=1)
+    p2 = await product_repository.create(name="Batch 2", price=2.00, stock_quantity=2)
+
+    products = await product_repository.get_by_ids([p1.id, p2.id, 99999])
+
+    assert set(products) == {p1.id, p2.id}
+    assert products[p2.id].name == "Batch 2"
+
+
+@pytest.mark.asyncio
+async def test_decrement_stock_is_conditional(product_repository):
+    """Test that only products with enough stock are decremented"""
+    p1 = await product_repository.create(name="Dec 1", price=1.00, stock_quantity=10)
+    p2 = await product_repository.create(name="Dec 2", price=1.00, stock_quantity=1)
+
+    updated = await product_repository.decrement_stock({p1.id: 4, p2.id: 5})
+
+    assert updated == {p1.id: 6}
+    assert (await product_repository.get_by_id(p1.id)).stock_quantity == 6
+    assert (await product_repository.get_by_id(p2.id)).stock_quantity == 1
+
+
+@pytest.mark.asyncio
+async def test_decrement_stock_ignores_concurrent_version_bump(product_repository):
+    """Test that a concurrent stock change does not fail the conditional UPDATE"""
+    product = await product_repository.create(
+        name="Ver Hot", price=1.00, stock_quantity=10
+    )
+    version = product.version
+    await product_repository.decrement_stock({product.id: 1})
+
+    updated = await product_repository.decrement_stock({product.id: 2})
+
+    assert updated == {product.id: 7}
+    assert product.version == version + 2
+
+
+@pytest.mark.asyncio
+async def test_orm_update_detects_concurrent_stock_change(product_repository):
+    """Test that a read-modify-write loses to a concurrent stock UPDATE"""
+    product = await product_repository.create(
+        name="Ver ORM", price=1.00, stock_quantity=10
+    )
+    product.stock_quantity = 3
+
+    # Another writer bumps the row behind the session's back
+    products = Product.__table__
+    conn = await product_repository.session.connection()
+    await conn.execute(
+        update(products)
+        .where(products.c.id == product.id)
+        .values(stock_quantity=products.c.stock_quantity - 1, version=2)
+    )
+
+    with pytest.raises(StaleDataError):
+        await product_repository.session.flush()
+
+
+@pytest.mark.asyncio
+async def test_update_retries_after_concurrent_change(product_repository):
+    """Test that an update re-reads the row and keeps the concurrent change"""
+    product = await product_repository.create(
+        name="Ver Retry", price=1.00, stock_quantity=10
+    )
+
+    # Another writer bumps the row after the session loaded it
+    products = Product.__table__
+    conn = await product_repository.session.connection()
+    await conn.execute(
+        update(products)
+        .where(products.c.id == product.id)
+        .values(stock_quantity=products.c.stock_quantity - 1, version=2)
+    )
+
+    updated = await product_repository.update(product.id, name="Ver Retried")
+
+    assert updated.name == "Ver Retried"
+    assert updated.stock_quantity == 9
+    assert updated.version == 3
+
+
+@pytest.mark.asyncio
+async def test_update_raises_when_retries_run_out(product_repository):
+    """Test that StaleDataError (409 at the API) surfaces after the last attempt"""
+    product = await product_repository.create(
+        name="Ver Exhausted", price=1.00, stock_quantity=10
+    )
+    product_repository.MAX_UPDATE_ATTEMPTS = 1
+
+    products = Product.__table__
+    conn = await product_repository.session.connection()
+    await conn.execute(
+        update(products).where(products.c.id == product.id).values(version=2)
+    )
+
+    with pytest.raises(StaleDataError):
+        await product_repository.update(product.id, name="Ver Lost")
+
+
+@pytest.mark.asyncio
+async def test_increment_stock_in_one_statement(product_repository):
+    """Test that stock is returned for several products at once"""
+    p1 = await product_repository.create(name="Inc 1", price=1.00, stock_quantity=0)
+    p2 = await product_repository.create(name="Inc 2", price=1.00, stock_quantity=3)
+
+    updated = await product_repository.increment_stock({p1.id: 2, p2.id: 5})
+
+    assert updated == {p1.id: 2, p2.id: 8}
+    assert p2.stock_quantity == 8
+
+
+@pytest.mark.asyncio
+async def test_list_products_after_cursor(product_repository):
+    """Test keyset pagination returns the next products by id"""
+    created = [
+        await product_repository.create(
+            name=f"Cursor Product {i}", price=5.00, stock_quantity=1
+        )
+        for i in range(4)
+    ]
+
+    page = await product_repository.get_after(created[0].id, count=2)
+
+    assert [p.id for p in page] == [created[1].id, created[2].id]
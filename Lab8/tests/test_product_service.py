@@ -0,0 +1,210 @@
+import json
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from src.repositories.unit_of_work import UnitOfWork
+from src.services.cache_service import CacheService
+from src.services.product_service import ProductService
+
+
+@pytest.fixture
+def mock_cache_service():
+    """Mock cache service"""
+    cache = Mock()
+    cache.get_many = AsyncMock()
+    cache.set_many = AsyncMock()
+    cache.set = AsyncMock()
+    cache.get_bytes = AsyncMock(return_value=None)
+    cache.set_bytes = AsyncMock()
+    cache.get_or_set = AsyncMock()
+    cache.invalidate_namespace = AsyncMock()
+    return cache
+
+
+@pytest.fixture
+def mock_product_repository():
+    """Mock product repository"""
+    repo = Mock()
+    repo.get_by_ids = AsyncMock()
+    repo.create = AsyncMock()
+    return repo
+
+
+@pytest.fixture
+def product_service(mock_product_repository, mock_cache_service):
+    return ProductService(mock_product_repository, mock_cache_service)
+
+
+@pytest.mark.asyncio
+async def test_get_many_by_id_reads_misses_in_one_query(
+    product_service, mock_product_repository, mock_cache_service
+):
+    """Test that hits come from one MGET and misses from one IN query"""
+    cached = {"id": 1, "name": "Cached", "price": 1.0, "stock_quantity": 3}
+    mock_cache_service.get_many.return_value = [cached, None, None]
+    mock_product_repository.get_by_ids.return_value = {
+        3: Mock(id=3, price=2.5, stock_quantity=7)
+    }
+    mock_product_repository.get_by_ids.return_value[3].name = "Fresh"
+
+    result = await product_service.get_many_by_id([1, 2, 3, 1])
+
+    mock_cache_service.get_many.assert_called_once_with(
+        ["product:1", "product:2", "product:3"]
+    )
+    mock_product_repository.get_by_ids.assert_called_once_with([2, 3])
+    fresh = {"id": 3, "name": "Fresh", "price": 2.5, "stock_quantity": 7}
+    fill = mock_cache_service.set_many.call_args_list[0]
+    items, ttl = fill.args
+    assert items == {"product:3": fresh}
+    # Read-through fills do not publish invalidations to other workers
+    assert fill.kwargs == {"invalidate": False}
+    ttl_base = ProductService.PRODUCT_CACHE_TTL
+    assert 0.9 * ttl_base <= ttl <= 1.1 * ttl_base
+    mock_cache_service.set_many.assert_called_with(
+        {"product:2": CacheService.TOMBSTONE},
+        ProductService.MISSING_PRODUCT_TTL,
+        invalidate=False,
+    )
+    assert result == {1: cached, 3: fresh}
+
+
+@pytest.mark.asyncio
+async def test_get_many_by_id_all_hits_skip_database(
+    product_service, mock_product_repository, mock_cache_service
+):
+    """Test that a fully cached batch never queries the database"""
+    mock_cache_service.get_many.return_value = [{"id": 5}, {"id": 6}]
+
+    result = await product_service.get_many_by_id([5, 6])
+
+    assert result == {5: {"id": 5}, 6: {"id": 6}}
+    mock_product_repository.get_by_ids.assert_not_called()
+    mock_cache_service.set_many.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_get_many_by_id_remembers_missing_ids(
+    product_service, mock_product_repository, mock_cache_service
+):
+    """Test that unknown ids are tombstoned and left out of the result"""
+    mock_cache_service.get_many.return_value = [CacheService.TOMBSTONE, None]
+    mock_product_repository.get_by_ids.return_value = {}
+
+    result = await product_service.get_many_by_id([1, 2])
+
+    assert result == {}
+    mock_product_repository.get_by_ids.assert_called_once_with([2])
+    mock_cache_service.set_many.assert_any_call(
+        {"product:2": CacheService.TOMBSTONE},
+        ProductService.MISSING_PRODUCT_TTL,
+        invalidate=False,
+    )
+
+
+@pytest.mark.asyncio
+async def test_create_replaces_tombstone(
+    product_service, mock_product_repository, mock_cache_service
+):
+    """Test that a created product is visible even if its id was probed"""
+    product = Mock(id=9, price=3.0, stock_quantity=1)
+    product.name = "New"
+    mock_product_repository.create.return_value = product
+
+    await product_service.create({"name": "New", "price": 3.0, "stock_quantity": 1})
+
+    key, value, _ = mock_cache_service.set.call_args.args
+    assert key == "product:9"
+    assert value == {"id": 9, "name": "New", "price": 3.0, "stock_quantity": 1}
+
+
+@pytest.mark.asyncio
+async def test_create_writes_cache_only_after_commit(
+    mock_product_repository, mock_cache_service
+):
+    """Test that a rolled-back product never reaches the cache"""
+    product = Mock(id=9, price=3.0, stock_quantity=1)
+    product.name = "New"
+    mock_product_repository.create.return_value = product
+    uow = UnitOfWork(Mock(commit=AsyncMock(), rollback=AsyncMock()))
+    service = ProductService(mock_product_repository, mock_cache_service, uow)
+
+    await service.create({"name": "New", "price": 3.0, "stock_quantity": 1})
+    mock_cache_service.set.assert_not_called()
+
+    await uow.rollback()
+    await uow.commit()
+    mock_cache_service.set.assert_not_called()
+    mock_cache_service.invalidate_namespace.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_update_stock_adjusts_reserved_counter(
+    mock_product_repository, mock_cache_service
+):
+    """Test that a stock edit moves the Redis counter by the difference"""
+    mock_cache_service.delete = AsyncMock()
+    mock_product_repository.get_by_id = AsyncMock(
+        return_value=Mock(id=4, stock_quantity=10)
+    )
+    updated = Mock(id=4, price=1.0, stock_quantity=3)
+    updated.name = "Edited"
+    mock_product_repository.update = AsyncMock(return_value=updated)
+    reservations = Mock(adjust=AsyncMock())
+    uow = UnitOfWork(Mock(commit=AsyncMock()))
+    service = ProductService(
+        mock_product_repository, mock_cache_service, uow, reservations
+    )
+
+    await service.update(4, {"stock_quantity": 3})
+    reservations.adjust.assert_not_called()
+
+    await uow.commit()
+    reservations.adjust.assert_called_once_with({4: -7})
+
+
+@pytest.mark.asyncio
+async def test_get_json_by_id_hit_returns_stored_body(
+    product_service, mock_cache_service
+):
+    """Test that a cached body is returned without decoding or a lookup"""
+    mock_cache_service.get_bytes.return_value = b'{"id":1}'
+
+    assert await product_service.get_json_by_id(1) == b'{"id":1}'
+    mock_cache_service.get_bytes.assert_called_once_with("product:1:json")
+    mock_cache_service.get_or_set.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_get_json_by_id_miss_encodes_and_stores_body(
+    product_service, mock_cache_service
+):
+    """Test that a miss encodes the product once and caches the body"""
+    mock_cache_service.get_or_set.return_value = {
+        "id": 1,
+        "name": "Lamp",
+        "price": 9.5,
+        "stock_quantity": 2,
+    }
+
+    body = await product_service.get_json_by_id(1)
+
+    assert json.loads(body) == {
+        "id": 1,
+        "name": "Lamp",
+        "price": 9.5,
+        "stock_quantity": 2,
+    }
+    key, stored, _ = mock_cache_service.set_bytes.call_args.args
+    assert (key, stored) == ("product:1:json", body)
+    assert mock_cache_service.set_bytes.call_args.kwargs == {"invalidate": False}
+
+
+@pytest.mark.asyncio
+async def test_get_json_by_id_missing_product(product_service, mock_cache_service):
+    """Test that a missing product yields no body and caches nothing"""
+    mock_cache_service.get_or_set.return_value = None
+
+    assert await product_service.get_json_by_id(404) is None
+    mock_cache_service.set_bytes.assert_not_called()
@@ -0,0 +1,209 @@
+import fakeredis
+import pytest
+
+from src.services.reservation_service import ReservationService
+
+
+@pytest.fixture
+async def redis_client():
+    # Lua-capable fake: the reservation scripts run as they would on Redis
+    client = fakeredis.FakeAsyncRedis()
+    yield client
+    await client.aclose()
+
+
+@pytest.fixture
+def reservations(redis_client):
+    return ReservationService(redis_client, ttl=900)
+
+
+async def stock(redis_client, product_id):
+    value = await redis_client.get(f"stock:{product_id}")
+    return int(value) if value is not None else None
+
+
+@pytest.mark.asyncio
+async def test_reserve_seeds_counters_and_holds_cart(reservations, redis_client):
+    """Test that a reservation seeds missing counters and holds every line"""
+    reservation_id = await reservations.reserve({1: 2, 2: 1}, {1: 5, 2: 3})
+
+    assert await stock(redis_client, 1) == 3
+    assert await stock(redis_client, 2) == 2
+    hold = await redis_client.hgetall(f"reservation:{reservation_id}")
+    assert hold == {b"1": b"2", b"2": b"1"}
+    assert await redis_client.zscore("reservations:expiry", reservation_id)
+
+
+@pytest.mark.asyncio
+async def test_reserve_short_line_holds_nothing(reservations, redis_client):
+    """Test that a cart with one short line leaves every counter untouched"""
+    await reservations.reserve({1: 1}, {1: 5})
+
+    with pytest.raises(ValueError, match="Insufficient stock"):
+        await reservations.reserve({1: 1, 2: 4}, {1: 5, 2: 3})
+
+    assert await stock(redis_client, 1) == 4
+    assert await stock(redis_client, 2) == 3
+
+
+@pytest.mark.asyncio
+async def test_release_returns_stock_once(reservations, redis_client):
+    """Test that releasing a pending hold restores the counters exactly once"""
+    reservation_id = await reservations.reserve({1: 2}, {1: 5})
+
+    assert await reservations.release(reservation_id) is True
+    assert await reservations.release(reservation_id) is False
+
+    assert await stock(redis_client, 1) == 5
+    assert not await redis_client.exists(f"reservation:{reservation_id}")
+
+
+@pytest.mark.asyncio
+async def test_confirm_queues_hold_for_reconciliation(reservations, redis_client):
+    """Test that a confirmed hold can no longer be released or expire"""
+    reservation_id = await reservations.reserve({1: 2}, {1: 5})
+
+    await reservations.confirm(reservation_id)
+
+    assert await redis_client.lrange("reservations:confirmed", 0, -1) == [
+        reservation_id.encode()
+    ]
+    assert await reservations.release(reservation_id) is False
+    assert await stock(redis_client, 1) == 3
+
+
+@pytest.mark.asyncio
+async def test_confirm_released_hold_fails(reservations):
+    """Test that a hold returned to stock cannot be confirmed afterwards"""
+    reservation_id = await reservations.reserve({1: 2}, {1: 5})
+    await reservations.release(reservation_id)
+
+    with pytest.raises(ValueError, match="Reservation expired"):
+        await reservations.confirm(reservation_id)
+
+
+@pytest.mark.asyncio
+async def test_release_expired_returns_only_stale_holds(redis_client):
+    """Test that only holds past their TTL are released"""
+    stale = await ReservationService(redis_client, ttl=-1).reserve({1: 2}, {1: 5})
+    fresh = await ReservationService(redis_client, ttl=900).reserve({1: 1}, {1: 5})
+
+    released = await ReservationService(redis_client).release_expired()
+
+    assert released == 1
+    assert await stock(redis_client, 1) == 4
+    assert not await redis_client.exists(f"reservation:{stale}")
+    assert await redis_client.exists(f"reservation:{fresh}")
+
+
+@pytest.mark.asyncio
+async def test_adjust_shifts_seeded_counters_only(reservations, redis_client):
+    """Test that database stock changes move existing counters only"""
+    await reservations.reserve({1: 2}, {1: 5})
+
+    await reservations.adjust({1: 10, 2: 10})
+
+    assert await stock(redis_client, 1) == 13
+    assert await stock(redis_client, 2) is None
+
+
+@pytest.mark.asyncio
+async def test_reconcile_applies_confirmed_holds(
+    reservations, redis_client, product_repository, reservation_repository
+):
+    """Test that confirmed holds are applied with one UPDATE and acknowledged"""
+    product = await product_repository.create(
+        name="Reconcile Applied", price=1.00, stock_quantity=5
+    )
+    for quantity in (1, 2):
+        reservation_id = await reservations.reserve(
+            {product.id: quantity}, {product.id: 5}
+        )
+        await reservations.confirm(reservation_id)
+
+    batch, requeue, updated = await reservations.reconcile(
+        product_repository, reservation_repository
+    )
+    await reservations.acknowledge(batch, requeue)
+
+    assert len(batch) == 2
+    assert requeue == {}
+    assert updated == [product.id]
+    assert (await product_repository.get_by_id(product.id)).stock_quantity == 2
+    assert await redis_client.llen("reservations:confirmed") == 0
+    assert not await redis_client.keys("reservation:*")
+
+
+@pytest.mark.asyncio
+async def test_reconcile_requeues_holds_it_could_not_apply(
+    reservations, redis_client, product_repository, reservation_repository
+):
+    """Test that holds on a product short in the database stay queued"""
+    plenty = await product_repository.create(
+        name="Reconcile Plenty", price=1.00, stock_quantity=10
+    )
+    short = await product_repository.create(
+        name="Reconcile Short", price=1.00, stock_quantity=1
+    )
+    mixed = await reservations.reserve(
+        {plenty.id: 2, short.id: 3}, {plenty.id: 10, short.id: 5}
+    )
+    simple = await reservations.reserve({plenty.id: 1}, {plenty.id: 10})
+    for reservation_id in (mixed, simple):
+        await reservations.confirm(reservation_id)
+
+    batch, requeue, updated = await reservations.reconcile(
+        product_repository, reservation_repository
+    )
+    await reservations.acknowledge(batch, requeue)
+
+    assert requeue == {mixed: [plenty.id]}
+    assert updated == [plenty.id]
+    assert (await product_repository.get_by_id(plenty.id)).stock_quantity == 7
+    assert (await product_repository.get_by_id(short.id)).stock_quantity == 1
+    # Only the unapplied line is left, so a retry cannot apply plenty twice
+    assert await redis_client.lrange("reservations:confirmed", 0, -1) == [
+        mixed.encode()
+    ]
+    assert await redis_client.hgetall(f"reservation:{mixed}") == {
+        str(short.id).encode(): b"3"
+    }
+    assert not await redis_client.exists(f"reservation:{simple}")
+
+
+@pytest.mark.asyncio
+async def test_reconcile_replay_does_not_decrement_twice(
+    reservations, redis_client, product_repository, reservation_repository
+):
+    """Test that a batch left queued after its commit is not applied again"""
+    product = await product_repository.create(
+        name="Reconcile Replay", price=1.00, stock_quantity=5
+    )
+    reservation_id = await reservations.reserve({product.id: 2}, {product.id: 5})
+    await reservations.confirm(reservation_id)
+
+    # The first run commits but dies before acknowledging the batch
+    await reservations.reconcile(product_repository, reservation_repository)
+    batch, requeue, updated = await reservations.reconcile(
+        product_repository, reservation_repository
+    )
+    await reservations.acknowledge(batch, requeue)
+
+    assert batch == [reservation_id]
+    assert requeue == {}
+    # Nothing left to apply, so no product cache needs evicting either
+    assert updated == []
+    assert (await product_repository.get_by_id(product.id)).stock_quantity == 3
+    assert await redis_client.llen("reservations:confirmed") == 0
+
+
+@pytest.mark.asyncio
+async def test_reconcile_lock_excludes_overlapping_runs(reservations, redis_client):
+    """Test that a second reconcile run cannot take the lock until it is freed"""
+    async with reservations.reconcile_lock() as first:
+        async with ReservationService(redis_client).reconcile_lock() as second:
+            assert first is True
+            assert second is False
+
+    async with reservations.reconcile_lock() as again:
+        assert again is True
@@ -0,0 +1,93 @@
+import pytest
+from litestar import get
+from litestar.middleware import DefineMiddleware
+from litestar.status_codes import HTTP_200_OK
+from litestar.testing import create_test_client
+
+from src.utils.response_cache import CACHE_TAGS_OPT, ResponseCacheMiddleware
+
+
+class FakeCacheService:
+    """Stores bodies in a dict; one generation shared by every tag"""
+
+    def __init__(self):
+        self.data = {}
+        self.generation = 0
+
+    async def tagged_key(self, tags, key):
+        return f"{':'.join(tags)}:{self.generation}:{key}"
+
+    async def get_bytes(self, key):
+        return self.data.get(key)
+
+    async def set_bytes(self, key, data, ttl, invalidate=True):
+        self.data[key] = data
+
+
+@pytest.fixture()
+def cache():
+    return FakeCacheService()
+
+
+@pytest.fixture()
+def calls():
+    return []
+
+
+@pytest.fixture()
+def client(cache, calls):
+    @get("/items", opt={CACHE_TAGS_OPT: ["items"]})
+    async def list_items(count: int = 10) -> dict:
+        calls.append(count)
+        return {"count": count}
+
+    @get("/untagged")
+    async def untagged() -> dict:
+        calls.append(None)
+        return {}
+
+    with create_test_client(
+        route_handlers=[list_items, untagged],
+        middleware=[
+            DefineMiddleware(ResponseCacheMiddleware, cache_factory=lambda: cache)
+        ],
+    ) as client:
+        yield client
+
+
+def test_second_request_is_served_from_cache(client, calls):
+    """Test that a repeated GET skips the handler and says so"""
+    first = client.get("/items?count=5")
+    second = client.get("/items?count=5")
+
+    assert first.headers["x-cache"] == "MISS"
+    assert second.status_code == HTTP_200_OK
+    assert second.headers["x-cache"] == "HIT"
+    assert second.json() == first.json() == {"count": 5}
+    assert calls == [5]
+
+
+def test_query_params_are_part_of_the_key(client, calls):
+    """Test that different query params are cached separately"""
+    client.get("/items?count=5")
+    client.get("/items?count=6")
+
+    assert calls == [5, 6]
+
+
+def test_new_generation_misses(client, cache, calls):
+    """Test that invalidating the tag makes the next request recompute"""
+    client.get("/items")
+    cache.generation += 1
+
+    assert client.get("/items").headers["x-cache"] == "MISS"
+    assert calls == [10, 10]
+
+
+def test_untagged_handlers_are_not_cached(client, calls):
+    """Test that only handlers with cache tags go through the cache"""
+    response = client.get("/untagged")
+    client.get("/untagged")
+
+    assert "x-cache" not in response.headers
+    assert calls == [None, None]
@@ -0,0 +1,52 @@
+import pytest
+from sqlalchemy.exc import DBAPIError, IntegrityError, OperationalError
+from sqlalchemy.orm.exc import StaleDataError
+
+from src.utils.retry import RetryPolicy, is_transient
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        OperationalError("SELECT 1", {}, Exception("connection refused")),
+        StaleDataError("row changed"),
+        ConnectionError("reset by peer"),
+        TimeoutError(),
+        DBAPIError("SELECT 1", {}, Exception("gone"), connection_invalidated=True),
+    ],
+)
+def test_transient_errors(error):
+    """Test that connection and conflict errors are retried"""
+    assert is_transient(error)
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        ValueError("Insufficient stock"),
+        ValueError("User not found"),
+        IntegrityError("INSERT", {}, Exception("duplicate key")),
+        KeyError("action"),
+    ],
+)
+def test_permanent_errors(error):
+    """Test that business and programming errors are not retried"""
+    assert not is_transient(error)
+
+
+def test_should_retry_stops_at_max_attempts():
+    """Test that a transient error is retried until the last attempt"""
+    policy = RetryPolicy(max_attempts=3)
+    error = TimeoutError()
+
+    assert policy.should_retry(error, 1)
+    assert policy.should_retry(error, 2)
+    assert not policy.should_retry(error, 3)
+    assert not policy.should_retry(ValueError("bad"), 1)
+
+
+def test_delay_grows_exponentially_and_is_capped():
+    """Test the backoff schedule"""
+    policy = RetryPolicy(base_delay_ms=100, max_delay_ms=500)
+
+    assert [policy.delay_ms(n) for n in range(1, 6)] == [100, 200, 400, 500, 500]
@@ -0,0 +1,69 @@
+import json
+from datetime import date, datetime, timezone
+
+import pytest
+
+from src.services import serializers
+from src.services.serializers import (
+    FLAG_ZLIB,
+    CacheSerializer,
+    JsonCodec,
+    MsgpackCodec,
+    create_serializer,
+)
+
+PRODUCT = {"id": 1, "name": "Keyboard", "price": 49.9, "stock_quantity": 12}
+USER = {
+    "id": 7,
+    "username": "alice",
+    "email": "alice@example.com",
+    "full_name": None,
+    "is_active": True,
+    "created_at": datetime(2025, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+    "birthday": date(2000, 1, 1),
+}
+
+
+@pytest.mark.parametrize("codec", [JsonCodec, MsgpackCodec])
+def test_round_trip_keeps_types(codec):
+    """Test that datetimes and dates survive a round trip"""
+    serializer = CacheSerializer(codec())
+
+    assert serializer.loads(serializer.dumps(PRODUCT)) == PRODUCT
+    assert serializer.loads(serializer.dumps(USER)) == USER
+
+
+def test_large_values_are_compressed():
+    """Test that payloads above the threshold are zlib-compressed"""
+    serializer = CacheSerializer(JsonCodec(), compress_threshold=64)
+    value = {"items": [PRODUCT] * 20}
+
+    data = serializer.dumps(value)
+
+    assert data[1] & FLAG_ZLIB
+    assert len(data) < len(json.dumps(value))
+    assert serializer.loads(data) == value
+
+
+def test_reads_values_written_by_other_codec():
+    """Test that a codec switch does not need a Redis flush"""
+    written = CacheSerializer(MsgpackCodec()).dumps(PRODUCT)
+
+    assert CacheSerializer(JsonCodec()).loads(written) == PRODUCT
+
+
+def test_reads_legacy_json():
+    """Test that unframed JSON written before the serializer still loads"""
+    legacy = json.dumps(PRODUCT, default=str).encode()
+
+    assert create_serializer("json").loads(legacy) == PRODUCT
+
+
+def test_configured_codec_must_be_available(monkeypatch):
+    """Test that a missing msgpack fails startup instead of falling back"""
+    monkeypatch.setattr(serializers, "msgpack", None)
+
+    with pytest.raises(RuntimeError, match="msgpack is not installed"):
+        create_serializer("msgpack")
+    with pytest.raises(ValueError, match="Unknown cache codec"):
+        create_serializer("pickle")
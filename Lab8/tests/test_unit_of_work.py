@@ -0,0 +1,93 @@
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from src.repositories.product_repository import ProductRepository
+from src.repositories.unit_of_work import UnitOfWork
+
+
+@pytest.fixture
+def session_factory(engine):
+    return sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+
+@pytest.mark.asyncio
+async def test_unit_of_work_commits_on_success(session_factory):
+    """Test that changes flushed by repositories are committed once on exit"""
+    async with session_factory() as session:
+        async with UnitOfWork(session) as uow:
+            product = await ProductRepository(uow.session).create(
+                name="UoW Commit", price=10.00, stock_quantity=5
+            )
+            await ProductRepository(uow.session).decrement_stock({product.id: 2})
+
+    async with session_factory() as other:
+        stored = await ProductRepository(other).get_by_id(product.id)
+        assert stored is not None
+        assert stored.stock_quantity == 3
+
+
+@pytest.mark.asyncio
+async def test_unit_of_work_rolls_back_on_error(session_factory):
+    """Test that a failure leaves no partial writes behind"""
+    async with session_factory() as session:
+        with pytest.raises(ValueError):
+            async with UnitOfWork(session) as uow:
+                product = await ProductRepository(uow.session).create(
+                    name="UoW Rollback", price=10.00, stock_quantity=5
+                )
+                product_id = product.id
+                raise ValueError("Insufficient stock")
+
+    async with session_factory() as other:
+        assert await ProductRepository(other).get_by_id(product_id) is None
+
+
+@pytest.mark.asyncio
+async def test_unit_of_work_runs_after_commit_callbacks_once():
+    """Test that after-commit callbacks run after the commit, not before"""
+    events = []
+    session = Mock(commit=AsyncMock(side_effect=lambda: events.append("commit")))
+    uow = UnitOfWork(session)
+
+    async def callback():
+        events.append("callback")
+
+    async with uow:
+        uow.after_commit(callback)
+        assert events == []
+
+    await uow.commit()
+    assert events == ["commit", "callback", "commit"]
+
+
+@pytest.mark.asyncio
+async def test_unit_of_work_failed_commit_runs_rollback_callbacks():
+    """Test that a failed commit drops after-commit work and runs rollback hooks"""
+    session = Mock(commit=AsyncMock(side_effect=OSError), rollback=AsyncMock())
+    uow = UnitOfWork(session)
+    committed, rolled_back = AsyncMock(), AsyncMock()
+    uow.after_commit(committed)
+    uow.after_rollback(rolled_back)
+
+    with pytest.raises(OSError):
+        await uow.commit()
+
+    session.rollback.assert_awaited_once()
+    committed.assert_not_awaited()
+    rolled_back.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_unit_of_work_callback_error_keeps_commit():
+    """Test that a failing side effect does not fail a committed transaction"""
+    uow = UnitOfWork(Mock(commit=AsyncMock()))
+    later = AsyncMock()
+    uow.after_commit(AsyncMock(side_effect=ConnectionError))
+    uow.after_commit(later)
+
+    await uow.commit()
+
+    later.assert_awaited_once()
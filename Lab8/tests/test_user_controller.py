@@ -11,7 +11,8 @@ from src.schemas.user import UserCreate, UserUpdate, UserResponse, UserListRespo
 
 class UserService(Protocol):
     async def get_by_id(self, user_id: int): ...
-    async def get_by_filter(self, count: int, page: int): ...
+    async def get_json_by_id(self, user_id: int): ...
+    async def get_by_filter(self, count: int, page: int, cursor=None): ...
     async def create(self, data: UserCreate): ...
     async def update(self, user_id: int, data: UserUpdate): ...
     async def delete(self, user_id: int): ...
@@ -49,8 +50,8 @@ async def test_get_user_by_id(user_response: UserResponse):
     """Test retrieving a user by ID"""
 
     class MockUserService:
-        async def get_by_id(self, user_id: int):
-            return user_response
+        async def get_json_by_id(self, user_id: int):
+            return user_response.model_dump_json().encode()
 
     with create_test_client(
         route_handlers=[UserController],
@@ -60,6 +61,7 @@ async def test_get_user_by_id(user_response: UserResponse):
     ) as client:
         response = client.get(f"/users/{user_response.id}")
         assert response.status_code == HTTP_200_OK
+        assert response.headers["content-type"] == "application/json"
         assert response.json() == user_response.model_dump(mode="json")
 
 
@@ -68,7 +70,7 @@ async def test_get_user_by_id_not_found():
     """Test retrieving a non-existent user"""
 
     class MockUserService:
-        async def get_by_id(self, user_id: int):
+        async def get_json_by_id(self, user_id: int):
             return None
 
     with create_test_client(
@@ -88,7 +90,7 @@ async def test_get_all_users(user_response: UserResponse):
     users = [user_response]
 
     class MockUserService:
-        async def get_by_filter(self, count: int, page: int):
+        async def get_by_filter(self, count: int, page: int, cursor=None):
             return {"total": 1, "items": users}
 
     with create_test_client(
@@ -111,7 +113,7 @@ async def test_get_all_users_default_pagination(user_response: UserResponse):
     users = [user_response]
 
     class MockUserService:
-        async def get_by_filter(self, count: int, page: int):
+        async def get_by_filter(self, count: int, page: int, cursor=None):
             assert count == 10
             assert page == 1
             return {"total": 1, "items": users}
@@ -94,3 +94,33 @@ async def test_count_users(user_repository):
 
     new_count = await user_repository.count()
     assert new_count == initial_count + 1
+
+
+@pytest.mark.asyncio
+async def test_get_users_after_cursor(user_repository):
+    """Test keyset pagination returns users with larger ids only"""
+    created = []
+    for i in range(3):
+        user_data = UserCreate(username=f"cursoruser{i}", email=f"cursor{i}@example.com")
+        created.append(await user_repository.create(user_data))
+
+    users = await user_repository.get_after(created[0].id, count=10)
+
+    assert [u.id for u in users][:2] == [created[1].id, created[2].id]
+    assert all(u.id > created[0].id for u in users)
+
+
+@pytest.mark.asyncio
+async def test_get_users_by_ids(user_repository):
+    """Test loading several users with one query"""
+    first = await user_repository.create(
+        UserCreate(username="batchuser1", email="batch1@example.com")
+    )
+    second = await user_repository.create(
+        UserCreate(username="batchuser2", email="batch2@example.com")
+    )
+
+    users = await user_repository.get_by_ids([first.id, second.id, 99999])
+
+    assert set(users) == {first.id, second.id}
+    assert users[second.id].username == "batchuser2"